@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Any, Iterator, Mapping
+
+from llm_backends import LLMBackend, LLMConfigError, LLMError, Messages, approximate_prompt_tokens
+
+# Process-wide admission control for LLM requests: token buckets sized to the account's
+# requests-per-minute and tokens-per-minute quota, a bounded FIFO of waiting requests, and
+# a deadline after which a request is refused instead of sent. Refused requests raise
+# AdmissionRejected straight away so the caller can serve its fallback.
+
+
+class AdmissionRejected(RuntimeError):
+    """The request was not sent: the rate budget could not cover it before its deadline"""
+
+
+class TokenBucket:
+    """Refills continuously at rate_per_minute up to capacity (one minute's worth by default)"""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None, now: float = 0.0):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (amounts above capacity wait for a full bucket)"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate) if self.rate else (0.0 if missing <= 0 else float('inf'))
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= amount
+
+
+class _Waiter:
+    __slots__ = ('tokens',)
+
+    def __init__(self, tokens: float):
+        self.tokens = tokens
+
+
+class AdmissionController:
+    """Admits LLM requests within an RPM/TPM budget, first come first served.
+
+    acquire() blocks while the request is at the head of the queue and the budget is
+    refilling, but raises AdmissionRejected at once when the queue is full or when the
+    budget cannot cover the request (and everything queued ahead of it) by its deadline.
+    """
+
+    def __init__(self, rpm: float, tpm: float, max_waiting: int = 16, max_wait: float = 8.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_waiting = max_waiting
+        self.max_wait = max_wait
+        self._clock = clock
+        now = clock()
+        self._requests = TokenBucket(rpm, now=now)
+        self._tokens = TokenBucket(tpm, now=now)
+        self._paused_until = now
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._typical_tokens = 1000.0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+        self.rate_limited = 0
+
+    def _wait_for(self, requests: int, tokens: float, now: float) -> float:
+        return max(self._requests.wait_time(requests, now), self._tokens.wait_time(tokens, now),
+                   self._paused_until - now)
+
+    def _backlog_wait(self, tokens: float, now: float) -> float:
+        # Everyone already queued goes first
+        queued_tokens = sum(waiter.tokens for waiter in self._queue)
+        return self._wait_for(len(self._queue) + 1, queued_tokens + tokens, now)
+
+    def expected_wait(self) -> float:
+        """Predicted wait for a typical request arriving now (inf when the queue is full)"""
+        with self._cond:
+            if len(self._queue) >= self.max_waiting:
+                return float('inf')
+            return self._backlog_wait(self._typical_tokens, self._clock())
+
+    def accepting(self) -> bool:
+        """Whether a typical request arriving now would be admitted within max_wait"""
+        return self.expected_wait() <= self.max_wait
+
+    def acquire(self, tokens: float, deadline: float):
+        with self._cond:
+            now = self._clock()
+            if len(self._queue) >= self.max_waiting:
+                self.rejected_queue_full += 1
+                raise AdmissionRejected(f"{len(self._queue)} AI requests already waiting for rate budget")
+            if now + self._backlog_wait(tokens, now) > deadline:
+                self.rejected_deadline += 1
+                raise AdmissionRejected("rate budget can't cover this request before its deadline")
+
+            waiter = _Waiter(tokens)
+            self._queue.append(waiter)
+            try:
+                while True:
+                    now = self._clock()
+                    if self._queue[0] is waiter:
+                        wait = self._wait_for(1, tokens, now)
+                        if wait <= 0:
+                            self._requests.take(1, now)
+                            self._tokens.take(tokens, now)
+                            self._typical_tokens = 0.8 * self._typical_tokens + 0.2 * tokens
+                            self.admitted += 1
+                            return
+                        if now + wait > deadline:
+                            self.rejected_deadline += 1
+                            raise AdmissionRejected("rate budget can't cover this request before its deadline")
+                    else:
+                        wait = deadline - now
+                        if wait <= 0:
+                            self.rejected_deadline += 1
+                            raise AdmissionRejected("deadline passed while waiting for rate budget")
+                    self._cond.wait(wait)
+            finally:
+                self._queue.remove(waiter)
+                self._cond.notify_all()
+
+    def backoff(self, seconds: float):
+        """Upstream said we're over the limit: admit nothing more for a while"""
+        with self._cond:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = self._clock()
+            return {
+                'admitted': self.admitted,
+                'rejected_queue_full': self.rejected_queue_full,
+                'rejected_deadline': self.rejected_deadline,
+                'rate_limited': self.rate_limited,
+                'waiting': len(self._queue),
+                'paused_for': round(max(0.0, self._paused_until - now), 2),
+                'expected_wait': round(self._backlog_wait(self._typical_tokens, now), 2),
+            }
+
+
+def estimate_tokens(messages: Messages, max_tokens: int) -> int:
+    """Prompt tokens (as counted when the prompt was built, else about 4 characters each) plus the
+    completion allowance, as quotas count them"""
+    return approximate_prompt_tokens(messages) + max_tokens
+
+
+class AdmittedBackend(LLMBackend):
+    """Wraps a backend so each request waits for admission and reports 429s.
+
+    The first request must be admitted by deadline (which counts time spent queued for a
+    worker); later ones, i.e. retries, get a fresh max_wait.
+    """
+
+    def __init__(self, backend: LLMBackend, controller: AdmissionController, deadline: float):
+        super().__init__(backend.model)
+        self.name = backend.name
+        self.backend = backend
+        self.usage = backend.usage
+        self.controller = controller
+        self.deadline = deadline
+
+    def _acquire(self, messages: Messages, max_tokens: int):
+        deadline, self.deadline = self.deadline, None
+        if deadline is None:
+            deadline = time.monotonic() + self.controller.max_wait
+        self.controller.acquire(estimate_tokens(messages, max_tokens), deadline)
+
+    def _rate_limited(self, error: LLMError):
+        if error.status == 429:
+            self.controller.backoff(error.retry_after or 1.0)
+
+    def complete(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> str:
+        self._acquire(messages, max_tokens)
+        try:
+            return self.backend.complete(messages, max_tokens, temperature, json_mode)
+        except LLMError as e:
+            self._rate_limited(e)
+            raise
+
+    def stream(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> Iterator[str]:
+        self._acquire(messages, max_tokens)
+        try:
+            yield from self.backend.stream(messages, max_tokens, temperature, json_mode)
+        except LLMError as e:
+            self._rate_limited(e)
+            raise
+
+
+def admission_from_settings(settings: Mapping[str, str]) -> AdmissionController:
+    """VIBE_LLM_RPM / VIBE_LLM_TPM quota, VIBE_LLM_MAX_QUEUE waiting requests, VIBE_LLM_MAX_WAIT seconds"""
+    try:
+        return AdmissionController(
+            rpm=float(settings.get('VIBE_LLM_RPM', 3500)),
+            tpm=float(settings.get('VIBE_LLM_TPM', 90000)),
+            max_waiting=int(settings.get('VIBE_LLM_MAX_QUEUE', 16)),
+            max_wait=float(settings.get('VIBE_LLM_MAX_WAIT', 8)),
+        )
+    except ValueError as e:
+        raise LLMConfigError(f"invalid VIBE_LLM_* setting: {e}") from e
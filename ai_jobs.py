@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when too many AI requests are already waiting for a worker"""
+
+
+class ReadingJob:
+    """Handle for one AI request: the future plus any fields streamed in so far"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.future: Optional[Future] = None
+        self._fields: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, field: str, value: Any):
+        """Called from the worker as each field of the reading completes"""
+        with self._lock:
+            self._fields[field] = value
+
+    def partial(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._fields)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None):
+        return self.future.result(timeout)
+
+
+class ReadingJobs:
+    """Bounded thread pool for AI requests; identical in-flight requests share one future"""
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 32):
+        self.max_pending = max_pending
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-reading')
+        self._in_flight: Dict[str, ReadingJob] = {}
+        self._lock = threading.Lock()
+
+    def running(self, key: str) -> Optional[ReadingJob]:
+        """The in-flight job for key, if any (counted as a deduplicated request)"""
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None:
+                self.deduplicated += 1
+            return job
+
+    def submit(self, key: str, fn: Callable, *args, **kwargs) -> ReadingJob:
+        """Run fn(job, *args, **kwargs) on the pool, or return the identical job already running"""
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None:
+                self.deduplicated += 1
+                return job
+            if len(self._in_flight) >= self.max_pending:
+                self.rejected += 1
+                raise JobQueueFull(f"{len(self._in_flight)} AI requests already pending")
+            job = ReadingJob(key)
+            job.future = self._pool.submit(fn, job, *args, **kwargs)
+            self._in_flight[key] = job
+            self.submitted += 1
+        job.future.add_done_callback(lambda f: self._finished(job))
+        return job
+
+    def _finished(self, job: ReadingJob):
+        with self._lock:
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'in_flight': len(self._in_flight),
+            'submitted': self.submitted,
+            'deduplicated': self.deduplicated,
+            'rejected': self.rejected,
+        }
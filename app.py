@@ -1,15 +1,37 @@
 import streamlit as st
-import json
-import random
+import streamlit.components.v1 as components
 from PIL import Image
-import time
 import os
-import openai
-from typing import Dict, List, Any
+import time
+from concurrent.futures import wait
+from typing import Dict, List, Any, Optional, Tuple
 
 from streamlit_lottie import st_lottie
 import requests
 
+from content_store import ContentStore, ContentError
+from reading_cache import (
+    ReadingCache, READING_TABLE, reading_key, anonymize_reading, personalize_reading, contains_name
+)
+from precompute import ReadingArtifact, FALLBACK_READING_VERSION, artifact_mtime
+from scoring import engine_for
+from ai_jobs import ReadingJobs, ReadingJob, JobQueueFull
+from http_client import PooledSession
+from admission import AdmissionController, AdmittedBackend, admission_from_settings
+from resilience import RetryPolicy, retry_policy_from_settings
+from llm_backends import LLMBackend, LLMConfigError, llm_settings, backend_from_settings, streaming_from_settings
+from settings import SettingsError
+from theme import stylesheet_url, stylesheet_loader_html, age_override_css
+from templates import RenderCache, ai_results_card, results_card
+from share_card import ShareCardRenderer
+from lottie_bundle import LottieBundle
+from telemetry import TELEMETRY, stage, count, start_exporters
+from profiling import RerunProfiler, MAX_PROFILED_RERUNS, profile_settings, profiler_from_settings, format_summary
+from oracle import (
+    prompt_style_from_settings, reading_version, generate_reading, stream_reading, generate_smart_fallback,
+    is_complete_reading, social_energy_split, precompile_choice_categories
+)
+
 # Set page configuration
 st.set_page_config(
     page_title="Cosmic Vibe Check 2025",
@@ -18,1164 +40,304 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Load data from a specific file path
-def load_data(file_path):
+# Quiz content shared by every session in this process (reloaded when a data file changes)
+@st.cache_resource
+def get_content_store():
+    return ContentStore(on_load=[precompile_choice_categories])
+
+# AI readings shared across sessions, keyed on the answers rather than the user
+@st.cache_resource
+def get_reading_cache():
+    return ReadingCache()
+
+# Readings generated offline by precompute.py, memory-mapped once per artifact file, content and reading version
+@st.cache_resource(max_entries=4)
+def _precomputed_readings_for(version: str, fingerprint: str, mtime: Optional[int], _snapshot):
+    return ReadingArtifact.open(snapshot=_snapshot, reading_version=version)
+
+# Only an artifact written for the current content by the configured backend, model and prompt is used
+# (keyword readings only when no AI backend is configured). Rebuilding the file or editing the content
+# takes effect on the next rerun, not the next restart
+def get_precomputed_readings():
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        st.error(f"Error loading {file_path}: {e}")
-        return None
+        version = reading_version(get_llm_backend(), get_prompt_style())
+    except LLMConfigError:
+        version = FALLBACK_READING_VERSION
+    snapshot = get_content_store().snapshot()
+    return _precomputed_readings_for(version, snapshot.content_fingerprint(), artifact_mtime(), snapshot)
+
+# Trait weights and personality centroids for an age group, built once per content load
+def get_scoring_engine(age_group: str):
+    return engine_for(get_content_store().snapshot(), age_group)
+
+# Keep-alive connection pool shared by every outbound HTTP call in this process
+@st.cache_resource
+def get_http_session():
+    return PooledSession(pool_maxsize=8)
+
+# Shared pool that runs AI requests off the Streamlit script thread
+@st.cache_resource
+def get_reading_jobs():
+    return ReadingJobs(max_workers=4, max_pending=32)
+
+# How long one loading-page run waits on the AI job before polling again
+AI_POLL_INTERVAL = 1.0
+
+# How often the results page redraws while a reading streams in
+STREAM_POLL_INTERVAL = 0.1
+
+# Rendered result cards shared across sessions, keyed on the reading and the name shown on it
+@st.cache_resource
+def get_card_cache():
+    return RenderCache()
+
+# Share images: fonts and background loaded once, finished images kept on disk under a hash of the card
+@st.cache_resource
+def get_share_cards():
+    return ShareCardRenderer()
+
+# Animations vendored by lottie_bundle.py, parsed once per process the first time an animation is shown
+@st.cache_resource
+def get_lottie_bundle():
+    return LottieBundle()
 
 # Load Lottie animations from a URL
 @st.cache_data
 def load_lottie_url(url: str):
     try:
-        r = requests.get(url, timeout=10)
+        r = get_http_session().get(url, timeout=10)
         r.raise_for_status()
         return r.json()
     except requests.RequestException as e:
         return None
 
-# Initialize OpenAI client
-def initialize_openai():
-    """Initialize OpenAI client with API key"""
-    if 'OPENAI_API_KEY' not in st.secrets:
-        st.error("OpenAI API key not found in secrets. Please add your API key to .streamlit/secrets.toml")
+# Animation for a URL from the local bundle, fetching it only when the bundle doesn't have it
+def load_lottie(url: str):
+    animation = get_lottie_bundle().get(url)
+    if animation is None:
+        count('lottie_fetch')
+        animation = load_lottie_url(url)
+    return animation
+
+# Secrets from .streamlit/secrets.toml, or nothing when the file doesn't exist
+def read_secrets() -> Dict[str, Any]:
+    return dict(st.secrets) if st.secrets.load_if_toml_exists() else {}
+
+# One backend per distinct configuration, shared by every session
+@st.cache_resource
+def _llm_backend_for(settings: tuple) -> LLMBackend:
+    return backend_from_settings(dict(settings), get_http_session())
+
+# LLM backend picked by the VIBE_LLM_* settings in secrets or the environment (OpenAI by default)
+def get_llm_backend() -> LLMBackend:
+    return _llm_backend_for(tuple(sorted(llm_settings(read_secrets()).items())))
+
+# Prompt style picked by VIBE_LLM_PROMPT (compact by default)
+def get_prompt_style() -> str:
+    return prompt_style_from_settings(llm_settings(read_secrets()))
+
+# Stream readings onto the results page field by field (VIBE_LLM_STREAM=0 waits for the full reading)
+def get_stream_readings() -> bool:
+    return streaming_from_settings(llm_settings(read_secrets()))
+
+# Rate budget shared by every AI request in this process
+@st.cache_resource
+def _admission_for(settings: tuple) -> AdmissionController:
+    return admission_from_settings(dict(settings))
+
+def get_admission() -> AdmissionController:
+    return _admission_for(tuple(sorted(llm_settings(read_secrets()).items())))
+
+# Retry/hedging policy and its counters, shared by every AI request in this process
+@st.cache_resource
+def _retry_policy_for(settings: tuple) -> RetryPolicy:
+    return retry_policy_from_settings(dict(settings))
+
+def get_retry_policy() -> RetryPolicy:
+    return _retry_policy_for(tuple(sorted(llm_settings(read_secrets()).items())))
+
+# Profiler armed by the VIBE_PROFILE* settings; changing them (secrets.toml included) re-arms it
+@st.cache_resource
+def _profiler_for(settings: tuple) -> RerunProfiler:
+    return profiler_from_settings(dict(settings))
+
+def get_profiler() -> RerunProfiler:
+    return _profiler_for(tuple(sorted(profile_settings(read_secrets()).items())))
+
+# Cache key for an answer path
+def ai_reading_cache_key(age_group: str, answer_indices: Tuple[int, ...], traits: Dict[str, int], backend: LLMBackend,
+                         style: str) -> str:
+    return reading_key(age_group, answer_indices, traits, reading_version(backend, style))
+
+# Precomputed or cached reading (anonymized) for an answer path; never touches the network
+def lookup_ai_reading(age_group: str, answer_indices: Tuple[int, ...], traits: Dict[str, int]) -> Optional[Dict[str, Any]]:
+    # Identical answer paths get the same reading, so serve them precomputed or from the cache
+    artifact = get_precomputed_readings()
+    if artifact is not None:
+        precomputed = artifact.lookup(age_group, answer_indices)
+        if precomputed is not None:
+            count('precomputed_hit')
+            return precomputed
+    # Cached readings belong to the backend and prompt that wrote them
+    try:
+        backend = get_llm_backend()
+        style = get_prompt_style()
+    except LLMConfigError:
         return None
-    
+    cached = get_reading_cache().get(ai_reading_cache_key(age_group, answer_indices, traits, backend, style))
+    if cached is not None:
+        count('cache_hit')
+        return cached
+    count('cache_miss')
+    return None
+
+# Runs on the job pool, so no Streamlit calls in here
+def _generate_and_cache(job: ReadingJob, cache: ReadingCache, cache_key: Optional[str], name: str, age_group: str,
+                        answers: List[str], traits: Dict[str, int], backend: LLMBackend, style: str,
+                        stream: bool) -> Dict[str, Any]:
     try:
-        openai.api_key = st.secrets['OPENAI_API_KEY']
-        return openai
-    except Exception as e:
-        st.error(f"Failed to initialize OpenAI: {e}")
+        if stream:
+            # Streamed fields are shared with every session waiting on this job, so publish them anonymized
+            def publish(field, value):
+                value = anonymize_reading({field: value}, name)[field]
+                if not contains_name(value, name):
+                    job.publish(field, value)
+            reading = stream_reading(name, age_group, answers, traits, backend, on_field=publish, style=style)
+        else:
+            reading = generate_reading(name, age_group, answers, traits, backend, style)
+    except Exception:
+        count('ai_failure')
+        raise
+    count('ai_success')
+    reading = anonymize_reading(reading, name)
+    if cache_key and is_complete_reading(reading):
+        cache.put(cache_key, reading, name)
+    return reading
+
+# Start an AI reading in the background; the future resolves to an anonymized reading
+def submit_ai_personality(name: str, age_group: str, answer_indices: Tuple[int, ...],
+                          stream: bool = False) -> Optional[ReadingJob]:
+    try:
+        backend = get_llm_backend()
+        admission = get_admission()
+        retry_policy = get_retry_policy()
+        style = get_prompt_style()
+    except LLMConfigError as e:
+        st.error(f"⚠️ AI analysis unavailable - {e}")
         return None
-
-# Generate AI personality analysis
-def generate_ai_personality(name: str, age_group: str, answers: List[str], traits: Dict[str, int]) -> Dict[str, Any]:
-    """Generate truly intelligent personality analysis based on actual user choices"""
     
-    client = initialize_openai()
-    if not client:
-        st.error("⚠️ AI analysis unavailable - OpenAI API key not configured")
+    answers = get_content_store().snapshot().answer_texts(age_group, answer_indices)
+    traits = get_scoring_engine(age_group).score(answer_indices)
+    # Sessions with the same answers share one request
+    cache_key = ai_reading_cache_key(age_group, answer_indices, traits, backend, style)
+    jobs = get_reading_jobs()
+    job = jobs.running(cache_key)
+    if job is not None:
+        return job
+    # Over the rate budget: go straight to the fallback instead of queueing a doomed request
+    if not admission.accepting():
         return None
-    
-    # Calculate intelligent introversion/extroversion percentage
-    extroversion_score = traits.get('extroversion', 0)
-    # Convert trait score to percentage (scores typically range from -10 to +10)
-    extroversion_percentage = max(0, min(100, 50 + (extroversion_score * 5)))
-    introversion_percentage = 100 - extroversion_percentage
-    
-    # Analyze their choices in detail
-    choice_analysis = ""
-    if len(answers) >= 5:
-        choice_analysis = f"""
-        DEEP CHOICE ANALYSIS for {name}:
-        📱 Content Choice: "{answers[0]}" - What does this say about their humor/interests?
-        🤖 AI Role: "{answers[1]}" - What relationship style do they prefer?
-        📲 Discovery: "{answers[2]}" - How do they explore and find new things?
-        ✈️ Travel: "{answers[3]}" - What experiences energize them?
-        ⚡ Power: "{answers[4]}" - What do they value most in life?
-        """
-    
-    # Create MUCH more detailed analysis prompt
-    prompt = f"""
-    You are a world-class personality analyst with deep psychological insight. Analyze {name}'s specific quiz choices to create a reading that feels like you actually understand them personally.
-
-    {choice_analysis}
-
-    PERSONALITY SCORING:
-    - Extroversion: {extroversion_score}/10 → {extroversion_percentage}% vs {introversion_percentage}% introverted
-    - Creativity: {traits.get('creativity', 0)}/10 (artistic, innovative thinking)
-    - Ambition: {traits.get('ambition', 0)}/10 (drive, goal-orientation)  
-    - Empathy: {traits.get('empathy', 0)}/10 (caring, emotional intelligence)
-    - Adaptability: {traits.get('adaptability', 0)}/10 (flexibility, spontaneity)
-
-    AGE GROUP: {age_group} - Use language/references they'd connect with
-
-    CREATE A UNIQUE READING (NOT GENERIC):
-
-    1. **personality_name**: Create a truly unique 2-3 word name that captures THEIR specific combination of choices. Examples: "Strategic Dream Chaser", "Gentle Adventure Seeker", "Bold Comfort Creator" - make it SPECIFIC to their answers!
-
-    2. **essence**: One sentence that shows you analyzed their ACTUAL choices, not just traits. Reference what they chose!
-
-    3. **hidden_trait**: Start with "You secretly..." and reveal something that emerges from the COMBINATION of their choices that might surprise them.
-
-    4. **superpower**: Based on their SPECIFIC answers, what's their unique strength? Not generic - tied to what they actually picked.
-
-    5. **vibe_check**: 2-4 words that capture their energy based on their choices.
-
-    6. **compatibility_vibes**: Who would vibe with someone who made THESE specific choices? Be specific.
-
-    7. **personal_insight**: A specific insight about their decision-making pattern that shows you understood their choices.
-
-    8. **social_energy**: Explain their {extroversion_percentage}%/{introversion_percentage}% split by referencing their ACTUAL choices. "You're {extroversion_percentage}% extroverted because you chose [specific choice] but also need alone time because you picked [other choice]"
-
-    CRITICAL RULES:
-    - Reference their ACTUAL choices in multiple responses
-    - Make personality_name truly unique to their combination
-    - Don't use generic phrases like "unique individual" 
-    - Each reading should be completely different based on different choices
-    - Show you understood the nuances of what they picked
-
-    Return ONLY valid JSON:
-    {{
-        "personality_name": "...",
-        "essence": "...",
-        "hidden_trait": "...",
-        "superpower": "...", 
-        "vibe_check": "...",
-        "compatibility_vibes": ["...", "..."],
-        "personal_insight": "...",
-        "social_energy": "..."
-    }}
-    """
-    
+    # Every attempt, retries and hedges included, goes through admission
+    admitted = AdmittedBackend(backend, admission, deadline=time.monotonic() + admission.max_wait)
     try:
-        st.write(f"🔮 Analyzing {name}'s choices with AI...")
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a brilliant personality analyst who creates authentic, personalized readings by deeply analyzing specific user choices. Never give generic responses."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=600,
-            temperature=0.8  # Higher creativity for unique responses
-        )
-        
-        result = response.choices[0].message.content.strip()
-        st.write(f"✅ AI analysis complete!")
-        
-        # Clean the response to extract JSON
-        if "```json" in result:
-            result = result.split("```json")[1].split("```")[0].strip()
-        elif "```" in result:
-            result = result.split("```")[1].strip()
-        
-        try:
-            parsed = json.loads(result)
-            # Add calculated percentages to the result
-            parsed['extroversion_percentage'] = extroversion_percentage
-            parsed['introversion_percentage'] = introversion_percentage
-            st.write(f"🎯 Created unique personality: {parsed.get('personality_name', 'Unknown')}")
-            return parsed
-        except json.JSONDecodeError as json_error:
-            st.error(f"JSON parsing failed: {json_error}")
-            st.write(f"Raw AI response: {result}")
-            # Fallback parsing if JSON fails
-            fallback_result = parse_ai_response_smart(result)
-            fallback_result['extroversion_percentage'] = extroversion_percentage
-            fallback_result['introversion_percentage'] = introversion_percentage
-            return fallback_result
-            
-    except Exception as e:
-        st.error(f"AI analysis failed: {e}")
-        st.write("🔧 Check your OpenAI API key in Streamlit secrets")
+        return jobs.submit(cache_key, _generate_and_cache, get_reading_cache(), cache_key,
+                           name, age_group, answers, traits, retry_policy.wrap(admitted), style, stream)
+    except JobQueueFull:
         return None
 
-# Smart fallback based on actual user choices
-def generate_smart_fallback(name: str, age_group: str, answers: List[str], traits: Dict[str, int]) -> Dict[str, Any]:
-    """Generate personality based on actual choices when AI fails"""
-    
-    extroversion_score = traits.get('extroversion', 0)
-    extroversion_percentage = max(0, min(100, 50 + (extroversion_score * 5)))
-    introversion_percentage = 100 - extroversion_percentage
-    
-    # Analyze their actual choices to create unique personalities
-    choice_patterns = {
-        "creative": 0,
-        "social": 0, 
-        "adventure": 0,
-        "comfort": 0,
-        "tech": 0
-    }
-    
-    # Score based on actual answers
-    if len(answers) >= 5:
-        # Analyze each choice
-        for answer in answers:
-            answer_lower = answer.lower()
-            if any(word in answer_lower for word in ['art', 'dance', 'music', 'creative', 'meme', 'funny']):
-                choice_patterns["creative"] += 1
-            if any(word in answer_lower for word in ['friend', 'group', 'party', 'social', 'viral', 'community']):
-                choice_patterns["social"] += 1
-            if any(word in answer_lower for word in ['adventure', 'explore', 'travel', 'spontaneous', 'mystery']):
-                choice_patterns["adventure"] += 1
-            if any(word in answer_lower for word in ['comfort', 'cozy', 'chill', 'relax', 'home', 'safe']):
-                choice_patterns["comfort"] += 1
-            if any(word in answer_lower for word in ['tech', 'ai', 'app', 'efficiency', 'smart', 'organize']):
-                choice_patterns["tech"] += 1
-    
-    # Find dominant patterns
-    dominant_trait = max(choice_patterns, key=choice_patterns.get)
-    secondary_trait = sorted(choice_patterns.items(), key=lambda x: x[1], reverse=True)[1][0]
-    
-    # Create unique personalities based on combinations
-    personality_matrix = {
-        ("creative", "social"): {
-            "name": "Artistic Social Butterfly",
-            "essence": f"You blend creativity with social connection, choosing {answers[0] if answers else 'creative content'} because you love sharing laughs and inspiration.",
-            "hidden_trait": "You secretly use humor and art as your way of bringing people together.",
-            "superpower": "Making others feel seen through creative expression",
-            "vibe": "Inspiring and magnetic"
-        },
-        ("creative", "adventure"): {
-            "name": "Visionary Explorer", 
-            "essence": f"Your choice of {answers[0] if answers else 'adventure'} shows you see life as a canvas to paint with bold experiences.",
-            "hidden_trait": "You secretly document your adventures in creative ways others never notice.",
-            "superpower": "Turning everyday moments into epic stories",
-            "vibe": "Bold and imaginative"
-        },
-        ("social", "comfort"): {
-            "name": "Community Comfort Creator",
-            "essence": f"You picked {answers[3] if len(answers) > 3 else 'cozy experiences'} because you believe the best connections happen in comfortable spaces.",
-            "hidden_trait": "You secretly orchestrate gatherings that help shy people feel included.",
-            "superpower": "Creating spaces where everyone feels like they belong",
-            "vibe": "Warm and inclusive"
-        },
-        ("tech", "adventure"): {
-            "name": "Digital Pioneer",
-            "essence": f"Your {answers[2] if len(answers) > 2 else 'tech-savvy'} approach shows you use technology to enhance real-world adventures.",
-            "hidden_trait": "You secretly find the most efficient routes to spontaneous fun.",
-            "superpower": "Bridging digital innovation with authentic experiences", 
-            "vibe": "Forward-thinking and dynamic"
-        },
-        ("comfort", "creative"): {
-            "name": "Cozy Creator",
-            "essence": f"You chose {answers[4] if len(answers) > 4 else 'comfort'} because you know the best ideas come from peaceful, inspiring spaces.",
-            "hidden_trait": "You secretly create beautiful environments that spark others' creativity.",
-            "superpower": "Making ordinary spaces feel magical and inspiring",
-            "vibe": "Nurturing and artistic"
-        }
-    }
-    
-    # Get personality or create default
-    key = (dominant_trait, secondary_trait)
-    if key not in personality_matrix:
-        key = (secondary_trait, dominant_trait)
-    
-    if key in personality_matrix:
-        personality_data = personality_matrix[key]
-    else:
-        # Super fallback
-        personality_data = {
-            "name": f"{dominant_trait.title()} {secondary_trait.title()} Spirit",
-            "essence": f"Your choices reveal someone who values both {dominant_trait} and {secondary_trait} in unique ways.",
-            "hidden_trait": f"You secretly balance {dominant_trait} energy with {secondary_trait} wisdom.",
-            "superpower": f"Combining {dominant_trait} instincts with {secondary_trait} approach",
-            "vibe": f"{dominant_trait.title()} yet {secondary_trait}"
-        }
-    
-    # Build compatibility based on choices
-    compatibility = []
-    if choice_patterns["social"] > 1:
-        compatibility.append("Social Connectors")
-    if choice_patterns["creative"] > 1:  
-        compatibility.append("Creative Souls")
-    if choice_patterns["adventure"] > 1:
-        compatibility.append("Adventure Seekers")
-    if choice_patterns["tech"] > 0:
-        compatibility.append("Tech Enthusiasts")
-    if not compatibility:
-        compatibility = ["Open-minded People", "Authentic Spirits"]
-    
-    return {
-        "personality_name": personality_data["name"],
-        "essence": personality_data["essence"],
-        "hidden_trait": personality_data["hidden_trait"],
-        "superpower": personality_data["superpower"],
-        "vibe_check": personality_data["vibe"],
-        "compatibility_vibes": compatibility[:2],
-        "personal_insight": f"Your combination of {answers[0] if answers else 'thoughtful'} and {answers[-1] if answers else 'balanced'} choices shows someone who thinks deeply about their preferences.",
-        "social_energy": f"You're {extroversion_percentage}% extroverted because you chose {answers[1] if len(answers) > 1 else 'social options'}, but also need {introversion_percentage}% introversion to recharge your creative energy.",
-        "extroversion_percentage": extroversion_percentage,
-        "introversion_percentage": introversion_percentage
-    }
+# Anonymized reading from a finished job, or None if the AI call failed
+def ai_job_result(job: ReadingJob) -> Optional[Dict[str, Any]]:
+    try:
+        return job.result()
+    except Exception:
+        return None
 
-# ADD this smart fallback parser:
-def parse_ai_response_smart(text: str) -> Dict[str, Any]:
-    """Smart parser that extracts personality data from text"""
-    result = {}
-    lines = text.split('\n')
-    
-    current_key = ""
-    current_value = ""
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Look for key patterns
-        if 'personality_name' in line.lower() or 'name:' in line.lower():
-            current_key = 'personality_name'
-            current_value = line.split(':', 1)[-1].strip().strip('"')
-        elif 'essence' in line.lower():
-            current_key = 'essence'
-            current_value = line.split(':', 1)[-1].strip().strip('"')
-        elif 'hidden_trait' in line.lower() or 'hidden' in line.lower():
-            current_key = 'hidden_trait'
-            current_value = line.split(':', 1)[-1].strip().strip('"')
-        elif 'superpower' in line.lower():
-            current_key = 'superpower'
-            current_value = line.split(':', 1)[-1].strip().strip('"')
-        elif 'vibe_check' in line.lower() or 'vibe' in line.lower():
-            current_key = 'vibe_check'
-            current_value = line.split(':', 1)[-1].strip().strip('"')
-        elif 'compatibility' in line.lower():
-            current_key = 'compatibility_vibes'
-            current_value = line.split(':', 1)[-1].strip().strip('"')
-        elif 'insight' in line.lower():
-            current_key = 'personal_insight'
-            current_value = line.split(':', 1)[-1].strip().strip('"')
-        elif 'social_energy' in line.lower() or 'social energy' in line.lower():
-            current_key = 'social_energy'
-            current_value = line.split(':', 1)[-1].strip().strip('"')
-        elif current_key and line and not ':' in line:
-            # Continue previous value
-            current_value += " " + line.strip().strip('"')
-        
-        if current_key and current_value:
-            if current_key == 'compatibility_vibes':
-                # Split compatibility into array
-                result[current_key] = [v.strip() for v in current_value.split(',')]
-            else:
-                result[current_key] = current_value
-    
-    return result
+# Generate AI personality analysis
+def generate_ai_personality(name: str, age_group: str, answer_indices: Tuple[int, ...]) -> Dict[str, Any]:
+    """Generate truly intelligent personality analysis based on actual user choices (blocks until ready)"""
+    reading = lookup_ai_reading(age_group, answer_indices, get_scoring_engine(age_group).score(answer_indices))
+    if reading is None:
+        job = submit_ai_personality(name, age_group, answer_indices)
+        reading = ai_job_result(job) if job is not None else None
+    return personalize_reading(reading, name) if reading is not None else None
 
 # Inject cosmic-themed CSS
-def inject_cosmic_css():
-    st.markdown("""
-    <style>
-    /* Import Google Fonts */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Space+Grotesk:wght@300;400;500;600;700&display=swap');
-    
-    /* Reset and base styles */
-    * {
-        margin: 0;
-        padding: 0;
-        box-sizing: border-box;
-    }
-    
-    /* Hide Streamlit branding and GitHub elements - COMPLETE REMOVAL */
-    #MainMenu {visibility: hidden !important;}
-    footer {visibility: hidden !important;}
-    .stDeployButton {display: none !important;}
-    header {visibility: hidden !important;}
-    .stDecoration {display: none !important;}
-
-    /* Hide GitHub icon and Streamlit elements */
-    .stApp > header {display: none !important;}
-    .stApp > .main > div > .block-container > div:first-child {display: none !important;}
-    iframe[title="streamlit_app"] {display: none !important;}
-
-    /* Hide top toolbar completely */
-    .stToolbar {display: none !important;}
-    div[data-testid="stToolbar"] {display: none !important;}
-    div[data-testid="stDecoration"] {display: none !important;}
-    div[data-testid="stStatusWidget"] {display: none !important;}
-
-    /* Hide GitHub corner and any branding */
-    .github-corner {display: none !important;}
-    .streamlit-container {border: none !important;}
-
-    /* Remove Streamlit's default padding and margins */
-    .main .block-container {
-        padding-top: 0 !important;
-        padding-bottom: 0 !important;
-        margin-top: 0 !important;
-    }
-
-    /* Hide any remaining Streamlit UI elements */
-    .stActionButton {display: none !important;}
-    button[title="View fullscreen"] {display: none !important;}
-    button[kind="header"] {display: none !important;}
-    
-    /* Make it look like a native app */
-    .stApp {
-        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 25%, #0f3460 50%, #533483 75%, #7209b7 100%);
-        min-height: 100vh;
-        position: relative;
-        overflow-x: hidden;
-        margin: 0 !important;
-        padding: 0 !important;
-    }
-    
-    /* Force full screen without browser UI elements showing */
-    html, body {
-        margin: 0 !important;
-        padding: 0 !important;
-        overflow-x: hidden !important;
-    }
-    
-    /* Prevent zoom on mobile (like native apps) */
-    input, select, textarea {
-        font-size: 16px !important;
-        touch-action: manipulation !important;
-    }
-    
-    /* Hide mobile browser UI elements when possible */
-    @media screen and (max-width: 768px) {
-        .stApp {
-            position: fixed !important;
-            top: 0 !important;
-            left: 0 !important;
-            right: 0 !important;
-            bottom: 0 !important;
-            overflow-y: auto !important;
-        }
-    }
-    
-    /* Remove any scrollbars that might show */
-    ::-webkit-scrollbar {
-        width: 0px !important;
-        background: transparent !important;
-    }
-    
-    /* Smooth scrolling for mobile */
-    html {
-        scroll-behavior: smooth !important;
-    }
-    
-    /* Animated stars background */
-    .stApp::before {
-        content: '';
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background-image: 
-            radial-gradient(2px 2px at 20px 30px, #fff, transparent),
-            radial-gradient(1px 1px at 40px 70px, rgba(255,255,255,0.8), transparent),
-            radial-gradient(1px 1px at 90px 40px, rgba(255,255,255,0.6), transparent),
-            radial-gradient(2px 2px at 130px 80px, rgba(255,255,255,0.4), transparent),
-            radial-gradient(1px 1px at 160px 30px, rgba(255,255,255,0.8), transparent);
-        background-repeat: repeat;
-        background-size: 200px 150px, 180px 120px, 220px 140px, 250px 160px, 190px 130px;
-        animation: twinkling 3s infinite;
-        pointer-events: none;
-        z-index: 0;
-    }
-    
-    @keyframes twinkling {
-        0% { opacity: 0.8; }
-        50% { opacity: 1; }
-        100% { opacity: 0.8; }
-    }
-    
-    /* Shooting star animation */
-    .shooting-star {
-        position: fixed;
-        top: 10%;
-        right: -100px;
-        width: 2px;
-        height: 2px;
-        background: #fff;
-        border-radius: 50%;
-        box-shadow: 0 0 10px #fff, 0 0 20px #fff, 0 0 30px #fff;
-        animation: shootingStar 8s linear infinite;
-        z-index: 1;
-    }
-    
-    @keyframes shootingStar {
-        0% {
-            transform: translateX(0) translateY(0);
-            opacity: 1;
-        }
-        70% {
-            opacity: 1;
-        }
-        100% {
-            transform: translateX(-1000px) translateY(500px);
-            opacity: 0;
-        }
-    }
-    
-    /* Cosmic silhouette */
-    .cosmic-silhouette {
-        position: fixed;
-        bottom: 0;
-        left: 0;
-        width: 100%;
-        height: 300px;
-        background: url("data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 1200 300'%3E%3Cpath d='M0,300 L1200,300 L1200,250 C1100,240 1000,230 900,235 C800,240 700,250 600,245 C500,240 400,225 300,235 C200,245 100,255 50,260 L0,265 Z' fill='%23000'/%3E%3C/svg%3E") bottom center/cover no-repeat;
-        z-index: 1;
-        pointer-events: none;
-    }
-    
-    /* Main content area */
-    .main-content {
-        position: relative;
-        z-index: 10;
-        min-height: 100vh;
-        padding: 2rem 1rem;
-    }
-    
-    /* Glass morphism cards */
-    .glass-card {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(20px);
-        border-radius: 20px;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-        padding: 2rem;
-        margin: 1rem auto;
-        max-width: 600px;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .glass-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 1px;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.4), transparent);
-    }
-    
-    /* Welcome page styles */
-    .welcome-title {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 3.5rem;
-        font-weight: 700;
-        color: #fff;
-        text-align: center;
-        margin-bottom: 1rem;
-        text-shadow: 0 0 20px rgba(255,255,255,0.5);
-        animation: fadeInUp 1s ease-out;
-    }
-    
-    .welcome-subtitle {
-        font-family: 'Inter', sans-serif;
-        font-size: 1.2rem;
-        color: rgba(255,255,255,0.8);
-        text-align: center;
-        margin-bottom: 3rem;
-        animation: fadeInUp 1s ease-out 0.3s both;
-    }
-    
-    @keyframes fadeInUp {
-        from {
-            opacity: 0;
-            transform: translateY(30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    /* Form elements */
-    .stTextInput > div > div > input {
-        background: rgba(255, 255, 255, 0.1) !important;
-        border: 1px solid rgba(255, 255, 255, 0.3) !important;
-        border-radius: 12px !important;
-        color: #fff !important;
-        font-family: 'Inter', sans-serif !important;
-        font-size: 1rem !important;
-        padding: 0.75rem 1rem !important;
-        backdrop-filter: blur(10px) !important;
-    }
-    
-    .stTextInput > div > div > input::placeholder {
-        color: rgba(255, 255, 255, 0.6) !important;
-    }
-    
-    .stTextInput > div > div > input:focus {
-        border-color: #7209b7 !important;
-        box-shadow: 0 0 0 2px rgba(114, 9, 183, 0.3) !important;
-    }
-    
-    /* Radio buttons */
-    .stRadio > div {
-        display: flex !important;
-        gap: 1rem !important;
-        justify-content: center !important;
-        flex-wrap: wrap !important;
-    }
-    
-    .stRadio > div > label {
-        background: rgba(255, 255, 255, 0.1) !important;
-        border: 1px solid rgba(255, 255, 255, 0.2) !important;
-        border-radius: 25px !important;
-        padding: 0.75rem 1.5rem !important;
-        color: #fff !important;
-        font-family: 'Inter', sans-serif !important;
-        cursor: pointer !important;
-        transition: all 0.3s ease !important;
-        backdrop-filter: blur(10px) !important;
-    }
-    
-    .stRadio > div > label:hover {
-        background: rgba(255, 255, 255, 0.2) !important;
-        border-color: #7209b7 !important;
-        transform: translateY(-2px) !important;
-    }
-    
-    /* Labels */
-    .form-label {
-        display: block;
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 1.1rem;
-        font-weight: 500;
-        color: #fff;
-        margin-bottom: 1rem;
-        text-align: center;
-    }
-    
-    /* Buttons */
-    .stButton > button {
-        background: linear-gradient(135deg, #7209b7, #533483) !important;
-        border: none !important;
-        border-radius: 25px !important;
-        color: #fff !important;
-        font-family: 'Space Grotesk', sans-serif !important;
-        font-size: 1.1rem !important;
-        font-weight: 600 !important;
-        padding: 0.75rem 2rem !important;
-        cursor: pointer !important;
-        transition: all 0.3s ease !important;
-        box-shadow: 0 4px 15px rgba(114, 9, 183, 0.4) !important;
-        width: 100% !important;
-        max-width: 300px !important;
-        margin: 0 auto !important;
-        display: block !important;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px) !important;
-        box-shadow: 0 6px 20px rgba(114, 9, 183, 0.6) !important;
-        background: linear-gradient(135deg, #8a2be2, #6a5acd) !important;
-    }
-    
-    /* Quiz page styles */
-    .question-container {
-        text-align: center;
-        animation: slideInFromSpace 0.8s ease-out;
-    }
-    
-    @keyframes slideInFromSpace {
-        from {
-            opacity: 0;
-            transform: translateY(-50px) scale(0.9);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0) scale(1);
-        }
-    }
-    
-    .question-number {
-        font-family: 'Inter', sans-serif;
-        font-size: 0.9rem;
-        color: rgba(255, 255, 255, 0.7);
-        margin-bottom: 1rem;
-        font-weight: 500;
-    }
-    
-    .cosmic-question {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 2rem;
-        font-weight: 600;
-        color: #fff;
-        margin-bottom: 2rem;
-        line-height: 1.3;
-        text-shadow: 0 0 10px rgba(255,255,255,0.3);
-    }
-    
-    /* Fix for 18-24 age group question visibility */
-    .cosmic-question.age-18_24 {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: #fff !important;
-        margin-bottom: 2rem;
-        line-height: 1.2;
-        text-shadow: 0 0 15px rgba(255, 107, 107, 0.6);
-        /* Remove problematic gradient text */
-        background: none !important;
-        -webkit-background-clip: unset !important;
-        -webkit-text-fill-color: #fff !important;
-        background-clip: unset !important;
-    }
-
-    /* Add a subtle gradient background instead */
-    .cosmic-question.age-18_24::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: linear-gradient(135deg, rgba(255, 107, 107, 0.1), rgba(255, 142, 83, 0.1));
-        border-radius: 10px;
-        z-index: -1;
-    }
-    
-    /* Option buttons */
-    .option-button {
-        background: rgba(255, 255, 255, 0.1) !important;
-        border: 1px solid rgba(255, 255, 255, 0.2) !important;
-        border-radius: 15px !important;
-        color: #fff !important;
-        font-family: 'Inter', sans-serif !important;
-        font-size: 1rem !important;
-        padding: 1rem 1.5rem !important;
-        margin: 0.5rem 0 !important;
-        cursor: pointer !important;
-        transition: all 0.3s ease !important;
-        backdrop-filter: blur(10px) !important;
-        width: 100% !important;
-        text-align: left !important;
-    }
-    
-    .option-button:hover {
-        background: rgba(255, 255, 255, 0.2) !important;
-        border-color: #7209b7 !important;
-        transform: translateX(10px) !important;
-    }
-    
-    /* Progress bar */
-    .cosmic-progress-container {
-        width: 100%;
-        height: 6px;
-        background: rgba(255, 255, 255, 0.1);
-        border-radius: 3px;
-        margin: 2rem 0;
-        overflow: hidden;
-    }
-    
-    .cosmic-progress-bar {
-        height: 100%;
-        background: linear-gradient(90deg, #7209b7, #533483, #0f3460);
-        border-radius: 3px;
-        transition: width 0.5s ease;
-        box-shadow: 0 0 10px rgba(114, 9, 183, 0.6);
-    }
-    
-    /* Results page styles */
-    .result-card {
-        text-align: center;
-        animation: cosmicReveal 1.2s ease-out;
-    }
-    
-    @keyframes cosmicReveal {
-        0% {
-            opacity: 0;
-            transform: scale(0.8) rotateY(180deg);
-        }
-        50% {
-            opacity: 0.5;
-            transform: scale(0.9) rotateY(90deg);
-        }
-        100% {
-            opacity: 1;
-            transform: scale(1) rotateY(0deg);
-        }
-    }
-    
-    .result-title {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 2rem;
-        font-weight: 700;
-        color: #fff;
-        margin-bottom: 1rem;
-        text-shadow: 0 0 20px rgba(255,255,255,0.5);
-    }
-    
-    .personality-name {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 2.5rem;
-        font-weight: 700;
-        background: linear-gradient(135deg, #7209b7, #533483, #0f3460);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin-bottom: 1.5rem;
-        text-shadow: 0 0 30px rgba(114, 9, 183, 0.8);
-    }
-    
-    .personality-description {
-        font-family: 'Inter', sans-serif;
-        font-size: 1.1rem;
-        color: rgba(255, 255, 255, 0.9);
-        line-height: 1.6;
-        margin-bottom: 2rem;
-    }
-    
-    .personality-traits {
-        display: flex;
-        gap: 1rem;
-        justify-content: center;
-        margin-bottom: 2rem;
-        flex-wrap: wrap;
-    }
-    
-    .trait-tag {
-        background: linear-gradient(135deg, #7209b7, #533483);
-        color: #fff;
-        padding: 0.5rem 1rem;
-        border-radius: 20px;
-        font-family: 'Inter', sans-serif;
-        font-size: 0.9rem;
-        font-weight: 500;
-        box-shadow: 0 4px 15px rgba(114, 9, 183, 0.4);
-    }
-    
-    .main-character-moment {
-        margin: 2rem 0;
-        padding: 1.5rem;
-        background: rgba(255, 255, 255, 0.05);
-        border-radius: 15px;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-    }
-    
-    .main-character-moment h3 {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 1.3rem;
-        color: #fff;
-        margin-bottom: 1rem;
-    }
-    
-    .main-character-moment em {
-        font-family: 'Inter', sans-serif;
-        font-size: 1rem;
-        color: rgba(255, 255, 255, 0.8);
-        font-style: italic;
-        line-height: 1.5;
-    }
-    
-    .compatibility {
-        margin: 2rem 0;
-        padding: 1.5rem;
-        background: rgba(255, 255, 255, 0.05);
-        border-radius: 15px;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-    }
-    
-    .compatibility h3 {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 1.2rem;
-        color: #fff;
-        margin-bottom: 1rem;
-    }
-    
-    .compatibility-types, .red-flag-type {
-        display: flex;
-        gap: 0.5rem;
-        justify-content: center;
-        flex-wrap: wrap;
-        margin-bottom: 1.5rem;
-    }
-    
-    .compatible-type {
-        background: rgba(0, 255, 127, 0.2);
-        border: 1px solid rgba(0, 255, 127, 0.4);
-        color: #00ff7f;
-        padding: 0.3rem 0.8rem;
-        border-radius: 15px;
-        font-family: 'Inter', sans-serif;
-        font-size: 0.9rem;
-    }
-    
-    .red-flag-type {
-        background: rgba(255, 69, 0, 0.2);
-        border: 1px solid rgba(255, 69, 0, 0.4);
-        color: #ff4500;
-        padding: 0.3rem 0.8rem;
-        border-radius: 15px;
-        font-family: 'Inter', sans-serif;
-        font-size: 0.9rem;
-        justify-content: center;
-    }
-    
-    /* Floating cosmic elements */
-    .cosmic-elements {
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        pointer-events: none;
-        overflow: hidden;
-    }
-    
-    .cosmic-star {
-        position: absolute;
-        width: 4px;
-        height: 4px;
-        background: #fff;
-        border-radius: 50%;
-        box-shadow: 0 0 10px #fff;
-        animation: float 3s ease-in-out infinite;
-    }
-    
-    .star1 { top: 20%; left: 10%; animation-delay: 0s; }
-    .star2 { top: 30%; right: 15%; animation-delay: 1s; }
-    .star3 { bottom: 40%; left: 20%; animation-delay: 2s; }
-    
-    @keyframes float {
-        0%, 100% { transform: translateY(0px); }
-        50% { transform: translateY(-10px); }
-    }
-    
-    /* Age-specific question styling */
-    .cosmic-question.age-18_24 {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: #fff;
-        margin-bottom: 2rem;
-        line-height: 1.2;
-        text-shadow: 0 0 15px rgba(255, 107, 107, 0.6);
-        background: linear-gradient(135deg, #ff6b6b, #ff8e53);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-
-    .cosmic-question.age-25_34 {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 1.6rem;
-        font-weight: 600;
-        color: #fff;
-        margin-bottom: 2rem;
-        line-height: 1.3;
-        text-shadow: 0 0 12px rgba(114, 9, 183, 0.5);
-    }
-
-    .cosmic-question.age-35_44 {
-        font-family: 'Inter', sans-serif;
-        font-size: 1.5rem;
-        font-weight: 500;
-        color: #fff;
-        margin-bottom: 2rem;
-        line-height: 1.4;
-        text-shadow: 0 0 10px rgba(83, 52, 131, 0.4);
-    }
-
-    .cosmic-question.age-45_54 {
-        font-family: 'Inter', sans-serif;
-        font-size: 1.4rem;
-        font-weight: 500;
-        color: #fff;
-        margin-bottom: 2rem;
-        line-height: 1.5;
-        text-shadow: 0 0 8px rgba(106, 90, 205, 0.3);
-    }
-
-    .cosmic-question.age-55plus {
-        font-family: 'Inter', sans-serif;
-        font-size: 1.3rem;
-        font-weight: 400;
-        color: #fff;
-        margin-bottom: 2rem;
-        line-height: 1.6;
-        text-shadow: 0 0 6px rgba(138, 43, 226, 0.2);
-    }
-
-    /* Age-specific button styling */
-    .age-18_24 .stButton > button {
-        background: linear-gradient(135deg, #ff6b6b, #ff8e53) !important;
-        border-radius: 20px !important;
-        font-weight: 700 !important;
-        text-transform: none !important;
-        box-shadow: 0 4px 15px rgba(255, 107, 107, 0.4) !important;
-    }
-
-    .age-18_24 .stButton > button:hover {
-        background: linear-gradient(135deg, #ff5252, #ff7043) !important;
-        transform: translateY(-3px) scale(1.02) !important;
-        box-shadow: 0 6px 20px rgba(255, 107, 107, 0.6) !important;
-    }
-
-    .age-25_34 .stButton > button {
-        background: linear-gradient(135deg, #7209b7, #533483) !important;
-        border-radius: 18px !important;
-        font-weight: 600 !important;
-    }
-
-    .age-35_44 .stButton > button {
-        background: linear-gradient(135deg, #0f3460, #533483) !important;
-        border-radius: 15px !important;
-        font-weight: 500 !important;
-    }
-
-    .age-45_54 .stButton > button {
-        background: linear-gradient(135deg, #533483, #6a5acd) !important;
-        border-radius: 12px !important;
-        font-weight: 500 !important;
-    }
-
-    .age-55plus .stButton > button {
-        background: linear-gradient(135deg, #6a5acd, #8a2be2) !important;
-        border-radius: 10px !important;
-        font-weight: 400 !important;
-    }
-
-    /* Age-specific glass card styling */
-    .age-18_24 .glass-card {
-        border: 2px solid rgba(255, 107, 107, 0.3) !important;
-        box-shadow: 0 8px 32px rgba(255, 107, 107, 0.2) !important;
-    }
-
-    .age-25_34 .glass-card {
-        border: 1px solid rgba(114, 9, 183, 0.3) !important;
-    }
-
-    .age-35_44 .glass-card {
-        border: 1px solid rgba(15, 52, 96, 0.3) !important;
-    }
-
-    .age-45_54 .glass-card {
-        border: 1px solid rgba(106, 90, 205, 0.3) !important;
-    }
-
-    .age-55plus .glass-card {
-        border: 1px solid rgba(138, 43, 226, 0.3) !important;
-    }
-    
-    /* Responsive design */
-    @media (max-width: 768px) {
-        .welcome-title {
-            font-size: 2.5rem;
-        }
-        
-        .cosmic-question {
-            font-size: 1.5rem;
-        }
-        
-        .personality-name {
-            font-size: 2rem;
-        }
-        
-        .glass-card {
-            margin: 1rem;
-            padding: 1.5rem;
-        }
-        
-        .stRadio > div {
-            flex-direction: column !important;
-            align-items: center !important;
-        }
-        
-        .stRadio > div > label {
-            width: 100% !important;
-            max-width: 300px !important;
-            text-align: center !important;
-        }
-        
-        /* Mobile responsive adjustments for age-specific styling */
-        .cosmic-question.age-18_24 {
-            font-size: 1.4rem;
-        }
-        
-        .cosmic-question.age-25_34 {
-            font-size: 1.3rem;
-        }
-        
-        .cosmic-question.age-35_44 {
-            font-size: 1.2rem;
-        }
-        
-        .cosmic-question.age-45_54 {
-            font-size: 1.15rem;
-        }
-        
-        .cosmic-question.age-55plus {
-            font-size: 1.1rem;
-        }
-    }
-    
-    /* Lottie animation container */
-    .lottie-container {
-        margin: 2rem 0;
-        display: flex;
-        justify-content: center;
-    }
-    
-    /* Error and success messages */
-    .stAlert {
-        background: rgba(255, 255, 255, 0.1) !important;
-        border: 1px solid rgba(255, 255, 255, 0.2) !important;
-        border-radius: 10px !important;
-        backdrop-filter: blur(10px) !important;
-        color: #fff !important;
-    }
-    /* Fix invisible personality name */
-    .personality-name {
-        font-family: 'Space Grotesk', sans-serif;
-        font-size: 2.2rem;
-        font-weight: 700;
-        color: #fff !important;
-        margin-bottom: 1rem;
-        text-shadow: 0 0 20px rgba(114, 9, 183, 0.6);
-        text-align: center;
-        line-height: 1.2;
-        /* Remove problematic gradient */
-        background: none !important;
-        -webkit-background-clip: unset !important;
-        -webkit-text-fill-color: #fff !important;
-        background-clip: unset !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-# Initialize session state for the entire app
+def inject_cosmic_css(age_group: Optional[str] = None):
+    # The shared theme is a static asset the browser fetches once; only the age group's overrides ride along each rerun
+    components.html(stylesheet_loader_html(stylesheet_url()), height=0)
+    override = age_override_css(age_group)
+    if override:
+        st.markdown(override, unsafe_allow_html=True)
+
+# Initialize session state for the entire app. Answers are kept as option positions, one byte each,
+# and the reading as a reference to the copy interned in the shared READING_TABLE plus its id;
+# option texts and traits are derived from them.
 def initialize_session_state():
     if 'page' not in st.session_state:
         st.session_state.page = 'welcome'
     if 'name' not in st.session_state:
         st.session_state.name = ""
-    if 'age_group' not in st.session_state:
-        st.session_state.age_group = ""
-    if 'current_question' not in st.session_state:
-        st.session_state.current_question = 0
-    if 'traits' not in st.session_state:
-        st.session_state.traits = { 'extroversion': 0, 'creativity': 0, 'ambition': 0, 'empathy': 0, 'adaptability': 0 }
-    if 'personality_type' not in st.session_state:
-        st.session_state.personality_type = None
-    if 'answers' not in st.session_state:
-        st.session_state.answers = []
-    if 'ai_personality' not in st.session_state:
-        st.session_state.ai_personality = None
+    if 'age_group_label' not in st.session_state:
+        st.session_state.age_group_label = ""
+    if 'answer_path' not in st.session_state:
+        st.session_state.answer_path = bytearray()
+    if 'reading_id' not in st.session_state:
+        st.session_state.reading_id = None
+    if 'reading' not in st.session_state:
+        st.session_state.reading = None
+    if 'ai_job' not in st.session_state:
+        st.session_state.ai_job = None
+    if 'share_image' not in st.session_state:
+        st.session_state.share_image = False
 
 # Reset the quiz state to start over
 def reset_quiz():
     st.session_state.page = 'welcome'
-    st.session_state.current_question = 0
-    st.session_state.traits = { 'extroversion': 0, 'creativity': 0, 'ambition': 0, 'empathy': 0, 'adaptability': 0 }
-    st.session_state.personality_type = None
-    st.session_state.answers = []
-    st.session_state.ai_personality = None
-
-# Update personality traits based on user's answer
-def update_traits(answer_index, selected_answer):
-    trait_impacts = {
-        0: {"extroversion": -2, "empathy": 2},
-        1: {"extroversion": -1, "creativity": 1, "empathy": 1, "adaptability": 1},
-        2: {"creativity": 2, "ambition": 1, "adaptability": 1},
-        3: {"extroversion": 1, "creativity": 1, "ambition": 2, "empathy": -1},
-        4: {"extroversion": 2, "ambition": 1, "empathy": -2, "adaptability": -1}
-    }
-    impact = trait_impacts.get(answer_index, {})
-    for trait, value in impact.items():
-        st.session_state.traits[trait] += value
-    
-    # Store the actual answer text
-    st.session_state.answers.append(selected_answer)
+    st.session_state.answer_path = bytearray()
+    st.session_state.reading_id = None
+    st.session_state.reading = None
+    st.session_state.ai_job = None
+    st.session_state.share_image = False
+
+# Option positions picked so far
+def session_answer_indices() -> Tuple[int, ...]:
+    return tuple(st.session_state.answer_path)
+
+# Option texts picked so far
+def session_answers() -> List[str]:
+    return get_content_store().snapshot().answer_texts(st.session_state.age_group_label, st.session_state.answer_path)
+
+# Trait scores of the answers so far
+def session_traits() -> Dict[str, int]:
+    return get_scoring_engine(st.session_state.age_group_label).score(session_answer_indices())
+
+# Offline reading built from the session's choices, anonymized
+def session_fallback_reading() -> Dict[str, Any]:
+    count('fallback_used')
+    with stage('fallback'):
+        reading = generate_smart_fallback(st.session_state.name, st.session_state.age_group_label,
+                                          session_answers(), session_traits())
+    return anonymize_reading(reading, st.session_state.name)
+
+# Keep an anonymized reading for this session, sharing one copy with every session that got it. The
+# session holds that copy itself, not just its id, so the table evicting it can't change the reading
+# mid-session (streamed and patched-up readings can't be rebuilt)
+def keep_reading(reading: Dict[str, Any]):
+    reading_id = READING_TABLE.intern(reading)
+    st.session_state.reading_id = reading_id
+    st.session_state.reading = READING_TABLE.get(reading_id) or reading
+
+# The session's reading, personalized
+def session_reading() -> Optional[Dict[str, Any]]:
+    if st.session_state.reading is None:
+        return None
+    return personalize_reading(st.session_state.reading, st.session_state.name)
 
 # Determine the final personality type
 def determine_personality(personalities):
     if not personalities: return None
-    final_traits = st.session_state.traits
-    highest_trait = max(final_traits, key=final_traits.get)
-    matching = [p for p in personalities if p.get('primary_trait', '').lower() == highest_trait.lower()]
-    return random.choice(matching) if matching else random.choice(personalities)
+    # Nearest personality centroid to the final trait scores
+    return get_scoring_engine(st.session_state.age_group_label).match(session_traits())
 
 # Add cosmic background elements
 def add_cosmic_elements():
@@ -1223,8 +385,6 @@ def render_welcome_page():
             if name:
                 st.session_state.name = name
                 st.session_state.age_group_label = age_group
-                age_map = {'18-24': 18, '25-34': 25, '35-44': 35, '45-54': 45, '55+': 55}
-                st.session_state.age = age_map[age_group]
                 st.session_state.page = 'quiz'
                 st.rerun()
             else:
@@ -1238,7 +398,7 @@ def render_quiz_page(questions, slang):
     # Add cosmic background elements
     add_cosmic_elements()
     
-    q_idx = st.session_state.current_question
+    q_idx = len(st.session_state.answer_path)
     
     # Get age-specific questions based on the selected age group
     age_group = st.session_state.age_group_label
@@ -1259,8 +419,6 @@ def render_quiz_page(questions, slang):
         st.session_state.page = 'ai_loading'
         st.rerun()
         return
-
-    question = age_questions[q_idx]
     
     # Main content wrapper
     st.markdown('<div class="main-content">', unsafe_allow_html=True)
@@ -1268,65 +426,73 @@ def render_quiz_page(questions, slang):
     # Create centered column
     col1, col2, col3 = st.columns([0.5, 3, 0.5])
     with col2:
-        st.markdown("<div class='glass-card question-container'>", unsafe_allow_html=True)
-        
-        # Question number indicator with age group styling
-        age_emoji = {
-            '18-24': '🔥',
-            '25-34': '✨', 
-            '35-44': '🌟',
-            '45-54': '💫',
-            '55+': '⭐'
-        }
-        
-        age_names = {
-            '18-24': 'Gen Z Vibes',
-            '25-34': 'Millennial Energy',
-            '35-44': 'Gen X Style', 
-            '45-54': 'Experienced Wisdom',
-            '55+': 'Classic Grace'
-        }
-        
-        current_emoji = age_emoji.get(age_group, '🌌')
-        current_name = age_names.get(age_group, 'Cosmic')
-        
-        st.markdown(f"<div class='question-number'>{current_emoji} Question {q_idx + 1} of {len(age_questions)} • {current_name}</div>", unsafe_allow_html=True)
-        
-        # Question text with age-appropriate styling
-        question_class = f"cosmic-question age-{age_group.replace('-', '_').replace('+', 'plus')}"
-        st.markdown(f'<h2 class="{question_class}">{question["text"]}</h2>', unsafe_allow_html=True)
-
-        # Display options with age-appropriate styling
-        for i, option in enumerate(question['options']):
-            if st.button(option, key=f"option_{i}"):
-                update_traits(i, option)
-                st.session_state.current_question += 1
-                if st.session_state.current_question >= len(age_questions):
-                    st.session_state.page = 'ai_loading'
-                st.rerun()
-        
-        # Custom progress bar with age-specific colors
-        progress_percent = ((q_idx + 1) / len(age_questions)) * 100
-        progress_colors = {
-            '18-24': 'linear-gradient(90deg, #ff6b6b, #ff8e53, #7209b7)',
-            '25-34': 'linear-gradient(90deg, #7209b7, #533483, #0f3460)',
-            '35-44': 'linear-gradient(90deg, #0f3460, #533483, #7209b7)', 
-            '45-54': 'linear-gradient(90deg, #533483, #7209b7, #8a2be2)',
-            '55+': 'linear-gradient(90deg, #8a2be2, #6a5acd, #7209b7)'
-        }
-        
-        progress_color = progress_colors.get(age_group, 'linear-gradient(90deg, #7209b7, #533483, #0f3460)')
-        
-        st.markdown(f"""
-        <div class="cosmic-progress-container">
-            <div class="cosmic-progress-bar" style="width: {progress_percent}%; background: {progress_color};"></div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
+        render_question_card(age_questions, age_group)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Record an answer before the next run starts, so a click costs one rerun instead of two
+def answer_question(option_index: int, question_count: int):
+    st.session_state.answer_path.append(option_index)
+    if len(st.session_state.answer_path) >= question_count:
+        st.session_state.page = 'ai_loading'
+
+# Question card, options and progress bar
+def render_question_card(age_questions, age_group):
+    q_idx = len(st.session_state.answer_path)
+    question = age_questions[q_idx]
+
+    st.markdown("<div class='glass-card question-container'>", unsafe_allow_html=True)
+    
+    # Question number indicator with age group styling
+    age_emoji = {
+        '18-24': '🔥',
+        '25-34': '✨', 
+        '35-44': '🌟',
+        '45-54': '💫',
+        '55+': '⭐'
+    }
+    
+    age_names = {
+        '18-24': 'Gen Z Vibes',
+        '25-34': 'Millennial Energy',
+        '35-44': 'Gen X Style', 
+        '45-54': 'Experienced Wisdom',
+        '55+': 'Classic Grace'
+    }
+    
+    current_emoji = age_emoji.get(age_group, '🌌')
+    current_name = age_names.get(age_group, 'Cosmic')
+    
+    st.markdown(f"<div class='question-number'>{current_emoji} Question {q_idx + 1} of {len(age_questions)} • {current_name}</div>", unsafe_allow_html=True)
+    
+    # Question text with age-appropriate styling
+    question_class = f"cosmic-question age-{age_group.replace('-', '_').replace('+', 'plus')}"
+    st.markdown(f'<h2 class="{question_class}">{question["text"]}</h2>', unsafe_allow_html=True)
+
+    # Display options with age-appropriate styling
+    for i, option in enumerate(question['options']):
+        st.button(option, key=f"option_{i}", on_click=answer_question, args=(i, len(age_questions)))
+    
+    # Custom progress bar with age-specific colors
+    progress_percent = ((q_idx + 1) / len(age_questions)) * 100
+    progress_colors = {
+        '18-24': 'linear-gradient(90deg, #ff6b6b, #ff8e53, #7209b7)',
+        '25-34': 'linear-gradient(90deg, #7209b7, #533483, #0f3460)',
+        '35-44': 'linear-gradient(90deg, #0f3460, #533483, #7209b7)', 
+        '45-54': 'linear-gradient(90deg, #533483, #7209b7, #8a2be2)',
+        '55+': 'linear-gradient(90deg, #8a2be2, #6a5acd, #7209b7)'
+    }
+    
+    progress_color = progress_colors.get(age_group, 'linear-gradient(90deg, #7209b7, #533483, #0f3460)')
+    
+    st.markdown(f"""
+    <div class="cosmic-progress-container">
+        <div class="cosmic-progress-bar" style="width: {progress_percent}%; background: {progress_color};"></div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+
 # --- AI Loading Page --- #
 def render_ai_loading_page():
     """Show loading screen while AI generates personality"""
@@ -1347,46 +513,52 @@ def render_ai_loading_page():
             <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; 
                        color: rgba(255,255,255,0.7);">Revealing your hidden cosmic traits</div>
         </div>
-        <style>
-        @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
-        </style>
         """, unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # Generate AI analysis
-    time.sleep(2)
-    ai_result = generate_ai_personality(
-        st.session_state.name, 
-        st.session_state.age_group_label,
-        st.session_state.answers,
-        st.session_state.traits
-    )
-    
-    if ai_result:
-        st.session_state.ai_personality = ai_result
-        st.session_state.page = 'ai_results'
-        st.rerun()
-    else:
-        # Create intelligent fallback based on actual choices
-        fallback_personality = generate_smart_fallback(
-            st.session_state.name,
-            st.session_state.age_group_label, 
-            st.session_state.answers,
-            st.session_state.traits
+    # Start the AI reading once; reruns pick up the same job handle instead of asking again
+    job = st.session_state.ai_job
+    stream = get_stream_readings()
+    ai_result = None
+    if job is None:
+        ai_result = lookup_ai_reading(
+            st.session_state.age_group_label,
+            session_answer_indices(),
+            session_traits()
         )
-        st.session_state.ai_personality = fallback_personality
+        if ai_result is None:
+            job = submit_ai_personality(
+                st.session_state.name, 
+                st.session_state.age_group_label,
+                session_answer_indices(),
+                stream=stream
+            )
+            st.session_state.ai_job = job
+    
+    if job is not None and stream:
+        # The results page fills in each card as its field streams in
         st.session_state.page = 'ai_results'
         st.rerun()
+    
+    if job is not None:
+        # Wait at most one poll interval, then rerun and poll again while the spinner stays up
+        wait([job.future], timeout=AI_POLL_INTERVAL)
+        if not job.done():
+            st.rerun()
+        ai_result = ai_job_result(job)
+        st.session_state.ai_job = None
+    
+    # No AI reading: create an intelligent fallback based on actual choices
+    keep_reading(ai_result or session_fallback_reading())
+    st.session_state.page = 'ai_results'
+    st.rerun()
 
 def render_results_page(personalities):
     # Add cosmic background elements
     add_cosmic_elements()
     
-    if 'personality_type' not in st.session_state or not st.session_state.personality_type:
-        st.session_state.personality_type = determine_personality(personalities)
-
-    personality = st.session_state.personality_type
+    personality = determine_personality(personalities)
     if not personality: 
         st.error("Could not determine your cosmic personality. Please try again.")
         if st.button("Try Again", key="try_again_error"): 
@@ -1400,96 +572,17 @@ def render_results_page(personalities):
     # Create centered column layout
     col1, col2, col3 = st.columns([0.2, 3, 0.2])
     with col2:
-        st.markdown('<div class="glass-card result-card">', unsafe_allow_html=True)
-        
-        # Results content - COMPACT VERSION
-        st.markdown(f'<h1 class="result-title">The stars have aligned, {st.session_state.name}!</h1>', unsafe_allow_html=True)
-        
-        # FIXED: Visible personality name
-        st.markdown(f'''
-        <h2 style="font-family: 'Space Grotesk', sans-serif; font-size: 2.2rem; font-weight: 700; 
-                   color: #fff; margin-bottom: 1rem; text-align: center; line-height: 1.2;">
-            {personality.get("name", "N/A")}
-        </h2>
-        ''', unsafe_allow_html=True)
-        
-        # Compact personality traits
-        st.markdown(f'''
-        <div style="display: flex; gap: 0.8rem; justify-content: center; margin-bottom: 1.5rem; flex-wrap: wrap;">
-            <div style="background: linear-gradient(135deg, #7209b7, #533483); color: #fff; padding: 0.4rem 1rem; 
-                       border-radius: 20px; font-size: 0.85rem; font-weight: 500;">
-                {personality.get("primary_trait", "").capitalize()}
-            </div>
-            <div style="background: linear-gradient(135deg, #7209b7, #533483); color: #fff; padding: 0.4rem 1rem; 
-                       border-radius: 20px; font-size: 0.85rem; font-weight: 500;">
-                {personality.get("secondary_trait", "").capitalize()}
-            </div>
-        </div>
-        ''', unsafe_allow_html=True)
-        
-        # Compact description
-        st.markdown(f'''
-        <p style="font-family: 'Inter', sans-serif; font-size: 1rem; color: rgba(255,255,255,0.9); 
-                  line-height: 1.5; margin-bottom: 1.5rem; text-align: center;">
-            {personality.get("description", "")}
-        </p>
-        ''', unsafe_allow_html=True)
-        
-        # Compact main character moment
-        st.markdown(f'''
-        <div style="background: rgba(255,255,255,0.05); border-radius: 15px; padding: 1.2rem; margin-bottom: 1.5rem;">
-            <h3 style="font-family: 'Space Grotesk', sans-serif; font-size: 1.1rem; color: #fff; 
-                      margin-bottom: 0.8rem; text-align: center;">✨ Your Cosmic Moment ✨</h3>
-            <em style="font-family: 'Inter', sans-serif; font-size: 0.95rem; color: rgba(255,255,255,0.8); 
-                     font-style: italic; line-height: 1.4; display: block; text-align: center;">
-                "{personality.get("main_character_moment", "")}"
-            </em>
-        </div>
-        ''', unsafe_allow_html=True)
-        
-        # Compact compatibility section
-        st.markdown(f'''
-        <div style="background: rgba(255,255,255,0.05); border-radius: 15px; padding: 1.2rem; margin-bottom: 1.5rem;">
-            <h3 style="font-family: 'Space Grotesk', sans-serif; font-size: 1rem; color: #fff; 
-                      margin-bottom: 0.8rem; text-align: center;">🌟 Your Cosmic Compatibility</h3>
-            <div style="display: flex; gap: 0.6rem; justify-content: center; flex-wrap: wrap; margin-bottom: 1rem;">
-        ''', unsafe_allow_html=True)
-        
-        for compatible_type in personality.get('compatible_with', []):
-            st.markdown(f'''
-            <div style="background: rgba(0,255,127,0.2); border: 1px solid rgba(0,255,127,0.4); 
-                       color: #00ff7f; padding: 0.3rem 0.8rem; border-radius: 15px; 
-                       font-size: 0.8rem; text-align: center;">
-                {compatible_type}
-            </div>
-            ''', unsafe_allow_html=True)
-        
-        st.markdown(f'''
-            </div>
-            <h3 style="font-family: 'Space Grotesk', sans-serif; font-size: 1rem; color: #fff; 
-                      margin-bottom: 0.8rem; text-align: center;">⚠️ Your Cosmic Warning Sign</h3>
-            <div style="background: rgba(255,69,0,0.2); border: 1px solid rgba(255,69,0,0.4); 
-                       color: #ff4500; padding: 0.5rem 1rem; border-radius: 15px; 
-                       font-size: 0.8rem; text-align: center; margin: 0 auto; display: inline-block; width: fit-content;">
-                {personality.get("red_flag_type", "")}
-            </div>
-        </div>
-        ''', unsafe_allow_html=True)
-        
-        # Share prompt
-        st.markdown('''
-        <div style="background: rgba(114,9,183,0.1); border-radius: 15px; padding: 1.2rem; margin-bottom: 1.5rem; text-align: center;">
-            <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; color: rgba(255,255,255,0.9); 
-                       line-height: 1.4; margin-bottom: 0.4rem;">
-                Screenshot this cosmic reading and share your vibe! ✨
-            </div>
-            <div style="font-family: 'Inter', sans-serif; font-size: 0.75rem; color: rgba(255,255,255,0.6);">
-                Tag friends to discover their cosmic personality
-            </div>
-        </div>
-        ''', unsafe_allow_html=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        if personality.get('avatar_animation'):
+            animation = load_lottie(personality['avatar_animation'])
+            if animation:
+                st_lottie(animation, height=180, key="avatar_animation")
+
+        # The whole card in one block, rendered once per personality and name
+        key = ('results', personality.get('name'), st.session_state.name)
+        card = get_card_cache().get(key)
+        if card is None:
+            card = get_card_cache().put(key, results_card(personality, st.session_state.name))
+        st.markdown(card, unsafe_allow_html=True)
 
         # Compact restart button
         if st.button("✨ Take Another Cosmic Journey ✨", key="restart_button"):
@@ -1498,178 +591,75 @@ def render_results_page(personalities):
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Fields streamed so far, personalized and with the locally computed social energy split
+def streamed_personality(job: ReadingJob) -> Dict[str, Any]:
+    personality = personalize_reading(job.partial(), st.session_state.name)
+    personality['extroversion_percentage'], personality['introversion_percentage'] = social_energy_split(session_traits())
+    return personality
+
+# The finished card for this session's reading, rendered once per reading and name
+def finished_ai_card() -> str:
+    key = ('ai_results', st.session_state.reading_id, st.session_state.name)
+    card = get_card_cache().get(key)
+    if card is None:
+        card = get_card_cache().put(key, ai_results_card(session_reading(), st.session_state.name))
+    return card
+
+# Wait at most one poll interval, then rerun to redraw the card with whatever has streamed in since;
+# once the job is done, keep its reading and rerun with the finished card
+def poll_ai_stream(job: ReadingJob):
+    wait([job.future], timeout=STREAM_POLL_INTERVAL)
+    if not job.done():
+        st.rerun()
+    
+    # If the stream broke off, fall back to the reading built from their choices
+    keep_reading(ai_job_result(job) or session_fallback_reading())
+    st.session_state.ai_job = None
+    st.rerun()
+
+# Share image of the finished reading, rendered once per card and served from disk after that
+def render_share_image():
+    if not st.session_state.share_image:
+        st.button("📸 Create Share Image", key="share_button",
+                  on_click=lambda: st.session_state.update(share_image=True))
+        return
+    try:
+        image = get_share_cards().render(session_reading(), st.session_state.name, 'png')
+    except OSError as e:
+        st.warning(f"Couldn't create the share image: {e}")
+        return
+    st.image(image, use_column_width=True)
+    st.download_button("⬇️ Download Image", data=image, file_name="cosmic-identity.png", mime="image/png",
+                       key="share_download")
+
 def render_ai_results_page():
     """Display authentic AI-generated personality results"""
     add_cosmic_elements()
     
-    if not st.session_state.ai_personality:
+    # While a streamed reading is arriving there is a job but no finished reading yet
+    job = st.session_state.ai_job
+    has_reading = st.session_state.reading_id is not None
+    streaming = job is not None and not has_reading
+    if not has_reading and not streaming:
         st.session_state.page = 'results'
         st.rerun()
         return
     
-    personality = st.session_state.ai_personality
+    if streaming:
+        card = ai_results_card(streamed_personality(job), st.session_state.name, streaming=True)
+    else:
+        card = finished_ai_card()
     
     st.markdown('<div class="main-content">', unsafe_allow_html=True)
     # MOBILE OPTIMIZED: Wider content area
     col1, col2, col3 = st.columns([0.05, 4, 0.05])
     with col2:
-        st.markdown('<div class="glass-card result-card">', unsafe_allow_html=True)
-        
-        # MOBILE: Compact title
-        st.markdown(f'''
-        <h1 style="font-family: 'Space Grotesk', sans-serif; font-size: 1.4rem; font-weight: 700; 
-                   color: #fff; margin-bottom: 0.8rem; text-align: center; line-height: 1.2;">
-            ✨ {st.session_state.name}\'s Cosmic Identity ✨
-        </h1>
-        ''', unsafe_allow_html=True)
-        
-        # MOBILE: Smaller personality name
-        st.markdown(f'''
-        <h2 style="font-family: 'Space Grotesk', sans-serif; font-size: 1.8rem; font-weight: 700; 
-                   color: #fff; margin-bottom: 1rem; text-align: center; line-height: 1.1;
-                   text-shadow: 0 0 20px rgba(114, 9, 183, 0.8);">
-            {personality.get("personality_name", "Cosmic Soul")}
-        </h2>
-        ''', unsafe_allow_html=True)
+        # Title, cards and share call-to-action as one block, redrawn in place on each rerun while streaming
+        st.markdown(card, unsafe_allow_html=True)
         
-        # MOBILE: Compact essence
-        if personality.get("essence"):
-            st.markdown(f'''
-            <div style="background: linear-gradient(135deg, rgba(114, 9, 183, 0.2), rgba(83, 52, 131, 0.2)); 
-                        border: 1px solid rgba(114, 9, 183, 0.4); border-radius: 15px; 
-                        padding: 1rem; margin: 1rem 0; text-align: center;">
-                <div style="font-family: 'Space Grotesk', sans-serif; font-size: 1rem; font-weight: 600; 
-                           color: #fff; line-height: 1.3;">
-                    {personality["essence"]}
-                </div>
-            </div>
-            ''', unsafe_allow_html=True)
-        
-        # MOBILE OPTIMIZED: Social Energy Percentage - PROPER STREAMLIT COMPONENTS
-        if personality.get("extroversion_percentage") is not None:
-            extro_pct = personality.get("extroversion_percentage", 50)
-            intro_pct = personality.get("introversion_percentage", 50)
-            
-            st.markdown(f'''
-            <div style="background: rgba(255, 255, 255, 0.08); border-radius: 15px; padding: 1.2rem; margin: 1.2rem 0;">
-                <div style="font-family: 'Space Grotesk', sans-serif; font-size: 0.9rem; color: #fff; margin-bottom: 0.8rem; font-weight: 600; text-align: center;">
-                    ⚡ Your Social Energy
-                </div>
-            </div>
-            ''', unsafe_allow_html=True)
-            
-            # Use Streamlit's native progress components instead of raw HTML
-            st.markdown("**Extroversion**")
-            st.progress(extro_pct / 100, text=f"{extro_pct}%")
-            
-            st.markdown("**Introversion**")  
-            st.progress(intro_pct / 100, text=f"{intro_pct}%")
-            
-            # MOBILE: Compact AI insight
-            if personality.get("social_energy"):
-                st.markdown(f'''
-                <div style="font-family: 'Inter', sans-serif; font-size: 0.8rem; color: rgba(255, 255, 255, 0.9); 
-                           line-height: 1.3; font-style: italic; text-align: center; margin: 1rem 0;">
-                    💡 {personality["social_energy"]}
-                </div>
-                ''', unsafe_allow_html=True)
-        
-        # MOBILE: Compact hidden trait
-        if personality.get("hidden_trait"):
-            st.markdown(f'''
-            <div style="background: linear-gradient(135deg, rgba(255, 107, 107, 0.25), rgba(255, 142, 83, 0.25)); 
-                        border: 2px solid rgba(255, 107, 107, 0.5); border-radius: 15px; 
-                        padding: 1.2rem; margin: 1.2rem 0; text-align: center; position: relative;">
-                <div style="position: absolute; top: 10px; right: 15px; font-size: 1.2rem;">🔮</div>
-                <div style="font-family: 'Space Grotesk', sans-serif; font-size: 1rem; color: #ff6b6b; 
-                           margin-bottom: 0.8rem; font-weight: 700;">Mind = Blown 🤯</div>
-                <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; color: #fff; 
-                           line-height: 1.4; font-weight: 500; font-style: italic;">
-                    {personality["hidden_trait"]}
-                </div>
-            </div>
-            ''', unsafe_allow_html=True)
-        
-        # MOBILE: Single column layout for stats
-        if personality.get("superpower"):
-            st.markdown(f'''
-            <div style="background: rgba(114, 9, 183, 0.15); border-radius: 15px; 
-                       padding: 1rem; margin: 1rem 0; text-align: center;">
-                <div style="font-size: 1.2rem; margin-bottom: 0.4rem;">⚡</div>
-                <div style="font-family: 'Space Grotesk', sans-serif; font-size: 0.8rem; 
-                           color: #7209b7; margin-bottom: 0.5rem; font-weight: 600;">Your Superpower</div>
-                <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; color: #fff; 
-                           line-height: 1.3; font-weight: 500;">
-                    {personality["superpower"]}
-                </div>
-            </div>
-            ''', unsafe_allow_html=True)
-        
-        if personality.get("vibe_check"):
-            st.markdown(f'''
-            <div style="background: rgba(0, 255, 127, 0.15); border-radius: 15px; 
-                       padding: 1rem; margin: 1rem 0; text-align: center;">
-                <div style="font-size: 1.2rem; margin-bottom: 0.4rem;">✨</div>
-                <div style="font-family: 'Space Grotesk', sans-serif; font-size: 0.8rem; 
-                           color: #00ff7f; margin-bottom: 0.5rem; font-weight: 600;">Your Energy</div>
-                <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; color: #fff; 
-                           line-height: 1.3; font-weight: 500;">
-                    {personality["vibe_check"]}
-                </div>
-            </div>
-            ''', unsafe_allow_html=True)
-        
-        # MOBILE: Compact personal insight
-        if personality.get("personal_insight"):
-            st.markdown(f'''
-            <div style="background: rgba(255, 255, 255, 0.08); border-radius: 15px; 
-                       padding: 1.2rem; margin: 1.2rem 0; text-align: center;">
-                <div style="font-family: 'Space Grotesk', sans-serif; font-size: 0.9rem; 
-                           color: #fff; margin-bottom: 0.6rem; font-weight: 600;">💡 Personal Insight</div>
-                <div style="font-family: 'Inter', sans-serif; font-size: 0.85rem; color: rgba(255, 255, 255, 0.9); 
-                           line-height: 1.4; font-style: italic;">
-                    {personality["personal_insight"]}
-                </div>
-            </div>
-            ''', unsafe_allow_html=True)
-        
-        # MOBILE: Compact compatibility
-        if personality.get("compatibility_vibes"):
-            st.markdown('''
-            <div style="background: rgba(255, 255, 255, 0.08); border-radius: 15px; 
-                       padding: 1.2rem; margin: 1.2rem 0;">
-                <div style="font-family: 'Space Grotesk', sans-serif; font-size: 0.9rem; color: #fff; 
-                           margin-bottom: 0.8rem; font-weight: 600; text-align: center;">💫 You Vibe With</div>
-                <div style="display: flex; gap: 0.5rem; justify-content: center; flex-wrap: wrap;">
-            ''', unsafe_allow_html=True)
-            
-            vibes = personality["compatibility_vibes"] if isinstance(personality["compatibility_vibes"], list) else [personality["compatibility_vibes"]]
-            for vibe in vibes[:3]:
-                st.markdown(f'''
-                <div style="background: rgba(0, 255, 127, 0.2); border: 1px solid rgba(0, 255, 127, 0.4); 
-                           color: #00ff7f; padding: 0.4rem 0.8rem; border-radius: 20px; 
-                           font-family: 'Inter', sans-serif; font-size: 0.75rem; font-weight: 500; text-align: center;">
-                    {vibe}
-                </div>
-                ''', unsafe_allow_html=True)
-            st.markdown('</div></div>', unsafe_allow_html=True)
-        
-        # MOBILE: Compact share call-to-action
-        st.markdown(f'''
-        <div style="background: linear-gradient(135deg, rgba(114, 9, 183, 0.2), rgba(83, 52, 131, 0.1)); 
-                    border: 1px solid rgba(114, 9, 183, 0.3); border-radius: 15px; 
-                    padding: 1.2rem; margin: 1.5rem 0; text-align: center;">
-            <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; color: rgba(255, 255, 255, 0.95); 
-                       line-height: 1.4; margin-bottom: 0.4rem; font-weight: 500;">
-                This reading was created by analyzing your actual choices 🎯
-            </div>
-            <div style="font-family: 'Inter', sans-serif; font-size: 0.75rem; color: rgba(255, 255, 255, 0.7);">
-                Screenshot & share • Tag friends to discover their cosmic identity
-            </div>
-        </div>
-        ''', unsafe_allow_html=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        # Image of the reading to post, drawn only once someone asks for it
+        if not streaming:
+            render_share_image()
         
         # MOBILE: Compact restart button
         if st.button("🔮 Discover Another Identity", key="restart_button"):
@@ -1677,35 +667,109 @@ def render_ai_results_page():
             st.rerun()
     
     st.markdown('</div>', unsafe_allow_html=True)
+    
+    if streaming:
+        poll_ai_stream(job)
+
+# Prometheus endpoint and/or JSON log line for the telemetry, once per process
+@st.cache_resource
+def start_telemetry_exporters():
+    return start_exporters(os.environ)
 
 # --- Main Application --- #
 def main():
-    # Inject our cosmic CSS
-    inject_cosmic_css()
+    try:
+        start_telemetry_exporters()
+    except SettingsError as e:
+        st.warning(f"Metrics export disabled - {e}")
     initialize_session_state()
+    page = st.session_state.page
+    # Inject our cosmic CSS (the age-specific question styles only matter on the quiz page)
+    with stage('css_injection'):
+        inject_cosmic_css(st.session_state.get('age_group_label') if page == 'quiz' else None)
 
-    # Load all required data
-    questions = load_data('data/questions.json')
-    personalities = load_data('data/personalities.json')
-    slang = load_data('data/slang.json')
-
-    if not all([questions, personalities, slang]):
+    # Load all required data (parsed once per process, not once per rerun)
+    try:
+        with stage('data_load'):
+            content = get_content_store().snapshot()
+    except ContentError as e:
+        st.error(f"Error loading {e}")
         st.error("Failed to load essential data. The app cannot continue.")
         return
+    questions, slang = content.questions, content.slang
 
     # Page routing - FORCE AI FLOW ONLY
-    if st.session_state.page == 'welcome':
-        render_welcome_page()
-    elif st.session_state.page == 'quiz':
-        render_quiz_page(questions, slang)
-    elif st.session_state.page == 'ai_loading':
-        render_ai_loading_page()
-    elif st.session_state.page == 'ai_results':
-        render_ai_results_page()
-    elif st.session_state.page == 'results':
-        # FORCE REDIRECT TO AI FLOW - NO MORE OLD RESULTS!
-        st.session_state.page = 'ai_loading'
-        st.rerun()
+    with stage(f'render_{page}'):
+        if page == 'welcome':
+            render_welcome_page()
+        elif page == 'quiz':
+            render_quiz_page(questions, slang)
+        elif page == 'ai_loading':
+            render_ai_loading_page()
+        elif page == 'ai_results':
+            render_ai_results_page()
+        elif page == 'results':
+            # FORCE REDIRECT TO AI FLOW - NO MORE OLD RESULTS!
+            st.session_state.page = 'ai_loading'
+            st.rerun()
+
+    render_debug_panel()
+
+# Operational stats, shown when the URL has ?debug=http, ?debug=metrics and/or ?debug=profile. They
+# expose paths, usage and internal state, so only admins holding VIBE_PROFILE_TOKEN (&profile_token=) see them
+def render_debug_panel():
+    params = st.experimental_get_query_params()
+    panels = params.get('debug', [])
+    if not panels:
+        return
+    try:
+        profiler = get_profiler()
+    except SettingsError:
+        return
+    if not profiler.authorized(params.get('profile_token', [None])[0]):
+        return
+    if 'metrics' in panels:
+        st.json(TELEMETRY.snapshot())
+    if 'profile' in panels:
+        st.json(profiler.recent())
+    if 'http' in panels:
+        try:
+            usage = get_llm_backend().usage.stats()
+        except LLMConfigError as e:
+            usage = str(e)
+        st.json({'http': get_http_session().stats.snapshot(), 'ai_jobs': get_reading_jobs().stats(),
+                 'admission': get_admission().stats(), 'retries': get_retry_policy().stats(), 'llm_usage': usage,
+                 'reading_cache': get_reading_cache().stats()})
+
+# Profile this rerun? VIBE_PROFILE=N covers the next N reruns of any session, and
+# ?profile=N&profile_token=<VIBE_PROFILE_TOKEN> the next N reruns of this one
+def should_profile(profiler: RerunProfiler) -> bool:
+    params = st.experimental_get_query_params()
+    request = params.get('profile', [None])[0]
+    if request is not None and profiler.authorized(params.get('profile_token', [None])[0]):
+        if st.session_state.get('profile_request') != request:
+            st.session_state.profile_request = request
+            st.session_state.profile_reruns = min(int(request), MAX_PROFILED_RERUNS) if request.isdigit() else 0
+        if st.session_state.profile_reruns > 0:
+            st.session_state.profile_reruns -= 1
+            return True
+    return profiler.claim()
+
+# main(), under the profiler when should_profile() says so
+def run_app():
+    try:
+        profiler = get_profiler()
+    except SettingsError as e:
+        st.warning(f"Profiling disabled - {e}")
+        profiler = None
+    if profiler is None or not should_profile(profiler):
+        main()
+        return
+    # A rerun that ends in st.rerun() is still written out; ?debug=profile lists it
+    report = profiler.run(main, st.session_state.get('page', 'welcome'))
+    with st.expander(f"⏱️ Profile of this {report['page']} rerun ({report['wall_ms']} ms)"):
+        st.caption(report['path'])
+        st.code(format_summary(report['top']), language=None)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run_app()
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""Score quiz submissions from JSONL or CSV without Streamlit, streaming records in and results out.
+
+Usage:
+    python batch_score.py submissions.jsonl -o scored.jsonl
+    python batch_score.py submissions.csv --readings fallback --workers 8 > scored.jsonl
+    OPENAI_API_KEY=... python batch_score.py submissions.jsonl --readings ai --concurrency 8 -o scored.jsonl
+
+Each record has an age_group and its answers in question order, as option positions or
+option texts, plus an optional id and name:
+
+    {"id": "s-1", "name": "Ada", "age_group": "18-24", "answers": [0, 3, 1, 4, 2]}
+
+CSV files use the same columns, with answers as a JSON array, '|'-separated, or as
+answer_1..answer_N columns. Each output line has the record's id (its line number when it
+has none), answer positions, trait scores and matched personality, plus a reading with
+--readings fallback or ai, or an error when the record can't be scored. Output is in input
+order. Scoring runs in chunks on a process pool; AI readings go through the shared reading
+cache, the VIBE_LLM_* rate budget and retry policy, with one request per answer path in flight.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from content_store import ContentStore, ContentSnapshot
+from reading_cache import ReadingCache, reading_key, anonymize_reading, personalize_reading
+from oracle import (
+    PROMPT_STYLES, prompt_style_from_settings, reading_version, generate_reading, generate_smart_fallback,
+    is_complete_reading, precompile_choice_categories
+)
+from precompute import PRECOMPUTE_NAME
+from http_client import PooledSession
+from admission import AdmissionController, AdmittedBackend, admission_from_settings
+from resilience import RetryPolicy, retry_policy_from_settings
+from llm_backends import LLMBackend, LLMConfigError, llm_settings, backend_from_settings
+from scoring import TRAITS, engine_for
+
+READING_MODES = ('none', 'fallback', 'ai')
+CHUNK_SIZE = 2000
+PROGRESS_EVERY = 100000
+
+
+# --- Input --- #
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Records one at a time from a file or '-' for stdin; fmt is jsonl or csv (by default, from the extension)"""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    f = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+    try:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+            return
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = {'_error': f"invalid JSON on line {number}: {e}"}
+            yield record if isinstance(record, dict) else {'_error': f"line {number} is not an object"}
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def record_answers(record: Dict[str, Any]) -> List[Any]:
+    """The record's answers from answers (a list, JSON array or '|'-separated string) or answer_N columns"""
+    answers = record.get('answers', record.get('answer_indices'))
+    if answers is None:
+        columns = sorted((k for k in record if k.startswith('answer_') and k[7:].isdigit()), key=lambda k: int(k[7:]))
+        return [record[k] for k in columns if record[k] not in (None, '')]
+    if isinstance(answers, str):
+        answers = answers.strip()
+        if answers.startswith('['):
+            return json.loads(answers)
+        return answers.split('|') if answers else []
+    if not isinstance(answers, list):
+        raise ValueError("answers must be a list")
+    return answers
+
+def answer_positions(snapshot: ContentSnapshot, age_group: str, answers: Sequence[Any]) -> Tuple[int, ...]:
+    """Option positions for answers given as positions or option texts; raises ValueError"""
+    questions = snapshot.questions[age_group]
+    if len(answers) != len(questions):
+        raise ValueError(f"expected {len(questions)} answers, got {len(answers)}")
+    positions = []
+    for number, (question, answer) in enumerate(zip(questions, answers), 1):
+        if (isinstance(answer, int) and not isinstance(answer, bool)) or (isinstance(answer, str) and answer.strip().isdigit()):
+            position = int(answer)
+            if not 0 <= position < len(question['options']):
+                raise ValueError(f"answer {number}: no option {position}")
+        else:
+            position = snapshot.option_index[age_group][number - 1].get(answer)
+            if position is None:
+                raise ValueError(f"answer {number}: unknown option {answer!r}")
+        positions.append(position)
+    return tuple(positions)
+
+
+# --- Scoring, in the worker processes --- #
+
+_snapshot: Optional[ContentSnapshot] = None
+
+def _worker_snapshot() -> ContentSnapshot:
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = ContentStore(on_load=[precompile_choice_categories]).snapshot()
+    return _snapshot
+
+def score_chunk(chunk: List[Tuple[int, Dict[str, Any]]], readings: str = 'none') -> List[Tuple[str, Dict[str, Any]]]:
+    """(name, result) for each (record number, record), scored in one batch per age group"""
+    snapshot = _worker_snapshot()
+    scored: List[Tuple[str, Dict[str, Any]]] = []
+    groups: Dict[str, List[int]] = {}
+    for number, record in chunk:
+        result = {'id': record.get('id') or number}
+        scored.append((str(record.get('name') or '').strip() or PRECOMPUTE_NAME, result))
+        try:
+            if '_error' in record:
+                raise ValueError(record['_error'])
+            age_group = str(record.get('age_group') or '').strip()
+            if age_group not in snapshot.questions:
+                raise ValueError(f"unknown age group {age_group!r}")
+            result['age_group'] = age_group
+            result['answer_indices'] = answer_positions(snapshot, age_group, record_answers(record))
+        except (ValueError, TypeError) as e:
+            result.pop('age_group', None)
+            result['error'] = str(e)
+            continue
+        groups.setdefault(age_group, []).append(len(scored) - 1)
+
+    for age_group, members in groups.items():
+        engine = engine_for(snapshot, age_group)
+        scores = engine.score_batch([scored[i][1]['answer_indices'] for i in members])
+        matches = engine.match_batch(scores).tolist() if engine.personalities else [None] * len(members)
+        for i, score, match in zip(members, scores.tolist(), matches):
+            name, result = scored[i]
+            result['answer_indices'] = list(result['answer_indices'])
+            result['traits'] = dict(zip(TRAITS, score))
+            result['personality'] = engine.personalities[match]['name'] if match is not None else None
+            if readings == 'fallback':
+                answers = snapshot.answer_texts(age_group, result['answer_indices'])
+                result['reading'] = generate_smart_fallback(name, age_group, answers, result['traits'])
+                result['reading_source'] = 'fallback'
+    return scored
+
+
+def ordered_map(executor: Executor, fn: Callable, items: Iterable, window: int, *args) -> Iterator:
+    """executor.map in input order, with at most window items in flight so memory stays flat"""
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item, *args))
+    while pending:
+        yield pending.popleft().result()
+
+def chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --- AI readings, on threads in the main process --- #
+
+class AIReadings:
+    """AI readings for scored records: the shared reading cache first, and one request per answer path in flight"""
+
+    def __init__(self, backend: LLMBackend, style: str, admission: AdmissionController, retry_policy: RetryPolicy,
+                 cache: ReadingCache, snapshot: ContentSnapshot):
+        self.backend = backend
+        self.style = style
+        self.admission = admission
+        self.retry_policy = retry_policy
+        self.cache = cache
+        self.snapshot = snapshot
+        self.sources: Dict[str, int] = {'cache': 0, 'ai': 0, 'fallback': 0}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _generate(self, key: str, name: str, age_group: str, answers: List[str], traits: Dict[str, int]) -> Dict[str, Any]:
+        admitted = AdmittedBackend(self.backend, self.admission, deadline=time.monotonic() + self.admission.max_wait)
+        reading = anonymize_reading(generate_reading(name, age_group, answers, traits, self.retry_policy.wrap(admitted),
+                                                     self.style), name)
+        if is_complete_reading(reading):
+            self.cache.put(key, reading, name)
+        return reading
+
+    def reading(self, name: str, age_group: str, answer_indices: Sequence[int], traits: Dict[str, int]) -> Tuple[Dict[str, Any], str]:
+        """(personalized reading, source): cache, ai, or fallback when the request failed"""
+        answers = self.snapshot.answer_texts(age_group, answer_indices)
+        key = reading_key(age_group, answer_indices, traits, reading_version(self.backend, self.style))
+        reading, source = self.cache.get(key), 'cache'
+        if reading is None:
+            with self._lock:
+                future = self._inflight.get(key)
+                owner = future is None
+                if owner:
+                    future = self._inflight[key] = Future()
+            if owner:
+                try:
+                    future.set_result(self._generate(key, name, age_group, answers, traits))
+                except Exception as e:
+                    future.set_exception(e)
+                finally:
+                    with self._lock:
+                        del self._inflight[key]
+            try:
+                reading, source = future.result(), 'ai' if owner else 'cache'
+            except Exception:
+                reading, source = None, 'fallback'
+        with self._lock:
+            self.sources[source] += 1
+        if reading is None:
+            return generate_smart_fallback(name, age_group, answers, traits), source
+        return personalize_reading(reading, name), source
+
+    def attach(self, item: Tuple[str, Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        name, result = item
+        if 'error' not in result:
+            result['reading'], result['reading_source'] = self.reading(name, result['age_group'], result['answer_indices'],
+                                                                       result['traits'])
+        return item
+
+
+# --- Pipeline --- #
+
+def score_records(records: Iterable[Dict[str, Any]], readings: str = 'none', workers: int = 1,
+                  chunk_size: int = CHUNK_SIZE, ai: Optional[AIReadings] = None,
+                  concurrency: int = 4) -> Iterator[Dict[str, Any]]:
+    """Results for records, in input order; workers > 1 scores chunks on that many processes"""
+    numbered = chunks(enumerate(records, 1), chunk_size)
+    chunk_readings = 'fallback' if readings == 'fallback' else 'none'
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else ThreadPoolExecutor(max_workers=1) as pool:
+        scored = (item for chunk in ordered_map(pool, score_chunk, numbered, max(2, workers * 2), chunk_readings)
+                  for item in chunk)
+        if readings != 'ai':
+            yield from (result for _, result in scored)
+            return
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch-ai') as threads:
+            yield from (result for _, result in ordered_map(threads, ai.attach, scored, concurrency * 4))
+
+def write_results(results: Iterable[Dict[str, Any]], out, progress=None) -> Dict[str, int]:
+    """One JSON line per result; returns counts of records and errors"""
+    counts = {'records': 0, 'errors': 0}
+    started = time.perf_counter()
+    for result in results:
+        out.write(json.dumps(result, ensure_ascii=False, separators=(',', ':')) + '\n')
+        counts['records'] += 1
+        counts['errors'] += 'error' in result
+        if progress and counts['records'] % PROGRESS_EVERY == 0:
+            elapsed = time.perf_counter() - started
+            print(f"{counts['records']:,} records, {counts['records'] / elapsed:,.0f}/s", file=progress, flush=True)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help="JSONL or CSV file, or - for JSONL on stdin")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file (stdout by default)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help="input format (by default, from the extension)")
+    parser.add_argument('--readings', choices=READING_MODES, default='none',
+                        help="fallback adds the offline reading; ai requests readings from the VIBE_LLM_* backend")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="scoring processes")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="records per scoring task")
+    parser.add_argument('--concurrency', type=int, default=4, help="AI requests in flight with --readings ai")
+    parser.add_argument('--model', help="override VIBE_LLM_MODEL")
+    parser.add_argument('--prompt', choices=list(PROMPT_STYLES), help="override VIBE_LLM_PROMPT")
+    args = parser.parse_args(argv)
+
+    ai = None
+    if args.readings == 'ai':
+        settings = llm_settings()
+        if args.model:
+            settings['VIBE_LLM_MODEL'] = args.model
+        if args.prompt:
+            settings['VIBE_LLM_PROMPT'] = args.prompt
+        try:
+            session = PooledSession(pool_maxsize=max(1, args.concurrency))
+            ai = AIReadings(backend_from_settings(settings, session), prompt_style_from_settings(settings),
+                            admission_from_settings(settings), retry_policy_from_settings(settings), ReadingCache(),
+                            ContentStore(on_load=[precompile_choice_categories]).snapshot())
+        except LLMConfigError as e:
+            parser.error(str(e))
+
+    started = time.perf_counter()
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        results = score_records(read_records(args.input, args.format), args.readings, max(1, args.workers),
+                                max(1, args.chunk_size), ai, max(1, args.concurrency))
+        counts = write_results(results, out, progress=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(f"{counts['records']:,} records ({counts['errors']:,} errors) in {elapsed:.1f}s, "
+          f"{counts['records'] / max(elapsed, 1e-9):,.0f}/s", file=sys.stderr)
+    if ai is not None:
+        print(f"readings: {ai.sources['ai']:,} requested, {ai.sources['cache']:,} cached, "
+              f"{ai.sources['fallback']:,} fallbacks", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""Drive many simulated users through the app at once and report how one process holds up.
+
+    python benchmarks/loadgen.py                               # 1, 4, 16 and 32 users against a 1.2s stub LLM
+    python benchmarks/loadgen.py --users 8,64 --sessions 3 --llm-latency-ms 2500
+    python benchmarks/loadgen.py --base-url http://127.0.0.1:8700/v1   # stub_server.py, over HTTP
+
+Each user is a headless AppTest session that goes welcome -> 5 quiz answers ->
+ai_loading -> ai_results with random answers, pausing --think-ms between clicks.
+The sessions share this process's cached resources (content, reading cache, AI
+job pool, rate budget) as they would in one server process. For each level of
+concurrency it prints completed sessions per second, p50/p99 of each page's
+script runs, and resident memory with every finished session still held, which is
+where st.rerun() churn and blocking AI calls show up as users are added.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from unittest.mock import MagicMock
+from urllib import parse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+# Also points the app's caches at a temporary directory
+from run_benchmarks import APP_PATH, _run_once  # noqa: E402
+from streamlit.runtime import Runtime  # noqa: E402
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager  # noqa: E402
+from streamlit.runtime.media_file_manager import MediaFileManager  # noqa: E402
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage  # noqa: E402
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent  # noqa: E402
+from streamlit.testing.v1 import AppTest, local_script_runner  # noqa: E402
+
+PAGES = ('welcome', 'quiz', 'ai_loading', 'ai_results')
+AGE_GROUPS = ('18-24', '25-34', '35-44', '45-54', '55+')
+NAMES = ('Ada', 'Grace', 'Linus', 'Mae', 'Alan', 'Frida', 'Kofi', 'Yuki')
+
+# Reruns one session may take before it counts as stuck
+MAX_RUNS = 60
+
+
+def rss_mb() -> float:
+    """Resident memory of this process (peak, where /proc isn't available)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def quantile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def _join_script_thread(runner, timeout: float = 3) -> None:
+    # The script thread exits when its run ends, so wait on it rather than polling every 100ms
+    runner._script_thread.join(timeout)
+    if not runner.script_stopped():
+        runner.request_stop()
+        runner.join()
+        raise RuntimeError(f"AppTest script run timed out after {timeout}s")
+
+
+SCRIPT_STOPPED = (ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN, ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS,
+                  ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR)
+
+
+class SharedRuntimeAppTest(AppTest):
+    """AppTest whose runs share one process-wide runtime, so many sessions can run at once.
+
+    AppTest installs a fresh mock Runtime for each run and removes it afterwards, which
+    breaks any other session mid-run; a server has one Runtime for all of its sessions.
+    One run() can execute the script several times (st.rerun() starts over in the same
+    run), so each execution is reported to on_script_run with the page it started on.
+    """
+
+    def __init__(self, script_path: str, default_timeout: float, on_script_run=None):
+        super().__init__(script_path, default_timeout=default_timeout)
+        self.on_script_run = on_script_run
+
+    def _run(self, widget_state=None, timeout=None):
+        script_runner = local_script_runner.LocalScriptRunner(self._script_path, self.session_state)
+        if self.on_script_run is not None:
+            script_runner.on_event.connect(self._script_event, weak=False)
+        self._tree = script_runner.run(widget_state, self.query_params, timeout or self.default_timeout)
+        self._tree._runner = self
+        self.query_params = parse.parse_qs(script_runner.event_data[-1]["client_state"].query_string)
+        return self
+
+    def _page(self) -> str:
+        return self.session_state['page'] if 'page' in self.session_state else 'welcome'
+
+    def _script_event(self, sender, event, **kwargs):
+        # Sent on the script thread. Widget callbacks (a quiz answer can change the page) run
+        # after SCRIPT_STARTED, so the page is read when the script sends its first message.
+        if event == ScriptRunnerEvent.SCRIPT_STARTED:
+            self._started, self._started_page = time.perf_counter(), None
+        elif event == ScriptRunnerEvent.ENQUEUE_FORWARD_MSG and getattr(self, '_started', None):
+            if self._started_page is None:
+                self._started_page = self._page()
+        elif event in SCRIPT_STOPPED and getattr(self, '_started', None):
+            self.on_script_run(self._started_page or self._page(), time.perf_counter() - self._started)
+            self._started = None
+
+
+def install_shared_runtime():
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    local_script_runner.require_widgets_deltas = _join_script_thread
+
+
+class Recorder:
+    """Seconds per script run, by the page the run started on"""
+
+    def __init__(self):
+        self.runs: Dict[str, List[float]] = {page: [] for page in PAGES}
+        self._lock = threading.Lock()
+
+    def record(self, page: str, seconds: float):
+        with self._lock:
+            self.runs.setdefault(page, []).append(seconds)
+
+
+def simulate_session(rng: random.Random, recorder: Recorder, think: float):
+    """One user from the welcome page to a fully rendered reading; returns the finished AppTest"""
+    at = SharedRuntimeAppTest(APP_PATH, default_timeout=60, on_script_run=recorder.record)
+
+    def step():
+        _run_once(at)
+        if at.exception:
+            raise RuntimeError(f"{at.session_state.page}: {at.exception[0].message}")
+
+    def click(key):
+        time.sleep(think)
+        at.button(key=key).click()
+        step()
+
+    step()
+    at.text_input(key='welcome_name').input(rng.choice(NAMES))
+    at.radio[0].set_value(rng.choice(AGE_GROUPS))
+    click('start_button')
+    for _ in range(MAX_RUNS):
+        page = at.session_state.page
+        keys = [button.key for button in at.button]
+        if page == 'ai_results' and at.session_state.reading_id is not None and 'restart_button' in keys:
+            return at
+        options = [key for key in keys if key and key.startswith('option_')]
+        if page == 'quiz' and options:
+            click(rng.choice(options))
+        else:
+            step()
+    raise RuntimeError(f"session still on {at.session_state.page} after {MAX_RUNS} reruns")
+
+
+def run_level(users: int, sessions: int, think: float, seed: int) -> Dict[str, Any]:
+    """users concurrent users, each going through sessions sessions back to back"""
+    recorder = Recorder()
+    held, errors = [], []
+
+    def user(i):
+        rng = random.Random(seed * 100003 + users * 1009 + i)
+        for _ in range(sessions):
+            try:
+                held.append(simulate_session(rng, recorder, think))
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    gc.collect()
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(user, range(users)))
+    elapsed = time.perf_counter() - started
+    rss_after = rss_mb()
+    result = {
+        'users': users,
+        'sessions': len(held),
+        'errors': len(errors),
+        'seconds': round(elapsed, 2),
+        'sessions_per_s': round(len(held) / elapsed, 2),
+        'rss_mb': round(rss_after, 1),
+        'held_kb_per_session': round(max(0.0, rss_after - rss_before) * 1024 / len(held)) if held else None,
+        'pages': {page: {'runs': len(runs), 'p50_ms': round(quantile(runs, 0.5) * 1000, 1),
+                         'p99_ms': round(quantile(runs, 0.99) * 1000, 1)}
+                  for page, runs in recorder.runs.items() if runs},
+        'first_errors': errors[:3],
+    }
+    held.clear()
+    return result
+
+
+def format_level(result: Dict[str, Any]) -> str:
+    pages = "  ".join(f"{page} {stats['p50_ms']:.0f}/{stats['p99_ms']:.0f}" for page, stats in result['pages'].items())
+    per_session = result['held_kb_per_session']
+    return (f"{result['users']:>5} {result['sessions']:>8} {result['sessions_per_s']:>7.2f} {result['errors']:>6} "
+            f"{result['rss_mb']:>7.0f} {per_session if per_session is not None else '-':>10}  {pages}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent users through the app")
+    parser.add_argument('--users', default='1,4,16,32', help="comma-separated concurrency levels")
+    parser.add_argument('--sessions', type=int, default=2, help="sessions per user at each level")
+    parser.add_argument('--think-ms', type=float, default=0, help="pause before each click")
+    parser.add_argument('--llm-latency-ms', type=float, default=1200, help="median latency of the in-process stub LLM")
+    parser.add_argument('--base-url', help="send LLM requests to an OpenAI-compatible server instead (e.g. stub_server.py)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help="also write the results here")
+    args = parser.parse_args(argv)
+
+    # Settings are read on every rerun, so they must be in place before the first session
+    if args.base_url:
+        os.environ.update(VIBE_LLM_BACKEND='openai-compatible', VIBE_LLM_BASE_URL=args.base_url)
+    else:
+        os.environ.update(VIBE_LLM_BACKEND='stub', VIBE_LLM_STUB_LATENCY_MS=str(args.llm_latency_ms))
+
+    install_shared_runtime()
+    # Warm the shared resources so the first level doesn't pay for them
+    simulate_session(random.Random(args.seed), Recorder(), 0)
+
+    print("users sessions  sess/s errors  rss_mb kb/session  page p50/p99 ms")
+    results = []
+    for users in (int(n) for n in args.users.split(',')):
+        result = run_level(users, args.sessions, args.think_ms / 1000, args.seed)
+        results.append(result)
+        print(format_level(result), flush=True)
+        for error in result['first_errors']:
+            print("      " + error)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'llm': args.base_url or f"stub {args.llm_latency_ms:g}ms", 'think_ms': args.think_ms,
+                       'levels': results}, f, indent=2)
+    return 1 if any(result['errors'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
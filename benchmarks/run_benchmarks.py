@@ -0,0 +1,456 @@
+"""Benchmarks for the quiz-to-reading pipeline.
+
+    python benchmarks/run_benchmarks.py                 # run everything, record results for HEAD
+    python benchmarks/run_benchmarks.py -k fallback     # only benchmarks whose name contains "fallback"
+    python benchmarks/run_benchmarks.py --compare main  # also diff against the results recorded for main
+
+Results are written to .benchmarks/<commit>.json (with a -dirty suffix for
+uncommitted trees). The LLM is the in-process stub backend with no added
+latency, and the app's on-disk caches point at a temporary directory.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+RESULTS_DIR = os.path.join(ROOT, '.benchmarks')
+APP_PATH = os.path.join(ROOT, 'app.py')
+
+# Keep the app's on-disk caches out of the measurements
+_TMP = tempfile.mkdtemp(prefix='vibe-bench-')
+os.environ.setdefault('VIBE_READING_CACHE', os.path.join(_TMP, 'readings.sqlite3'))
+os.environ.setdefault('VIBE_PRECOMPUTED', os.path.join(_TMP, 'no-precomputed.bin'))
+os.environ.setdefault('VIBE_SHARE_CARDS', os.path.join(_TMP, 'share_cards'))
+os.environ.setdefault('VIBE_LLM_BACKEND', 'stub')
+
+from content_store import ContentStore  # noqa: E402
+from scoring import engine_for  # noqa: E402
+from llm_backends import StubBackend, approximate_prompt_tokens, stub_reading_text  # noqa: E402
+from json_extract import extract_json_object  # noqa: E402
+from reading_cache import READING_TABLE, anonymize_reading, personalize_reading  # noqa: E402
+from telemetry import Telemetry  # noqa: E402
+from templates import RenderCache, ai_results_card  # noqa: E402
+from share_card import ShareCardRenderer  # noqa: E402
+from batch_score import CHUNK_SIZE, score_chunk  # noqa: E402
+from oracle import (  # noqa: E402
+    PROMPT_STYLES, build_personality_prompt, reading_messages, prompt_template, generate_reading,
+    generate_smart_fallback, precompile_choice_categories
+)
+
+AGE_GROUP = '18-24'
+
+BENCHMARKS = []
+
+def benchmark(name, metrics=None):
+    """Register a benchmark; the decorated function does any setup and returns the callable to time.
+
+    metrics, if given, maps one result of that callable to extra numbers recorded alongside the timings.
+    """
+    def register(fn):
+        BENCHMARKS.append((name, fn, metrics))
+        return fn
+    return register
+
+
+def _snapshot():
+    return ContentStore(on_load=[precompile_choice_categories]).snapshot()
+
+def _sample_session(answer_indices=(0, 1, 2, 3, 4)):
+    snapshot = _snapshot()
+    questions = snapshot.questions[AGE_GROUP]
+    answers = [q['options'][i] for q, i in zip(questions, answer_indices)]
+    traits = engine_for(snapshot, AGE_GROUP).score(answer_indices)
+    return answers, traits
+
+def _sample_reading():
+    answers, traits = _sample_session()
+    return json.loads(stub_reading_text(build_personality_prompt('Ada', AGE_GROUP, answers, traits)))
+
+
+# --- Pipeline functions --- #
+
+@benchmark('content.cold_load')
+def bench_cold_load():
+    return lambda: ContentStore().snapshot()
+
+@benchmark('content.warm_snapshot')
+def bench_warm_snapshot():
+    store = ContentStore()
+    store.snapshot()
+    return store.snapshot
+
+def owned_bytes(value, shared_ids: set) -> int:
+    """Size of value and everything it references, leaving out objects in shared_ids and singletons"""
+    seen = set(shared_ids)
+    total = 0
+    pending = [value]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, bool) or (type(obj) is int and -5 <= obj <= 256):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            pending.extend(obj)
+    return total
+
+def _reachable_ids(*roots) -> set:
+    ids, pending = set(), list(roots)
+    while pending:
+        obj = pending.pop()
+        if id(obj) in ids:
+            continue
+        ids.add(id(obj))
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            pending.extend(obj)
+    return ids
+
+def _session_state_bytes():
+    # A session on the results page: what it holds now, and what it held before (answer texts,
+    # trait dict, matched personality and a personalized copy of the reading). Content and
+    # interned readings are shared by every session, so they don't count.
+    snapshot = _snapshot()
+    answers, traits = _sample_session()
+    reading = anonymize_reading(_sample_reading(), 'Ada')
+    shared = _reachable_ids(snapshot.questions, snapshot.personalities, reading)
+    state = {'name': 'Ada' + '', 'age_group_label': AGE_GROUP, 'answer_path': bytearray((0, 1, 2, 3, 4)),
+             'reading_id': READING_TABLE.intern(reading), 'reading': reading, 'ai_job': None}
+    legacy = {'name': 'Ada' + '', 'age_group': '', 'age': 18, 'age_group_label': AGE_GROUP, 'current_question': 5,
+              'traits': dict(traits), 'personality_type': engine_for(snapshot, AGE_GROUP).match(traits),
+              'answers': list(answers), 'ai_personality': personalize_reading(reading, 'Ada'), 'ai_job': None}
+    return {'session_bytes': owned_bytes(state, shared), 'legacy_session_bytes': owned_bytes(legacy, shared)}
+
+@benchmark('session.derive_answers_traits', metrics=lambda _: _session_state_bytes())
+def bench_session_derive():
+    # Sessions keep option positions; answer texts and traits are derived when a page needs them
+    snapshot = _snapshot()
+    engine = engine_for(snapshot, AGE_GROUP)
+    path = bytearray((0, 1, 2, 3, 4))
+    def run():
+        snapshot.answer_texts(AGE_GROUP, path)
+        return engine.score(tuple(path))
+    return run
+
+@benchmark('scoring.score_batch_3125')
+def bench_score_batch():
+    engine = engine_for(_snapshot(), AGE_GROUP)
+    paths = list(itertools.product(range(5), repeat=5))
+    return lambda: engine.score_batch(paths)
+
+@benchmark('batch_score.score_chunk', metrics=lambda scored: {'records': len(scored)})
+def bench_batch_score_chunk():
+    # A chunk as batch_score.py's workers get it: every age group, half the answers given as option texts
+    snapshot = _snapshot()
+    paths = itertools.cycle(itertools.product(range(5), repeat=5))
+    chunk = []
+    for number in range(1, CHUNK_SIZE + 1):
+        age_group = snapshot.age_groups[number % len(snapshot.age_groups)]
+        indices = next(paths)
+        answers = snapshot.answer_texts(age_group, indices) if number % 2 else list(indices)
+        chunk.append((number, {'id': number, 'age_group': age_group, 'answers': answers}))
+    return lambda: score_chunk(chunk)
+
+@benchmark('scoring.determine_personality')
+def bench_determine_personality():
+    engine = engine_for(_snapshot(), AGE_GROUP)
+    _, traits = _sample_session()
+    return lambda: engine.match(traits)
+
+@benchmark('oracle.generate_smart_fallback')
+def bench_smart_fallback():
+    answers, traits = _sample_session()
+    return lambda: generate_smart_fallback('Ada', AGE_GROUP, answers, traits)
+
+# Model replies for the extractor: as asked for, with the usual defects, and a large one for throughput
+def _clean_reply():
+    return "```json\n" + json.dumps(_sample_reading(), indent=2) + "\n```"
+
+def _defective_reply():
+    text = json.dumps(_sample_reading(), indent=2, ensure_ascii=False)
+    text = text.replace('",\n', '",,\n', 1).replace('"\n}', '",\n}').replace('"vibe_check": "', '"vibe_check": “')
+    return "Here's the reading you asked for!\n" + text[:int(len(text) * 0.9)]
+
+def _large_reply():
+    reading = dict(_sample_reading(), essence="All of it. " * 25000)
+    return "Sure! " * 1000 + json.dumps(reading)[:-1] + ",\n}"
+
+def _extract_benchmark(make_text):
+    text = make_text()
+    return lambda: extract_json_object(text)
+
+def _extract_metrics(make_text):
+    return lambda _: {'input_bytes': len(make_text().encode('utf-8'))}
+
+@benchmark('json_extract.clean_reply', metrics=_extract_metrics(_clean_reply))
+def bench_extract_clean():
+    return _extract_benchmark(_clean_reply)
+
+@benchmark('json_extract.defective_reply', metrics=_extract_metrics(_defective_reply))
+def bench_extract_defective():
+    return _extract_benchmark(_defective_reply)
+
+@benchmark('json_extract.large_reply', metrics=_extract_metrics(_large_reply))
+def bench_extract_large():
+    return _extract_benchmark(_large_reply)
+
+def _prompt_metrics(messages):
+    return {'prompt_tokens': approximate_prompt_tokens(messages)}
+
+def _bench_reading_messages(style):
+    answers, traits = _sample_session()
+    return lambda: reading_messages('Ada', AGE_GROUP, answers, traits, style)
+
+@benchmark('oracle.build_prompt_full', metrics=_prompt_metrics)
+def bench_build_prompt_full():
+    return _bench_reading_messages('full')
+
+@benchmark('oracle.build_prompt_compact', metrics=_prompt_metrics)
+def bench_build_prompt_compact():
+    return _bench_reading_messages('compact')
+
+@benchmark('oracle.compile_prompt_templates')
+def bench_compile_prompt_templates():
+    # Paid once per style, age group and answer count; prompt_template() keeps the result
+    compile_template = prompt_template.__wrapped__
+    return lambda: [compile_template(style, AGE_GROUP, 5) for style in PROMPT_STYLES]
+
+@benchmark('telemetry.stage_overhead')
+def bench_stage_overhead():
+    telemetry = Telemetry()
+
+    def run():
+        with telemetry.stage('bench'):
+            pass
+    return run
+
+def _sample_personality():
+    return personalize_reading(dict(_sample_reading(), extroversion_percentage=60, introversion_percentage=40), 'Ada')
+
+@benchmark('templates.ai_results_card', metrics=lambda card: {'card_bytes': len(card.encode('utf-8'))})
+def bench_ai_results_card():
+    personality = _sample_personality()
+    return lambda: ai_results_card(personality, 'Ada')
+
+@benchmark('templates.cached_card')
+def bench_cached_card():
+    cache = RenderCache()
+    key = ('ai_results', 'bench', 'Ada')
+    cache.put(key, ai_results_card(_sample_personality(), 'Ada'))
+    return lambda: cache.get(key)
+
+def _image_metrics(image):
+    return {'image_bytes': len(image)}
+
+@benchmark('share_card.render_png', metrics=_image_metrics)
+def bench_share_card_png():
+    renderer, personality = ShareCardRenderer(out_dir=None), _sample_personality()
+    return lambda: renderer.render(personality, 'Ada', 'png')
+
+@benchmark('share_card.render_webp', metrics=_image_metrics)
+def bench_share_card_webp():
+    renderer, personality = ShareCardRenderer(out_dir=None), _sample_personality()
+    return lambda: renderer.render(personality, 'Ada', 'webp')
+
+@benchmark('share_card.cached_png', metrics=_image_metrics)
+def bench_share_card_cached():
+    renderer, personality = ShareCardRenderer(out_dir=tempfile.mkdtemp(dir=_TMP)), _sample_personality()
+    renderer.render(personality, 'Ada', 'png')
+    return lambda: renderer.render(personality, 'Ada', 'png')
+
+@benchmark('oracle.generate_reading_stub_backend')
+def bench_generate_reading():
+    answers, traits = _sample_session()
+    backend = StubBackend()
+    return lambda: generate_reading('Ada', AGE_GROUP, answers, traits, backend)
+
+
+# --- Headless page runs through Streamlit's AppTest --- #
+
+def _fast_require_widgets_deltas(runner, timeout: float = 3) -> None:
+    # AppTest checks for script completion every 100ms, which would swamp page timings
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if runner.script_stopped():
+            # The stop event fires before the script thread's cleanup; let that finish too
+            runner._script_thread.join(max(0.0, deadline - time.perf_counter()))
+            return
+        time.sleep(0.0002)
+    runner.request_stop()
+    runner.join()
+    raise RuntimeError(f"AppTest script run timed out after {timeout}s")
+
+def _app_test(**state):
+    from streamlit.testing.v1 import AppTest, local_script_runner
+    local_script_runner.require_widgets_deltas = _fast_require_widgets_deltas
+    at = AppTest.from_file(APP_PATH, default_timeout=30)
+    for key, value in state.items():
+        at.session_state[key] = value
+    return at
+
+def _quiz_state(answer_indices=(0, 1, 2, 3, 4), **extra):
+    state = dict(name='Ada', age_group_label=AGE_GROUP, answer_path=bytearray(answer_indices))
+    state.update(extra)
+    return state
+
+def _run_once(at):
+    try:
+        at.run()
+    except KeyError:
+        # AppTest 1.28 loses its client state when a run ends in st.rerun(); the
+        # session state is intact, so the next run picks up where this one stopped
+        pass
+
+def _run_page(at, until=None, max_runs=50):
+    _run_once(at)
+    runs = 1
+    # st.rerun() ends a run early; keep going until the page settles
+    while until is not None and not until(at) and runs < max_runs:
+        _run_once(at)
+        runs += 1
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+def payload_bytes(at) -> int:
+    """Serialized size of every element the last script run sent to the browser"""
+    total = 0
+    pending = list(at._tree.children.values())
+    while pending:
+        node = pending.pop()
+        proto = getattr(node, 'proto', None)
+        if proto is not None:
+            total += proto.ByteSize()
+        pending.extend(getattr(node, 'children', {}).values())
+    return total
+
+@benchmark('page.welcome', metrics=lambda at: {'payload_bytes': payload_bytes(at)})
+def bench_page_welcome():
+    return lambda: _run_page(_app_test())
+
+@benchmark('page.quiz', metrics=lambda at: {'payload_bytes': payload_bytes(at)})
+def bench_page_quiz():
+    state = _quiz_state(answer_indices=(0, 1), page='quiz')
+    return lambda: _run_page(_app_test(**state))
+
+@benchmark('page.ai_loading_to_results', metrics=lambda at: {'payload_bytes': payload_bytes(at)})
+def bench_page_ai_loading():
+    # A fresh answer path each time so every run misses the reading cache and calls the stub backend
+    paths = itertools.cycle(itertools.product(range(5), repeat=5))
+    done = lambda at: at.session_state.page == 'ai_results' and at.session_state.reading_id is not None
+    return lambda: _run_page(_app_test(**_quiz_state(next(paths), page='ai_loading')), until=done)
+
+@benchmark('page.ai_results', metrics=lambda at: {'payload_bytes': payload_bytes(at)})
+def bench_page_ai_results():
+    reading = dict(_sample_reading(), extroversion_percentage=60, introversion_percentage=40)
+    state = _quiz_state(page='ai_results', reading_id=READING_TABLE.intern(reading), reading=reading)
+    return lambda: _run_page(_app_test(**state))
+
+
+# --- Runner --- #
+
+def measure(fn, repeat: int, min_time: float):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    # autorange targets 0.2s per sample; scale to the requested budget
+    number = max(1, int(number * min_time / 0.2))
+    samples = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    samples.sort()
+    return {
+        'min_us': round(samples[0] * 1e6, 3),
+        'median_us': round(samples[len(samples) // 2] * 1e6, 3),
+        'max_us': round(samples[-1] * 1e6, 3),
+        'loops': number,
+        'repeat': repeat,
+    }
+
+def git_commit() -> str:
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+        dirty = subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return sha + ('-dirty' if dirty else '')
+
+def load_results(ref: str):
+    if not os.path.exists(os.path.join(RESULTS_DIR, ref + '.json')):
+        try:
+            ref = subprocess.check_output(['git', 'rev-parse', '--short', ref], cwd=ROOT, text=True).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    path = os.path.join(RESULTS_DIR, ref + '.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the quiz-to-reading pipeline")
+    parser.add_argument('-k', dest='pattern', help="only run benchmarks whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help="seconds per sample")
+    parser.add_argument('--compare', metavar='REF', help="commit or results name to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="median slowdown ratio reported as a regression")
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, setup, metrics in BENCHMARKS:
+        if args.pattern and args.pattern not in name:
+            continue
+        fn = setup()
+        results[name] = measure(fn, args.repeat, args.min_time)
+        line = f"{name:<40} {results[name]['median_us']:>14,.1f} us  (min {results[name]['min_us']:,.1f})"
+        if metrics:
+            extra = metrics(fn())
+            if 'input_bytes' in extra:
+                # bytes per microsecond = MB/s
+                extra['mb_per_s'] = round(extra['input_bytes'] / results[name]['median_us'], 1)
+            results[name].update(extra)
+            line += "  " + ", ".join(f"{key}={value:,}" for key, value in extra.items())
+        print(line)
+
+    commit = git_commit()
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(os.path.join(RESULTS_DIR, commit + '.json'), 'w') as f:
+            json.dump({'commit': commit, 'recorded': int(time.time()), 'python': platform.python_version(),
+                       'machine': platform.machine(), 'results': results}, f, indent=2)
+        print(f"\nRecorded .benchmarks/{commit}.json")
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        if baseline is None:
+            print(f"No recorded results for {args.compare}")
+            return 2
+        regressions = 0
+        print(f"\nAgainst {baseline['commit']}:")
+        for name, current in results.items():
+            before = baseline['results'].get(name)
+            if not before:
+                continue
+            ratio = current['median_us'] / before['median_us'] if before['median_us'] else float('inf')
+            flag = '  REGRESSION' if ratio > args.threshold else ''
+            regressions += bool(flag)
+            print(f"{name:<40} {ratio:>6.2f}x{flag}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
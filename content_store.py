@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+CONTENT_FILES = {
+    'questions': 'questions.json',
+    'personalities': 'personalities.json',
+    'slang': 'slang.json',
+}
+
+
+class ContentError(ValueError):
+    """Raised when a quiz content file is missing, unreadable or malformed"""
+
+
+# --- Schema checks --- #
+
+def _require(condition, file_name, message):
+    if not condition:
+        raise ContentError(f"{file_name}: {message}")
+
+def validate_questions(questions, file_name='questions.json'):
+    _require(isinstance(questions, dict) and questions, file_name, "expected a non-empty object keyed by age group")
+    for age_group, age_questions in questions.items():
+        _require(isinstance(age_questions, list) and age_questions, file_name, f"'{age_group}' must be a non-empty list")
+        for i, question in enumerate(age_questions):
+            where = f"'{age_group}' question {i + 1}"
+            _require(isinstance(question, dict), file_name, f"{where} must be an object")
+            _require(isinstance(question.get('text'), str) and question['text'], file_name, f"{where} is missing 'text'")
+            options = question.get('options')
+            _require(isinstance(options, list) and options, file_name, f"{where} must have a non-empty 'options' list")
+            _require(all(isinstance(o, str) and o for o in options), file_name, f"{where} has an empty or non-string option")
+            impacts = question.get('trait_impacts')
+            if impacts is not None:
+                _require(isinstance(impacts, list) and len(impacts) == len(options), file_name,
+                         f"{where} 'trait_impacts' must have one entry per option")
+                _require(all(isinstance(i, dict) and all(isinstance(v, int) for v in i.values()) for i in impacts),
+                         file_name, f"{where} 'trait_impacts' entries must map trait names to integers")
+
+def validate_personalities(personalities, file_name='personalities.json'):
+    _require(isinstance(personalities, list) and personalities, file_name, "expected a non-empty list")
+    for i, personality in enumerate(personalities):
+        where = f"personality {i + 1}"
+        _require(isinstance(personality, dict), file_name, f"{where} must be an object")
+        for field in ('name', 'primary_trait', 'description'):
+            _require(isinstance(personality.get(field), str) and personality[field], file_name, f"{where} is missing '{field}'")
+        _require(isinstance(personality.get('compatible_with', []), list), file_name, f"{where} 'compatible_with' must be a list")
+
+def validate_slang(slang, file_name='slang.json'):
+    _require(isinstance(slang, dict), file_name, "expected an object keyed by age group")
+    for age_group, phrases in slang.items():
+        _require(isinstance(phrases, dict), file_name, f"'{age_group}' must be an object of phrase mappings")
+
+VALIDATORS = {
+    'questions': validate_questions,
+    'personalities': validate_personalities,
+    'slang': validate_slang,
+}
+
+
+class ContentSnapshot:
+    """One validated, indexed version of the content files"""
+
+    def __init__(self, questions: Dict[str, List[Dict]], personalities: List[Dict], slang: Dict[str, Dict], mtimes: Dict[str, float]):
+        self.questions = questions
+        self.personalities = personalities
+        self.slang = slang
+        self.mtimes = mtimes
+
+        # Structures other modules derive from this content (scoring matrices etc.), built lazily
+        self.derived: Dict[str, Any] = {}
+
+        # Lookup indexes built once per load
+        self.personalities_by_trait: Dict[str, List[Dict]] = {}
+        for personality in personalities:
+            trait = personality['primary_trait'].lower()
+            self.personalities_by_trait.setdefault(trait, []).append(personality)
+        self.age_groups = list(questions.keys())
+        # Option text -> option position, per question, per age group
+        self.option_index: Dict[str, List[Dict[str, int]]] = {
+            age_group: [{option: i for i, option in enumerate(q['options'])} for q in age_questions]
+            for age_group, age_questions in questions.items()
+        }
+
+    def content_fingerprint(self) -> str:
+        """Short hash of the question/option layout, used to spot stale precomputed artifacts"""
+        fingerprint = self.derived.get('content_fingerprint')
+        if fingerprint is None:
+            layout = {age_group: [q['options'] for q in age_questions] for age_group, age_questions in self.questions.items()}
+            fingerprint = self.derived['content_fingerprint'] = hashlib.sha256(
+                json.dumps(layout, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        return fingerprint
+
+    def answer_indices(self, age_group: str, answers: List[str]) -> Optional[Tuple[int, ...]]:
+        """Map answer texts back to option positions, or None if any answer is unknown"""
+        lookups = self.option_index.get(age_group)
+        if lookups is None or len(answers) > len(lookups):
+            return None
+        indices = []
+        for lookup, answer in zip(lookups, answers):
+            if answer not in lookup:
+                return None
+            indices.append(lookup[answer])
+        return tuple(indices)
+
+    def answer_texts(self, age_group: str, answer_indices: Sequence[int]) -> List[str]:
+        """Option texts for option positions, the inverse of answer_indices"""
+        age_questions = self.questions.get(age_group) or self.questions[self.age_groups[0]]
+        return [question['options'][i] for question, i in zip(age_questions, answer_indices)]
+
+
+class ContentStore:
+    """Loads the quiz content once per process and reloads a file only when its mtime changes"""
+
+    def __init__(self, data_dir: str = DATA_DIR, check_interval: float = 1.0,
+                 on_load: Sequence[Callable[[ContentSnapshot], None]] = ()):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        # Called with every freshly loaded snapshot, to precompute anything derived from the content
+        self.on_load = list(on_load)
+        self.load_count = 0
+        self.last_error: Optional[ContentError] = None
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ContentSnapshot] = None
+        self._last_check = 0.0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.data_dir, CONTENT_FILES[key])
+
+    def _current_mtimes(self) -> Dict[str, float]:
+        mtimes = {}
+        for key in CONTENT_FILES:
+            try:
+                mtimes[key] = os.stat(self._path(key)).st_mtime
+            except OSError as e:
+                raise ContentError(f"{CONTENT_FILES[key]}: {e}")
+        return mtimes
+
+    def _read(self, key: str) -> Any:
+        file_name = CONTENT_FILES[key]
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ContentError(f"{file_name}: {e}")
+        VALIDATORS[key](data, file_name)
+        return data
+
+    def _load(self, mtimes: Dict[str, float]) -> ContentSnapshot:
+        old = self._snapshot
+        data = {}
+        for key in CONTENT_FILES:
+            # Only re-read the files that actually changed
+            if old is not None and old.mtimes.get(key) == mtimes[key]:
+                data[key] = getattr(old, key)
+            else:
+                data[key] = self._read(key)
+        self.load_count += 1
+        snapshot = ContentSnapshot(data['questions'], data['personalities'], data['slang'], mtimes)
+        for hook in self.on_load:
+            hook(snapshot)
+        return snapshot
+
+    def snapshot(self) -> ContentSnapshot:
+        """Return the current content, reloading changed files at most once per check_interval"""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._last_check < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and now - self._last_check < self.check_interval:
+                return self._snapshot
+            self._last_check = now
+            try:
+                mtimes = self._current_mtimes()
+                if self._snapshot is None or mtimes != self._snapshot.mtimes:
+                    self._snapshot = self._load(mtimes)
+                self.last_error = None
+            except ContentError as e:
+                # Keep serving the last good content if an edit broke a file
+                self.last_error = e
+                if self._snapshot is None:
+                    raise
+            return self._snapshot
+
+    # Convenience accessors
+    def questions(self) -> Dict[str, List[Dict]]:
+        return self.snapshot().questions
+
+    def questions_for(self, age_group: str) -> List[Dict]:
+        """Questions for an age group, falling back to the first group in the file"""
+        snapshot = self.snapshot()
+        if age_group in snapshot.questions:
+            return snapshot.questions[age_group]
+        return snapshot.questions[snapshot.age_groups[0]]
+
+    def personalities(self) -> List[Dict]:
+        return self.snapshot().personalities
+
+    def personalities_by_trait(self, trait: str) -> List[Dict]:
+        return self.snapshot().personalities_by_trait.get(trait.lower(), [])
+
+    def slang_for(self, age_group: str) -> Dict[str, str]:
+        return self.snapshot().slang.get(age_group, {})
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# One keep-alive connection pool for every outbound call (OpenAI, OpenAI-compatible
+# backends, Lottie files), with counters to confirm connections are actually reused.
+# requests speaks HTTP/1.1 only; HTTP/2 would need httpx[http2], which isn't a dependency.
+
+DEFAULT_TIMEOUT = (3.05, 60.0)  # (connect, read) seconds
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+def _percentile(samples, fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class RequestStats:
+    """Per-host request counts, connection reuse and response times (to headers) of recent requests"""
+
+    def __init__(self, window: int = 1024):
+        self._window = window
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> Dict[str, Any]:
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = {
+                'requests': 0, 'connections_opened': 0, 'errors': 0,
+                'new': deque(maxlen=self._window), 'reused': deque(maxlen=self._window),
+            }
+        return entry
+
+    def record(self, host: str, seconds: float, new_connection: bool):
+        with self._lock:
+            entry = self._host(host)
+            entry['requests'] += 1
+            entry['connections_opened'] += new_connection
+            entry['new' if new_connection else 'reused'].append(seconds)
+
+    def record_error(self, host: str):
+        with self._lock:
+            self._host(host)['errors'] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counters and p50/p95 milliseconds per host, split by new vs reused connection"""
+        ms = lambda value: round(value * 1000, 1) if value is not None else None
+        with self._lock:
+            hosts = {host: (dict(entry), list(entry['new']), list(entry['reused'])) for host, entry in self._hosts.items()}
+        report = {}
+        for host, (entry, new, reused) in hosts.items():
+            both = new + reused
+            report[host] = {
+                'requests': entry['requests'],
+                'connections_opened': entry['connections_opened'],
+                'reuse_rate': round(1 - entry['connections_opened'] / entry['requests'], 3) if entry['requests'] else None,
+                'errors': entry['errors'],
+                'p50_ms': ms(_percentile(both, 0.5)),
+                'p95_ms': ms(_percentile(both, 0.95)),
+                'p50_new_connection_ms': ms(_percentile(new, 0.5)),
+                'p50_reused_connection_ms': ms(_percentile(reused, 0.5)),
+            }
+        return report
+
+
+# Connections opened (TCP connect + TLS handshake) by the current thread's request. urllib3
+# reconnects dropped keep-alive connections inside the same connection object, so its own
+# num_connections counter would miss those.
+_connects = threading.local()
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _connects.count = getattr(_connects, 'count', 0) + 1
+        super().connect()
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _connects.count = getattr(_connects, 'count', 0) + 1
+        super().connect()
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter that records, per request, the time to response headers and whether a new connection was opened"""
+
+    def __init__(self, stats: RequestStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _CountingHTTPConnectionPool,
+                                                   'https': _CountingHTTPSConnectionPool}
+
+    def send(self, request, **kwargs):
+        host = urlsplit(request.url).netloc
+        _connects.count = 0
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.RequestException:
+            self.stats.record_error(host)
+            raise
+        self.stats.record(host, time.perf_counter() - started, _connects.count > 0)
+        return response
+
+
+class PooledSession(requests.Session):
+    """requests.Session with sized keep-alive pools, a default timeout and request stats.
+
+    Meant to be shared by every thread in the process for its lifetime.
+    """
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 16, timeout: Timeout = DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        self.stats = RequestStats()
+        # pool_connections = distinct hosts kept, pool_maxsize = idle connections kept per host
+        adapter = InstrumentedAdapter(self.stats, pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                      max_retries=0)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().request(method, url, **kwargs)
+
+    def close(self):
+        # openai 0.28 "recycles" its session every 3 minutes by closing it, which would
+        # drop every pooled connection for all threads; the shared pool outlives that
+        pass
+
+    def shutdown(self):
+        super().close()
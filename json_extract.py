@@ -0,0 +1,331 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+# Parser states
+_SEEK, _KEY, _COLON, _VALUE_START, _VALUE, _DONE = range(6)
+
+
+class IncrementalFieldParser:
+    """Incremental parser for the JSON object the model streams back.
+
+    Feed text chunks as they arrive; feed() returns the (field, value) pairs of the
+    outermost object whose values became complete in that chunk. Text before the
+    first '{' (a ```json fence, a preamble) is skipped.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.fields = {}
+        self._pos = 0
+        self._state = _SEEK
+        self._in_string = False
+        self._escape = False
+        self._token_start = 0
+        self._nesting = 0
+        self._key = None
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def _emit(self, end: int, found: List[Tuple[str, Any]]):
+        raw = self.text[self._token_start:end].strip()
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = None
+        if value is not None and self._key is not None:
+            self.fields[self._key] = value
+            found.append((self._key, value))
+        self._key = None
+        self._state = _KEY
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        text = self.text
+        found: List[Tuple[str, Any]] = []
+        i = self._pos
+        while i < len(text) and self._state != _DONE:
+            c = text[i]
+            state = self._state
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if state == _KEY:
+                        try:
+                            self._key = json.loads(text[self._token_start:i + 1])
+                        except json.JSONDecodeError:
+                            self._key = None
+                        self._state = _COLON
+                    elif state == _VALUE and self._nesting == 0:
+                        self._emit(i + 1, found)
+
+            elif state == _SEEK:
+                if c == '{':
+                    self._state = _KEY
+
+            elif state == _KEY:
+                if c == '"':
+                    self._in_string = True
+                    self._token_start = i
+                elif c == '}':
+                    self._state = _DONE
+
+            elif state == _COLON:
+                if c == ':':
+                    self._state = _VALUE_START
+
+            elif state == _VALUE_START:
+                if not c.isspace():
+                    self._token_start = i
+                    self._nesting = 0
+                    self._state = _VALUE
+                    continue  # let _VALUE look at this character
+
+            elif state == _VALUE:
+                if c == '"':
+                    self._in_string = True
+                elif c in '[{':
+                    self._nesting += 1
+                elif c in ']}':
+                    if self._nesting == 0:
+                        # A bare number/literal closed by the end of the object
+                        self._emit(i, found)
+                        self._state = _DONE
+                    else:
+                        self._nesting -= 1
+                        if self._nesting == 0:
+                            self._emit(i + 1, found)
+                elif c == ',' and self._nesting == 0:
+                    self._emit(i, found)
+
+            i += 1
+        self._pos = i
+        return found
+
+
+
+# --- Tolerant extraction of a whole reply --- #
+
+# What the repair pass expects next inside the current container
+_EXPECT_KEY, _EXPECT_COLON, _EXPECT_VALUE, _EXPECT_COMMA = range(4)
+
+_QUOTES = '"“”'  # straight and smart double quotes
+_CLOSERS = {'{': '}', '[': ']'}
+_SIMPLE_ESCAPES = frozenset('"\\/bfnrt')
+_HEX = frozenset('0123456789abcdefABCDEF')
+_LITERAL_CHARS = frozenset('0123456789+-.eEtruefalsn')
+# Characters inside a string that need a closer look; everything between them is copied in one slice
+_STRING_SPECIAL = re.compile(r'["“”\\\x00-\x1f]')
+_TRAILING_HIGH_SURROGATE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}$')
+
+# What may follow a quote for it to close a string rather than be part of the text. A key: , : } ]
+# or the end, or (a missing colon) whitespace and another quote; an array item the same except :.
+# A value in an object: } ] or the end, or a comma or (a missing comma) whitespace followed by the
+# next key (cut off or not), so that "He said "go", then left" stays one string.
+_QUOTED_KEY = r'["“”][^"“”\n{}\[\],:]*(?:["“”]\s*(?::|$)|$)'
+_BARE_KEY = r'[A-Za-z_]\w*\s*(?::|$)'
+_KEY_END = re.compile(r'\s*(?:$|[,:}\]])|\s+["“”]')
+_ITEM_END = re.compile(r'\s*(?:$|[,}\]])|\s+["“”]')
+_VALUE_END = re.compile(r'\s*(?:$|[}\]]|,[\s,]*(?:$|[}\]]|' + _QUOTED_KEY + '|' + _BARE_KEY + ')|' + _QUOTED_KEY + ')')
+
+
+def _scan_string(text: str, i: int, ends: Pattern = _VALUE_END) -> Tuple[str, int, bool]:
+    """Read the string opening at text[i]; returns (JSON string literal, index after it, whether it was closed).
+
+    Smart quotes open and close strings, bad escapes keep the escaped character, raw
+    control characters are escaped, and a quote that isn't followed by what ends allows
+    (_KEY_END, _ITEM_END or _VALUE_END) is taken as part of the text.
+    """
+    closers = '"' if text[i] == '"' else _QUOTES
+    n = len(text)
+    parts = ['"']
+    i += 1
+    start = i
+    while True:
+        match = _STRING_SPECIAL.search(text, i)
+        if match is None:
+            break
+        i = match.start()
+        c = text[i]
+        if c == '\\':
+            parts.append(text[start:i])
+            e = text[i + 1] if i + 1 < n else ''
+            if e in _SIMPLE_ESCAPES:
+                parts.append(text[i:i + 2])
+                i += 2
+            elif e == 'u' and len(text) >= i + 6 and all(h in _HEX for h in text[i + 2:i + 6]):
+                parts.append(text[i:i + 6])
+                i += 6
+            elif e == 'u' and len(text) < i + 6 or not e:
+                # Cut off inside the escape
+                start = i = n
+                break
+            else:
+                parts.append(json.dumps(e)[1:-1])
+                i += 2
+            start = i
+        elif c in closers or c == '"':
+            if c in closers and ends.match(text, i + 1):
+                parts.append(text[start:i])
+                parts.append('"')
+                return ''.join(parts), i + 1, True
+            # A quote inside the text
+            parts.append(text[start:i])
+            parts.append('\\"' if c == '"' else c)
+            i += 1
+            start = i
+        elif c < ' ':
+            parts.append(text[start:i])
+            parts.append(json.dumps(c)[1:-1])
+            i += 1
+            start = i
+        else:
+            i += 1  # a smart quote in a straight-quoted string
+    parts.append(text[start:n])
+    # Don't end on the first half of a surrogate pair whose second half was cut off
+    literal = _TRAILING_HIGH_SURROGATE.sub('', ''.join(parts))
+    return literal + '"', n, False
+
+
+def repair_json(text: str, drop_truncated: bool = False) -> Optional[str]:
+    """Rewrite the outermost {...} in text as valid JSON, or None when there is no object.
+
+    One pass over the text: anything before the first '{' (fences, preambles) and after the
+    object is dropped; smart quotes, trailing or missing commas and colons, bare words, raw
+    newlines and bad escapes inside strings are fixed; a reply cut off at the token limit has
+    its last string closed (or, with drop_truncated, dropped along with its key), a key left
+    without a value dropped and its brackets closed.
+    """
+    i = text.find('{')
+    if i < 0:
+        return None
+    n = len(text)
+    out: List[str] = ['{']
+    stack: List[str] = ['{']
+    expect = _EXPECT_KEY
+    key_mark = 1  # where the current object member starts in out, to drop it if it never gets a value
+    i += 1
+
+    def key_next() -> bool:
+        return expect == _EXPECT_KEY or (expect == _EXPECT_COMMA and stack[-1] == '{')
+
+    def emit(token: str):
+        # Adds a key or value, inserting a missing comma or colon first
+        nonlocal expect, key_mark
+        if expect == _EXPECT_COMMA:
+            out.append(',')
+            expect = _EXPECT_KEY if stack[-1] == '{' else _EXPECT_VALUE
+        elif expect == _EXPECT_COLON:
+            out.append(':')
+            expect = _EXPECT_VALUE
+        if expect == _EXPECT_KEY:
+            key_mark = len(out) - (out[-1] == ',')
+            expect = _EXPECT_COLON
+        else:
+            expect = _EXPECT_COMMA
+        out.append(token)
+
+    while i < n and stack:
+        c = text[i]
+        if c in ' \t\r\n':
+            i += 1
+        elif c in _QUOTES:
+            ends = _KEY_END if key_next() else _ITEM_END if stack[-1] == '[' else _VALUE_END
+            literal, i, closed = _scan_string(text, i, ends)
+            emit(literal)
+            if not closed:
+                if drop_truncated and expect == _EXPECT_COMMA:
+                    if stack[-1] == '{':
+                        del out[key_mark:]
+                    else:
+                        out.pop()
+                break
+        elif c in '{[':
+            i += 1
+            if key_next():
+                continue  # a container where a key belongs: ignore the bracket, keep its contents
+            emit(c)
+            stack.append(c)
+            expect = _EXPECT_KEY if c == '{' else _EXPECT_VALUE
+        elif c in '}]':
+            i += 1
+            if stack[-1] == '{' and expect in (_EXPECT_COLON, _EXPECT_VALUE):
+                del out[key_mark:]  # key without a value
+            if out[-1] == ',':
+                out.pop()  # trailing comma
+            out.append(_CLOSERS[stack.pop()])
+            expect = _EXPECT_COMMA
+        elif c == ',':
+            i += 1
+            if expect == _EXPECT_COMMA:
+                out.append(',')
+                expect = _EXPECT_KEY if stack[-1] == '{' else _EXPECT_VALUE
+        elif c == ':':
+            i += 1
+            if expect == _EXPECT_COLON:
+                out.append(':')
+                expect = _EXPECT_VALUE
+        else:
+            # A number or literal, or an unquoted word where a key or value belongs
+            is_key = key_next()
+            # A value stops at a quote too: 1 "b": 2 is a missing comma, not the value '1 "b": 2'
+            stops = ',:}]\n' if is_key else ',}]\n' + _QUOTES
+            j = i
+            while j < n and text[j] not in stops:
+                j += 1
+            word = text[i:j].strip()
+            i = j
+            if not word:
+                continue
+            if not is_key and set(word) <= _LITERAL_CHARS:
+                try:
+                    json.loads(word)
+                except ValueError:
+                    if j >= n:
+                        break  # a number or literal cut off mid-way
+                else:
+                    emit(word)
+                    continue
+            emit(json.dumps(word.strip('\'"“”'), ensure_ascii=False))
+
+    # Cut off: drop a dangling key or comma, then close whatever is still open
+    if stack:
+        if stack[-1] == '{' and expect in (_EXPECT_COLON, _EXPECT_VALUE):
+            del out[key_mark:]
+        if out[-1] == ',':
+            out.pop()
+        while stack:
+            out.append(_CLOSERS[stack.pop()])
+    return ''.join(out)
+
+
+def extract_json_object(text: str, drop_truncated: bool = False) -> Optional[Dict[str, Any]]:
+    """The outermost JSON object in a model reply, repaired where needed; None if there isn't one.
+
+    drop_truncated leaves out a string value the reply was cut off in, rather than keeping its start.
+    """
+    # Well-formed replies (possibly fenced) parse directly
+    start, end = text.find('{'), text.rfind('}')
+    if 0 <= start < end:
+        try:
+            value = json.loads(text[start:end + 1])
+        except ValueError:
+            pass
+        else:
+            if isinstance(value, dict):
+                return value
+    repaired = repair_json(text, drop_truncated)
+    if repaired is None:
+        return None
+    try:
+        value = json.loads(repaired)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
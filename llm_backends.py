@@ -0,0 +1,397 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Iterator, List, Mapping, Optional
+
+import openai
+import requests
+
+from settings import SettingsError
+
+# Chat completion backends behind one interface, picked by configuration (VIBE_LLM_* settings)
+# rather than code edits. Every backend raises LLMError, so callers handle one error type.
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+Messages = List[Dict[str, str]]
+
+
+class LLMError(RuntimeError):
+    """A completion request failed; status is the HTTP status when there was one (429 = rate limited)"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class LLMConfigError(SettingsError):
+    """The configured backend is unknown or missing a required setting"""
+
+
+def approximate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters each) for when the server doesn't report usage"""
+    return (len(text) + 3) // 4
+
+def approximate_prompt_tokens(messages: Messages) -> int:
+    counted = getattr(messages, 'tokens', None)
+    if counted is not None:
+        return counted
+    return sum(approximate_tokens(m.get('content', '')) for m in messages)
+
+
+class CountedMessages(list):
+    """Messages that carry their approximate prompt token count, worked out when they were built"""
+
+    def __init__(self, messages: Messages, tokens: int):
+        super().__init__(messages)
+        self.tokens = tokens
+
+
+class TokenUsage:
+    """Prompt/completion tokens and response time of every request a backend sends.
+
+    Totals cover the process lifetime; the most recent requests are kept individually.
+    Counts the server didn't report are approximated from the text and flagged.
+    """
+
+    def __init__(self, window: int = 256):
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.approximated = 0
+
+    def record(self, prompt_tokens: int, completion_tokens: int, seconds: float, approximated: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.approximated += approximated
+            self._recent.append((prompt_tokens, completion_tokens, seconds, approximated))
+
+    def stats(self, last: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            recent = list(self._recent)
+            requests, prompt, completion, approximated = (self.requests, self.prompt_tokens,
+                                                          self.completion_tokens, self.approximated)
+        latencies = sorted(seconds for _, _, seconds, _ in recent)
+        return {
+            'requests': requests,
+            'prompt_tokens': prompt,
+            'completion_tokens': completion,
+            'approximated': approximated,
+            'mean_prompt_tokens': round(prompt / requests, 1) if requests else None,
+            'mean_completion_tokens': round(completion / requests, 1) if requests else None,
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000) if latencies else None,
+            'recent': [{'prompt_tokens': p, 'completion_tokens': c, 'ms': round(seconds * 1000), 'approximated': a}
+                       for p, c, seconds, a in (recent[-last:] if last else [])],
+        }
+
+
+class LLMBackend:
+    """Chat completion backend: complete() returns the reply text, stream() yields it in pieces.
+
+    json_mode asks the server to constrain the reply to a single JSON object. Every
+    request's token counts go to usage.
+    """
+
+    name = 'base'
+
+    def __init__(self, model: str = DEFAULT_MODEL):
+        self.model = model
+        self.usage = TokenUsage()
+
+    def complete(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> str:
+        raise NotImplementedError
+
+    def stream(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> Iterator[str]:
+        yield self.complete(messages, max_tokens, temperature, json_mode)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(model={self.model!r})"
+
+
+class OpenAIBackend(LLMBackend):
+    """The hosted OpenAI API through the openai package (0.28 interface)"""
+
+    name = 'openai'
+
+    def __init__(self, api_key: str, model: str = DEFAULT_MODEL, timeout: Optional[float] = None,
+                 session: Optional[requests.Session] = None):
+        super().__init__(model)
+        self.api_key = api_key
+        self.timeout = timeout
+        if session is not None:
+            # The openai package has one process-wide session hook
+            openai.requestssession = session
+
+    def _create(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool, stream: bool = False):
+        extra = {}
+        if json_mode:
+            extra['response_format'] = {'type': 'json_object'}
+        if stream:
+            # The final chunk then carries the request's token usage
+            extra['stream_options'] = {'include_usage': True}
+        try:
+            return openai.ChatCompletion.create(model=self.model, messages=messages, max_tokens=max_tokens,
+                                                temperature=temperature, stream=stream, api_key=self.api_key,
+                                                request_timeout=self.timeout, **extra)
+        except openai.error.OpenAIError as e:
+            headers = getattr(e, 'headers', None) or {}
+            raise LLMError(str(e), getattr(e, 'http_status', None), _retry_after(headers.get('retry-after'))) from e
+
+    def complete(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> str:
+        started = time.perf_counter()
+        response = self._create(messages, max_tokens, temperature, json_mode)
+        text = response.choices[0].message.content
+        _record_usage(self.usage, response.get('usage'), messages, text, time.perf_counter() - started)
+        return text
+
+    def stream(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> Iterator[str]:
+        started = time.perf_counter()
+        parts, usage = [], None
+        for chunk in self._create(messages, max_tokens, temperature, json_mode, stream=True):
+            usage = chunk.get('usage') or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].get("delta", {}).get("content")
+            if delta:
+                parts.append(delta)
+                yield delta
+        _record_usage(self.usage, usage, messages, ''.join(parts), time.perf_counter() - started)
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Any server speaking the OpenAI chat completions protocol over HTTP (vLLM, Ollama, the stub server)"""
+
+    name = 'openai-compatible'
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, model: str = DEFAULT_MODEL, timeout: float = 60.0,
+                 session: Optional[requests.Session] = None):
+        super().__init__(model)
+        self.url = base_url.rstrip('/') + '/chat/completions'
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def _post(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool, stream: bool = False):
+        headers = {'Authorization': f"Bearer {self.api_key}"} if self.api_key else {}
+        body = {'model': self.model, 'messages': messages, 'max_tokens': max_tokens,
+                'temperature': temperature, 'stream': stream}
+        if json_mode:
+            body['response_format'] = {'type': 'json_object'}
+        try:
+            response = self.session.post(self.url, json=body, headers=headers, timeout=self.timeout, stream=stream)
+        except requests.RequestException as e:
+            raise LLMError(f"{self.url}: {e}") from e
+        if response.status_code >= 400:
+            raise LLMError(f"{self.url}: HTTP {response.status_code} {response.text[:200]}", response.status_code,
+                           _retry_after(response.headers.get('Retry-After')))
+        return response
+
+    def complete(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> str:
+        started = time.perf_counter()
+        response = self._post(messages, max_tokens, temperature, json_mode)
+        try:
+            payload = response.json()
+            text = payload['choices'][0]['message']['content']
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMError(f"{self.url}: malformed response ({e})") from e
+        _record_usage(self.usage, payload.get('usage'), messages, text, time.perf_counter() - started)
+        return text
+
+    def stream(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> Iterator[str]:
+        started = time.perf_counter()
+        response = self._post(messages, max_tokens, temperature, json_mode, stream=True)
+        parts, usage = [], None
+        # Server-sent events: one "data: {chunk}" line per delta, then "data: [DONE]"
+        with response:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        break
+                    chunk = json.loads(data)
+                    usage = chunk.get('usage') or usage
+                    if not chunk.get('choices'):
+                        continue
+                    delta = chunk['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+                raise LLMError(f"{self.url}: stream broken ({e})") from e
+        _record_usage(self.usage, usage, messages, ''.join(parts), time.perf_counter() - started)
+
+
+# --- Deterministic stub --- #
+
+_STUB_ADJECTIVES = ['Strategic', 'Gentle', 'Bold', 'Curious', 'Radiant', 'Quiet', 'Electric', 'Grounded']
+_STUB_NOUNS = ['Dream Chaser', 'Adventure Seeker', 'Comfort Creator', 'Story Weaver', 'Trail Blazer', 'Vibe Curator']
+_STUB_VIBES = ['Chaotic but intentional', 'Calm and magnetic', 'Playfully strategic', 'Warm and unstoppable']
+_STUB_MATCHES = ['Night-owl creatives', 'Calm planners', 'Spontaneous explorers', 'Loyal homebodies', 'Big-idea dreamers']
+_QUOTED_CHOICE = re.compile(r'"([^"\n]{3,120})" -')
+_PERCENT = re.compile(r'(\d+)% vs (\d+)% introverted')
+
+
+def stub_reading_text(prompt: str) -> str:
+    """Deterministic reading JSON for a prompt: the same prompt always gets the same reply"""
+    digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+    choices = _QUOTED_CHOICE.findall(prompt) or ['your answers']
+    percent = _PERCENT.search(prompt)
+    extro = percent.group(1) if percent else '50'
+    pick = lambda options, i: options[digest[i] % len(options)]
+    first, last = choices[0], choices[-1]
+    return json.dumps({
+        "personality_name": f"{pick(_STUB_ADJECTIVES, 0)} {pick(_STUB_NOUNS, 1)}",
+        "essence": f"Choosing \"{first}\" says you turn ordinary moments into something worth sharing.",
+        "hidden_trait": f"You secretly plan the spontaneous moments, which is why you went with \"{last}\".",
+        "superpower": "Spotting what a room needs before anyone says it",
+        "vibe_check": pick(_STUB_VIBES, 2),
+        "compatibility_vibes": [pick(_STUB_MATCHES, 3), pick(_STUB_MATCHES, 4)],
+        "personal_insight": f"You keep options open, then commit hard once it feels right - like picking \"{choices[len(choices) // 2]}\".",
+        "social_energy": f"You're {extro}% extroverted because you chose \"{first}\", but \"{last}\" shows you need time to recharge."
+    }, indent=2)
+
+
+class StubBackend(LLMBackend):
+    """Offline backend for load tests: deterministic replies, log-normal latency and injected failures.
+
+    latency_ms is the median total response time and latency_sigma the log-normal spread
+    (0 = fixed). error_rate and rate_limit_rate are the fractions of requests that fail
+    with a 500 or a 429. Draws come from one seeded RNG, so a run is repeatable for a
+    given request order.
+    """
+
+    name = 'stub'
+
+    def __init__(self, model: str = 'stub', latency_ms: float = 0.0, latency_sigma: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, chunk_size: int = 16, seed: Optional[int] = None):
+        super().__init__(model)
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.chunk_size = chunk_size
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        """Latency in seconds and the injected failure (None, 500 or 429) for the next request"""
+        with self._lock:
+            latency = self.latency_ms / 1000.0
+            if latency and self.latency_sigma:
+                latency *= self._random.lognormvariate(0.0, self.latency_sigma)
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return latency, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return latency, 500
+        return latency, None
+
+    @staticmethod
+    def _fail(status: int):
+        if status == 429:
+            raise LLMError("stub: rate limit reached", 429, retry_after=1.0)
+        raise LLMError("stub: injected server error", 500)
+
+    def complete(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> str:
+        latency, failure = self._draw()
+        if failure:
+            # Rate limits come back fast; server errors after the usual wait
+            time.sleep(latency if failure != 429 else 0)
+            self._fail(failure)
+        time.sleep(latency)
+        text = stub_reading_text(messages[-1]['content'])
+        _record_usage(self.usage, None, messages, text, latency)
+        return text
+
+    def stream(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> Iterator[str]:
+        latency, failure = self._draw()
+        if failure:
+            time.sleep(latency if failure != 429 else 0)
+            self._fail(failure)
+        text = stub_reading_text(messages[-1]['content'])
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        # A quarter of the time goes to the first token, the rest is spread over the chunks
+        time.sleep(latency * 0.25)
+        per_chunk = latency * 0.75 / len(chunks)
+        for chunk in chunks:
+            yield chunk
+            if per_chunk:
+                time.sleep(per_chunk)
+        _record_usage(self.usage, None, messages, text, latency)
+
+
+def _record_usage(usage: TokenUsage, reported: Optional[Mapping], messages: Messages, text: str, seconds: float):
+    """Record the server's usage block, or approximate it from the text when there wasn't one"""
+    if reported:
+        usage.record(int(reported.get('prompt_tokens', 0)), int(reported.get('completion_tokens', 0)), seconds)
+    else:
+        usage.record(approximate_prompt_tokens(messages), approximate_tokens(text), seconds, approximated=True)
+
+def _retry_after(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+# --- Configuration --- #
+
+BACKENDS = ('openai', 'openai-compatible', 'stub')
+
+def llm_settings(secrets: Optional[Mapping] = None, environ: Optional[Mapping] = None) -> Dict[str, str]:
+    """VIBE_LLM_* settings (plus OPENAI_API_KEY) from secrets, overridden by the environment"""
+    environ = os.environ if environ is None else environ
+    settings = {}
+    for source in (secrets or {}, environ):
+        for key in source:
+            if key.startswith('VIBE_LLM_') or key == 'OPENAI_API_KEY':
+                settings[key] = str(source[key])
+    return settings
+
+def streaming_from_settings(settings: Mapping[str, str]) -> bool:
+    """Stream replies as they're written unless VIBE_LLM_STREAM is 0, false or no"""
+    return settings.get('VIBE_LLM_STREAM', '1').strip().lower() not in ('0', 'false', 'no')
+
+def backend_from_settings(settings: Mapping[str, str], session: Optional[requests.Session] = None) -> LLMBackend:
+    """Build the backend named by VIBE_LLM_BACKEND (default openai); HTTP backends send through session"""
+    kind = settings.get('VIBE_LLM_BACKEND', 'openai').strip().lower()
+    model = settings.get('VIBE_LLM_MODEL')
+    api_key = settings.get('VIBE_LLM_API_KEY') or settings.get('OPENAI_API_KEY')
+    try:
+        timeout = float(settings.get('VIBE_LLM_TIMEOUT', 60))
+        if kind == 'openai':
+            if not api_key:
+                raise LLMConfigError("OpenAI API key not found; set OPENAI_API_KEY in .streamlit/secrets.toml or the environment")
+            return OpenAIBackend(api_key, model or DEFAULT_MODEL, timeout, session)
+        if kind == 'openai-compatible':
+            if not settings.get('VIBE_LLM_BASE_URL'):
+                raise LLMConfigError("VIBE_LLM_BACKEND=openai-compatible needs VIBE_LLM_BASE_URL")
+            return OpenAICompatibleBackend(settings['VIBE_LLM_BASE_URL'], api_key, model or DEFAULT_MODEL,
+                                           timeout, session)
+        if kind == 'stub':
+            seed = settings.get('VIBE_LLM_STUB_SEED')
+            return StubBackend(
+                model or 'stub',
+                latency_ms=float(settings.get('VIBE_LLM_STUB_LATENCY_MS', 0)),
+                latency_sigma=float(settings.get('VIBE_LLM_STUB_LATENCY_SIGMA', 0)),
+                error_rate=float(settings.get('VIBE_LLM_STUB_ERROR_RATE', 0)),
+                rate_limit_rate=float(settings.get('VIBE_LLM_STUB_RATE_LIMIT_RATE', 0)),
+                seed=int(seed) if seed is not None else None,
+            )
+    except ValueError as e:
+        if isinstance(e, LLMConfigError):
+            raise
+        raise LLMConfigError(f"invalid VIBE_LLM_* setting: {e}") from e
+    raise LLMConfigError(f"unknown VIBE_LLM_BACKEND {kind!r} (expected one of {', '.join(BACKENDS)})")
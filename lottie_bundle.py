@@ -0,0 +1,110 @@
+"""Vendor every Lottie animation the personalities reference into one local, minified bundle.
+
+Usage:
+    python lottie_bundle.py                  # fetch each avatar_animation in data/personalities.json
+    python lottie_bundle.py --precision 2    # coarser numbers, smaller bundle
+
+The app loads the bundle once per process and serves animations from memory; only URLs
+missing from it are fetched at request time. Rebuild after changing an avatar_animation.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Any, Iterable, Optional
+
+import requests
+
+from content_store import DATA_DIR, ContentStore
+from http_client import PooledSession
+
+DEFAULT_BUNDLE_PATH = os.environ.get('VIBE_LOTTIE_BUNDLE', os.path.join(DATA_DIR, 'lottie_bundle.json'))
+BUNDLE_VERSION = 1
+# Decimal places kept in coordinates and keyframe values; 3 is below what a 1x-3x screen can show
+DEFAULT_PRECISION = 3
+
+
+def minify_animation(value: Any, precision: int = DEFAULT_PRECISION) -> Any:
+    """The animation with floats rounded to precision places (whole ones written as ints)"""
+    if isinstance(value, float):
+        rounded = round(value, precision)
+        return int(rounded) if rounded.is_integer() else rounded
+    if isinstance(value, list):
+        return [minify_animation(v, precision) for v in value]
+    if isinstance(value, dict):
+        return {k: minify_animation(v, precision) for k, v in value.items()}
+    return value
+
+
+def animation_urls(personalities: Iterable[Dict[str, Any]]) -> list:
+    """Distinct avatar_animation URLs, in file order"""
+    return list(dict.fromkeys(p['avatar_animation'] for p in personalities if p.get('avatar_animation')))
+
+
+def build_bundle(urls: Iterable[str], session: requests.Session, precision: int = DEFAULT_PRECISION,
+                 timeout: float = 30) -> Dict[str, Any]:
+    """Fetch and minify each URL; ones that fail are reported and left out"""
+    animations = {}
+    for url in urls:
+        try:
+            r = session.get(url, timeout=timeout)
+            r.raise_for_status()
+            animations[url] = minify_animation(r.json(), precision)
+        except (requests.RequestException, ValueError) as e:
+            print(f"  {url}: {e}", file=sys.stderr)
+    return {'version': BUNDLE_VERSION, 'precision': precision, 'created': int(time.time()), 'animations': animations}
+
+
+def write_bundle(path: str, bundle: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(bundle, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class LottieBundle:
+    """Vendored animations by URL, parsed once and kept in memory"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_BUNDLE_PATH):
+        self.path = path
+        self.animations: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        if not path or not os.path.exists(path):
+            return
+        # A bad bundle only costs the network fetches it would have saved
+        try:
+            with open(path, encoding='utf-8') as f:
+                bundle = json.load(f)
+        except (OSError, ValueError) as e:
+            self.error = f"{path}: {e}"
+            return
+        if bundle.get('version') == BUNDLE_VERSION:
+            self.animations = bundle.get('animations', {})
+        else:
+            self.error = f"{path}: bundle version {bundle.get('version')!r}, expected {BUNDLE_VERSION}"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.animations.get(url)
+
+    def __len__(self):
+        return len(self.animations)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION, help="decimal places kept in numbers")
+    parser.add_argument('--output', default=DEFAULT_BUNDLE_PATH)
+    args = parser.parse_args(argv)
+
+    urls = animation_urls(ContentStore().snapshot().personalities)
+    bundle = build_bundle(urls, PooledSession(), args.precision)
+    write_bundle(args.output, bundle)
+    print(f"Wrote {args.output}: {len(bundle['animations'])} of {len(urls)} animations "
+          f"({os.path.getsize(args.output) / 1024:.0f} KiB)")
+    return 0 if len(bundle['animations']) == len(urls) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
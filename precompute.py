@@ -0,0 +1,256 @@
+"""Pre-generate readings for every answer path and pack them into a memory-mappable artifact.
+
+Usage:
+    python precompute.py --backend fallback
+    OPENAI_API_KEY=... python precompute.py --backend llm --workers 8
+
+The llm backend is whatever the VIBE_LLM_* environment settings select (OpenAI by default).
+"""
+import argparse
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Sequence
+
+from content_store import ContentStore, ContentSnapshot
+from reading_cache import CACHE_DIR, ReadingCache, reading_key, anonymize_reading
+from oracle import (
+    PROMPT_STYLES, DEFAULT_PROMPT_STYLE, prompt_version, prompt_style_from_settings, reading_version, generate_reading,
+    generate_smart_fallback, is_complete_reading, precompile_choice_categories
+)
+from http_client import PooledSession
+from llm_backends import LLMBackend, LLMConfigError, llm_settings, backend_from_settings
+from scoring import TRAITS, engine_for
+
+DEFAULT_ARTIFACT_PATH = os.environ.get('VIBE_PRECOMPUTED', os.path.join(CACHE_DIR, 'precomputed_readings.bin'))
+
+# Readings are generated for this stand-in name and stored anonymized
+PRECOMPUTE_NAME = "Nova"
+
+# reading_version of an artifact of offline keyword readings (--backend fallback)
+FALLBACK_READING_VERSION = 'fallback'
+
+MAGIC = b'VIBEPRE1'
+_HEADER_LEN = struct.Struct('<I')
+_ENTRY = struct.Struct('<II')  # (offset into data section, length); length 0 = missing
+
+
+def answer_paths(radix: Sequence[int]):
+    """Every answer path in mixed-radix order (first question is the most significant digit)"""
+    return itertools.product(*(range(n) for n in radix))
+
+def path_position(radix: Sequence[int], answer_indices: Sequence[int]) -> int:
+    position = 0
+    for n, i in zip(radix, answer_indices):
+        position = position * n + i
+    return position
+
+
+# --- Artifact file --- #
+
+def write_artifact(path: str, readings: Dict[str, List[Optional[Dict[str, Any]]]], radix: Dict[str, List[int]], meta: Dict[str, Any]):
+    """Write readings (one list per age group, in answer_paths order) to path.
+
+    Identical readings are stored once; the per-group index points at the shared blob.
+    """
+    blobs: Dict[bytes, int] = {}
+    data = bytearray()
+    groups = []
+    index = bytearray()
+    for age_group, group_readings in readings.items():
+        groups.append({'age_group': age_group, 'radix': radix[age_group], 'index_offset': len(index)})
+        for reading in group_readings:
+            if reading is None:
+                index += _ENTRY.pack(0, 0)
+                continue
+            blob = json.dumps(reading, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+            offset = blobs.get(blob)
+            if offset is None:
+                offset = blobs[blob] = len(data)
+                data += blob
+            index += _ENTRY.pack(offset, len(blob))
+
+    header = dict(meta, groups=groups, index_size=len(index), data_size=len(data), unique_readings=len(blobs))
+    header_bytes = json.dumps(header).encode('utf-8')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header_bytes)))
+        f.write(header_bytes)
+        f.write(index)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def artifact_mtime(path: str = DEFAULT_ARTIFACT_PATH) -> Optional[int]:
+    """Modification time of the artifact in ns, None if there is none; changes whenever it is rebuilt"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ReadingArtifact:
+    """Read-only, memory-mapped view of a precomputed readings file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a precomputed readings file")
+        start = len(MAGIC)
+        (header_len,) = _HEADER_LEN.unpack_from(self._mm, start)
+        start += _HEADER_LEN.size
+        self.header = json.loads(self._mm[start:start + header_len])
+        self._index_start = start + header_len
+        self._data_start = self._index_start + self.header['index_size']
+        self._groups = {g['age_group']: g for g in self.header['groups']}
+        if len(self._mm) != self._data_start + self.header['data_size']:
+            raise ValueError(f"{path} is truncated")
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_ARTIFACT_PATH, snapshot: Optional[ContentSnapshot] = None,
+             prompt_version: Optional[str] = None, reading_version: Optional[str] = None) -> Optional['ReadingArtifact']:
+        """Open path if it exists and still matches the content, prompt version and the backend and model
+        that wrote it (reading_version), else None; a damaged file counts as missing"""
+        if not os.path.exists(path):
+            return None
+        try:
+            artifact = cls(path)
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return None
+        if snapshot is not None and artifact.header.get('content_fingerprint') != snapshot.content_fingerprint():
+            return None
+        if prompt_version is not None and artifact.header.get('prompt_version') != prompt_version:
+            return None
+        if reading_version is not None and artifact.header.get('reading_version') != reading_version:
+            return None
+        return artifact
+
+    def lookup(self, age_group: str, answer_indices: Sequence[int]) -> Optional[Dict[str, Any]]:
+        """Anonymized reading for an answer path, or None if it was not precomputed"""
+        group = self._groups.get(age_group)
+        if group is None or len(answer_indices) != len(group['radix']):
+            return None
+        if any(not 0 <= i < n for i, n in zip(answer_indices, group['radix'])):
+            return None
+        entry_at = self._index_start + group['index_offset'] + path_position(group['radix'], answer_indices) * _ENTRY.size
+        offset, length = _ENTRY.unpack_from(self._mm, entry_at)
+        if not length:
+            return None
+        start = self._data_start + offset
+        return json.loads(self._mm[start:start + length])
+
+
+# --- Generation --- #
+
+def _reading_for_path(llm: Optional[LLMBackend], style: str, age_group: str, options: List[List[str]], answer_indices,
+                      traits: Dict[str, int], cache: Optional[ReadingCache]) -> Optional[Dict[str, Any]]:
+    answers = [options[q][i] for q, i in enumerate(answer_indices)]
+    if llm is None:
+        return anonymize_reading(generate_smart_fallback(PRECOMPUTE_NAME, age_group, answers, traits), PRECOMPUTE_NAME)
+
+    # AI readings go through the shared cache so an interrupted run picks up where it stopped
+    key = reading_key(age_group, answer_indices, traits, reading_version(llm, style))
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        return cached
+    try:
+        reading = anonymize_reading(generate_reading(PRECOMPUTE_NAME, age_group, answers, traits, llm, style),
+                                    PRECOMPUTE_NAME)
+    except Exception as e:
+        print(f"  {age_group} {''.join(map(str, answer_indices))}: {e}", file=sys.stderr)
+        return None
+    # Patched-up readings (e.g. cut off at the token limit) are left out so the app generates them afresh
+    if not is_complete_reading(reading):
+        print(f"  {age_group} {''.join(map(str, answer_indices))}: incomplete reading "
+              f"(missing {', '.join(reading.get('filled_fields', []))})", file=sys.stderr)
+        return None
+    if cache:
+        cache.put(key, reading, PRECOMPUTE_NAME)
+    return reading
+
+def precompute(snapshot: ContentSnapshot, llm: Optional[LLMBackend], age_groups: Optional[List[str]] = None,
+               workers: int = 4, cache: Optional[ReadingCache] = None, style: str = DEFAULT_PROMPT_STYLE):
+    """Generate a reading for every answer path (llm=None for keyword fallbacks); returns (readings, radix) for write_artifact"""
+    readings: Dict[str, List[Optional[Dict[str, Any]]]] = {}
+    radix: Dict[str, List[int]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for age_group in age_groups or snapshot.age_groups:
+            options = [q['options'] for q in snapshot.questions[age_group]]
+            radix[age_group] = [len(o) for o in options]
+            started = time.perf_counter()
+            # Score every path in one batch before generating
+            paths = list(answer_paths(radix[age_group]))
+            scores = engine_for(snapshot, age_group).score_batch(paths).tolist()
+            readings[age_group] = list(pool.map(
+                lambda path, score: _reading_for_path(llm, style, age_group, options, path,
+                                                      dict(zip(TRAITS, score)), cache),
+                paths, scores
+            ))
+            missing = sum(1 for r in readings[age_group] if r is None)
+            print(f"{age_group}: {len(readings[age_group])} paths in {time.perf_counter() - started:.1f}s ({missing} missing)")
+    return readings, radix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', choices=['llm', 'fallback'], default='llm',
+                        help="llm uses the VIBE_LLM_* configured backend; fallback uses the offline keyword reading")
+    parser.add_argument('--model', help="override VIBE_LLM_MODEL")
+    parser.add_argument('--prompt', choices=list(PROMPT_STYLES), help="override VIBE_LLM_PROMPT")
+    parser.add_argument('--age-group', action='append', dest='age_groups', help="limit to one age group (repeatable)")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent AI requests")
+    parser.add_argument('--output', default=DEFAULT_ARTIFACT_PATH)
+    args = parser.parse_args(argv)
+
+    llm = None
+    session = PooledSession(pool_maxsize=max(1, args.workers))
+    settings = llm_settings()
+    if args.model:
+        settings['VIBE_LLM_MODEL'] = args.model
+    if args.prompt:
+        settings['VIBE_LLM_PROMPT'] = args.prompt
+    try:
+        style = prompt_style_from_settings(settings)
+        if args.backend == 'llm':
+            llm = backend_from_settings(settings, session)
+    except LLMConfigError as e:
+        parser.error(str(e))
+
+    snapshot = ContentStore(on_load=[precompile_choice_categories]).snapshot()
+    unknown = set(args.age_groups or []) - set(snapshot.age_groups)
+    if unknown:
+        parser.error(f"unknown age group(s): {', '.join(sorted(unknown))}")
+
+    cache = ReadingCache() if llm is not None else None
+    readings, radix = precompute(snapshot, llm, args.age_groups, args.workers, cache, style)
+    write_artifact(args.output, readings, radix, {
+        'prompt_version': prompt_version(style),
+        'reading_version': reading_version(llm, style) if llm is not None else FALLBACK_READING_VERSION,
+        'backend': llm.name if llm is not None else 'fallback',
+        'model': llm.model if llm is not None else None,
+        'content_fingerprint': snapshot.content_fingerprint(),
+        'created': int(time.time()),
+    })
+    print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB)")
+    for host, stats in session.stats.snapshot().items():
+        print(f"{host}: {stats['requests']} requests over {stats['connections_opened']} connections, "
+              f"p50 {stats['p50_ms']}ms (new connection {stats['p50_new_connection_ms']}ms)")
+    if llm is not None and llm.usage.requests:
+        usage = llm.usage.stats(last=0)
+        print(f"{style} prompt: {usage['requests']} requests, {usage['mean_prompt_tokens']} prompt + "
+              f"{usage['mean_completion_tokens']} completion tokens each "
+              f"({usage['prompt_tokens'] + usage['completion_tokens']:,} total"
+              f"{', approximated' if usage['approximated'] else ''}), p50 {usage['p50_ms']}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import cProfile
+import hmac
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, Any, List, Mapping, Optional
+
+from settings import SettingsError
+
+# Opt-in profiling of whole reruns of the app's main(), for when one page gets slow.
+# cProfile mode writes a pstats .prof per rerun (snakeviz, flameprof, gprof2dot); sample
+# mode polls the rerun's stack every few milliseconds and writes collapsed .folded stacks
+# weighted in microseconds (flamegraph.pl, speedscope, inferno). Files land in <dir>/<page>/, one per rerun, and the
+# top functions by cumulative time are kept for the app to show. Only the thread running
+# the rerun is profiled, not the AI job pool.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PROFILE_DIR = os.path.join(ROOT, '.profiles')
+PROFILE_MODES = ('cprofile', 'sample')
+
+# Caps on one request for reruns, so a typo can't fill the disk
+MAX_PROFILED_RERUNS = 50
+SAMPLE_INTERVAL = 0.002
+SUMMARY_LIMIT = 15
+
+
+def profile_settings(secrets: Optional[Mapping] = None, environ: Optional[Mapping] = None) -> Dict[str, str]:
+    """VIBE_PROFILE* settings from secrets, overridden by the environment"""
+    environ = os.environ if environ is None else environ
+    settings = {}
+    for source in (secrets or {}, environ):
+        for key in source:
+            if key.startswith('VIBE_PROFILE'):
+                settings[key] = str(source[key])
+    return settings
+
+
+def _short_path(path: str) -> str:
+    for prefix in sorted((p for p in sys.path if p and os.path.isabs(p)), key=len, reverse=True):
+        if path.startswith(prefix + os.sep):
+            return os.path.relpath(path, prefix)
+    return os.path.relpath(path, ROOT) if path.startswith(ROOT + os.sep) else path
+
+
+def _label(filename: str, line: int, name: str) -> str:
+    return f"{name} ({_short_path(filename)}:{line})" if line else name
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a background thread, as folded 'root;...;leaf' stacks.
+
+    Each sample is weighted by the microseconds since the previous one: a busy thread holds the
+    GIL for up to sys.getswitchinterval(), so samples arrive less often than interval asks.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL, root=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        labels: Dict[Any, str] = {}
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if self._stop.is_set():
+                break
+            now = time.perf_counter()
+            weight, last = round((now - last) * 1e6), now
+            stack = []
+            while frame is not None and frame is not self.root:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _label(code.co_filename, code.co_firstlineno, code.co_name).replace(';', ',')
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += weight
+
+
+def top_cumulative(stats: pstats.Stats, limit: int = SUMMARY_LIMIT) -> List[Dict[str, Any]]:
+    """The functions with the most cumulative time in a cProfile run"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{'function': _label(*func), 'calls': nc, 'own_ms': round(tt * 1000, 2), 'cumulative_ms': round(ct * 1000, 2)}
+            for func, (cc, nc, tt, ct, callers) in rows]
+
+
+def top_sampled(stacks: Counter, limit: int = SUMMARY_LIMIT) -> List[Dict[str, Any]]:
+    """The frames on stacks with the most sampled time, counting each frame once per stack"""
+    cumulative, own = Counter(), Counter()
+    for stack, us in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += us
+        for frame in set(frames):
+            cumulative[frame] += us
+    return [{'function': frame, 'own_ms': round(own[frame] / 1000, 1), 'cumulative_ms': round(us / 1000, 1)}
+            for frame, us in cumulative.most_common(limit)]
+
+
+def format_summary(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'cumulative':>12} {'own':>10}  function"]
+    lines += [f"{row['cumulative_ms']:>9.1f} ms {row['own_ms']:>7.1f} ms  {row['function']}" for row in rows]
+    return '\n'.join(lines)
+
+
+class RerunProfiler:
+    """Profiles whole reruns and writes one file per rerun, grouped by page"""
+
+    def __init__(self, reruns: int = 0, out_dir: str = DEFAULT_PROFILE_DIR, mode: str = 'cprofile',
+                 interval: float = SAMPLE_INTERVAL, token: str = '', keep: int = 20):
+        if mode not in PROFILE_MODES:
+            raise SettingsError(f"unknown VIBE_PROFILE_MODE {mode!r}; use one of {', '.join(PROFILE_MODES)}")
+        self.out_dir = out_dir
+        self.mode = mode
+        self.interval = interval
+        self.token = token
+        self._remaining = min(max(0, reruns), MAX_PROFILED_RERUNS)
+        self._recent = deque(maxlen=keep)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def claim(self) -> bool:
+        """Take one of the reruns VIBE_PROFILE asked for, if any are left"""
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+    def authorized(self, token: Optional[str]) -> bool:
+        """Whether a ?profile_token= matches VIBE_PROFILE_TOKEN (never, when no token is set)"""
+        return bool(self.token) and token is not None and hmac.compare_digest(token.encode(), self.token.encode())
+
+    def _path(self, page: str, extension: str) -> str:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        directory = os.path.join(self.out_dir, page)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{seq:04d}.{extension}")
+
+    def run(self, fn: Callable[[], Any], page: str) -> Dict[str, Any]:
+        """Run fn under the profiler; the report is kept even when fn raises (st.rerun() does)"""
+        report = {'page': page, 'mode': self.mode}
+        started = time.perf_counter()
+        if self.mode == 'sample':
+            sampler = StackSampler(threading.get_ident(), self.interval, root=sys._getframe())
+            sampler.start()
+            try:
+                fn()
+            finally:
+                stacks = sampler.stop()
+                report['wall_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                report['path'] = self._path(page, 'folded')
+                with open(report['path'], 'w', encoding='utf-8') as f:
+                    f.writelines(f"{stack} {n}\n" for stack, n in stacks.items())
+                report['top'] = top_sampled(stacks)
+                self._recent.append(report)
+        else:
+            profile = cProfile.Profile()
+            try:
+                profile.runcall(fn)
+            finally:
+                report['wall_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                report['path'] = self._path(page, 'prof')
+                profile.dump_stats(report['path'])
+                report['top'] = top_cumulative(pstats.Stats(profile))
+                self._recent.append(report)
+        return report
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Reports of the last few profiled reruns, newest first"""
+        return list(reversed(self._recent))
+
+
+def profiler_from_settings(settings: Mapping[str, str]) -> RerunProfiler:
+    """Build a RerunProfiler from VIBE_PROFILE (reruns to profile), _DIR, _MODE, _INTERVAL_MS and _TOKEN"""
+    try:
+        reruns = int(settings.get('VIBE_PROFILE') or 0)
+        interval = float(settings.get('VIBE_PROFILE_INTERVAL_MS') or SAMPLE_INTERVAL * 1000) / 1000
+    except ValueError as e:
+        raise SettingsError(f"invalid VIBE_PROFILE_* setting: {e}") from e
+    return RerunProfiler(reruns=reruns, out_dir=settings.get('VIBE_PROFILE_DIR') or DEFAULT_PROFILE_DIR,
+                         mode=(settings.get('VIBE_PROFILE_MODE') or 'cprofile').strip().lower(),
+                         interval=interval, token=settings.get('VIBE_PROFILE_TOKEN', ''))
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Sequence
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+DEFAULT_CACHE_PATH = os.environ.get('VIBE_READING_CACHE', os.path.join(CACHE_DIR, 'readings.sqlite3'))
+
+TRAIT_ORDER = ('extroversion', 'creativity', 'ambition', 'empathy', 'adaptability')
+
+# Stands in for the user's name inside cached readings
+NAME_PLACEHOLDER = '{{name}}'
+
+
+def reading_key(age_group: str, answer_indices: Sequence[int], traits: Dict[str, int], prompt_version: str) -> str:
+    """Cache key for a reading: everything that shapes the prompt except the user's name"""
+    trait_vector = ','.join(str(traits.get(t, 0)) for t in TRAIT_ORDER)
+    answer_path = ''.join(str(i) for i in answer_indices)
+    return f"{prompt_version}|{age_group}|{answer_path}|{trait_vector}"
+
+
+def _replace_strings(value: Any, replace) -> Any:
+    if isinstance(value, str):
+        return replace(value)
+    if isinstance(value, list):
+        return [_replace_strings(v, replace) for v in value]
+    if isinstance(value, dict):
+        return {k: _replace_strings(v, replace) for k, v in value.items()}
+    return value
+
+def _strings(value: Any):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _strings(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _strings(v)
+
+def anonymize_reading(reading: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Swap the user's name for NAME_PLACEHOLDER so the reading can be shared"""
+    name = (name or '').strip()
+    if not name:
+        return dict(reading)
+    # Lookarounds rather than \b, which never matches next to a name's leading or trailing "." "@" or emoji
+    pattern = re.compile(r'(?<!\w)' + re.escape(name) + r'(?!\w)')
+    return _replace_strings(reading, lambda s: pattern.sub(NAME_PLACEHOLDER, s))
+
+def contains_name(value: Any, name: str) -> bool:
+    """True if the user's name still appears anywhere in value, e.g. inside a longer word"""
+    name = (name or '').strip()
+    return bool(name) and any(name in s for s in _strings(value))
+
+def personalize_reading(reading: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Fill the user's name back into a cached reading"""
+    return _replace_strings(reading, lambda s: s.replace(NAME_PLACEHOLDER, name))
+
+
+class ReadingCache:
+    """In-memory LRU of AI readings backed by a SQLite file shared across processes"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, max_entries: int = 4096):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = self._open(path)
+
+    def _open(self, path: str) -> Optional[sqlite3.Connection]:
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS readings (key TEXT PRIMARY KEY, reading TEXT NOT NULL)")
+            return db
+        except sqlite3.Error:
+            # The memory tier still works without a writable disk
+            return None
+
+    def _remember(self, key: str, reading: Dict[str, Any]):
+        self._memory[key] = reading
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the anonymized reading stored under key, or None"""
+        with self._lock:
+            reading = self._memory.get(key)
+            if reading is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return reading
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT reading FROM readings WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    reading = json.loads(row[0])
+                    self._remember(key, reading)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return reading
+            self.misses += 1
+            return None
+
+    def put(self, key: str, reading: Dict[str, Any], name: Optional[str] = None) -> bool:
+        """Store an already anonymized reading; refused (False) if name still appears in it"""
+        if name and contains_name(reading, name):
+            return False
+        with self._lock:
+            self._remember(key, reading)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO readings (key, reading) VALUES (?, ?)",
+                                     (key, json.dumps(reading, ensure_ascii=False)))
+                except sqlite3.Error:
+                    pass
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'memory_entries': len(self._memory),
+        }
+
+
+class ReadingTable:
+    """Anonymized readings interned by content, so each session holds a short id instead of its own copy"""
+
+    def __init__(self, max_entries: int = 8192):
+        self.max_entries = max_entries
+        self._readings: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def reading_id(reading: Dict[str, Any]) -> str:
+        encoded = json.dumps(reading, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()[:16]
+
+    def intern(self, reading: Dict[str, Any]) -> str:
+        """Id of an already anonymized reading; equal readings share one stored dict"""
+        reading_id = self.reading_id(reading)
+        with self._lock:
+            if reading_id in self._readings:
+                self._readings.move_to_end(reading_id)
+                return reading_id
+            self._readings[reading_id] = reading
+            while len(self._readings) > self.max_entries:
+                self._readings.popitem(last=False)
+        return reading_id
+
+    def get(self, reading_id: str) -> Optional[Dict[str, Any]]:
+        """The reading interned under reading_id, or None once it has been evicted"""
+        with self._lock:
+            reading = self._readings.get(reading_id)
+            if reading is not None:
+                self._readings.move_to_end(reading_id)
+            return reading
+
+    def __len__(self) -> int:
+        return len(self._readings)
+
+
+# Shared by every session in the process
+READING_TABLE = ReadingTable()
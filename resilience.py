@@ -0,0 +1,229 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Any, Iterator, Mapping, Optional, Tuple
+
+from llm_backends import LLMBackend, LLMConfigError, LLMError, Messages
+
+# Retries with jittered exponential backoff inside a total latency budget, plus optional
+# hedging: when a request runs past the recent p95 latency, a second identical request
+# is sent and whichever answers first wins. Streams are hedged on time to first token,
+# against their own p95, since that is the wait the user sees. One RetryPolicy per
+# process keeps the counters and the latency windows; wrap() gives each AI job its own budget.
+
+# Worth another try: connection failures (no status), timeouts, conflicts, rate limits, server errors
+RETRYABLE_STATUSES = frozenset({408, 409, 429})
+
+
+def is_retryable(error: LLMError) -> bool:
+    return error.status is None or error.status in RETRYABLE_STATUSES or error.status >= 500
+
+
+class RetryPolicy:
+    """Process-wide retry/hedge settings, counters and recent request latencies"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 4.0, budget: float = 20.0,
+                 hedge: bool = False, hedge_min_samples: int = 20, hedge_workers: int = 8,
+                 rng: Optional[random.Random] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.clock = clock
+        self.sleep = sleep
+        self._rng = rng or random.Random()
+        self._latencies = deque(maxlen=256)
+        self._first_token_latencies = deque(maxlen=256)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix='ai-hedge') if hedge else None
+        self.counts = dict.fromkeys(
+            ('calls', 'attempts', 'retries', 'succeeded', 'failed', 'budget_exhausted', 'hedges', 'hedges_won'), 0)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counts[name] += n
+
+    def record_latency(self, seconds: float, first_token: bool = False):
+        with self._lock:
+            (self._first_token_latencies if first_token else self._latencies).append(seconds)
+
+    def hedge_delay(self, first_token: bool = False) -> Optional[float]:
+        """p95 of recent successful requests (or of their time to first token), once there are enough to trust"""
+        with self._lock:
+            latencies = self._first_token_latencies if first_token else self._latencies
+            if not self.hedge or len(latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full jitter: uniform in [0, base * 2^attempt], capped, but never sooner than Retry-After"""
+        with self._lock:
+            delay = self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def wrap(self, backend: LLMBackend) -> 'RetryingBackend':
+        return RetryingBackend(backend, self)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counts)
+        for key, first_token in (('hedge_after_ms', False), ('hedge_first_token_after_ms', True)):
+            delay = self.hedge_delay(first_token)
+            stats[key] = round(delay * 1000) if delay is not None else None
+        return stats
+
+
+class RetryingBackend(LLMBackend):
+    """Wraps a backend with the policy's retries and hedging; the latency budget starts when it's created"""
+
+    def __init__(self, backend: LLMBackend, policy: RetryPolicy):
+        super().__init__(backend.model)
+        self.name = backend.name
+        self.backend = backend
+        self.usage = backend.usage
+        self.policy = policy
+        self.deadline = policy.clock() + policy.budget
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up and re-raise"""
+        policy = self.policy
+        if not isinstance(error, LLMError) or not is_retryable(error) or attempt + 1 >= policy.max_attempts:
+            return None
+        delay = policy.backoff(attempt, error.retry_after)
+        if policy.clock() + delay >= self.deadline:
+            policy.count('budget_exhausted')
+            return None
+        return delay
+
+    def _timed_complete(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> str:
+        self.policy.count('attempts')
+        started = time.perf_counter()
+        text = self.backend.complete(messages, max_tokens, temperature, json_mode)
+        self.policy.record_latency(time.perf_counter() - started)
+        return text
+
+    def _first_chunk(self, messages: Messages, max_tokens: int, temperature: float,
+                     json_mode: bool = False) -> Tuple[Optional[str], Iterator[str]]:
+        """Open a stream and wait for its first chunk (None if it's empty); returns it and the rest of the stream"""
+        self.policy.count('attempts')
+        started = time.perf_counter()
+        chunks = iter(self.backend.stream(messages, max_tokens, temperature, json_mode))
+        first = next(chunks, None)
+        self.policy.record_latency(time.perf_counter() - started, first_token=True)
+        return first, chunks
+
+    def _race(self, request: Callable[[], Any], hedge_after: float,
+              discard: Optional[Callable[[Any], None]] = None) -> Any:
+        """request() on the hedge pool, plus a second one if the first takes longer than hedge_after"""
+        policy = self.policy
+        primary = policy._pool.submit(request)
+        remaining = lambda: max(0.0, self.deadline - policy.clock())
+        if wait([primary], timeout=min(hedge_after, remaining())).done:
+            return primary.result()
+
+        # Slower than the recent p95: race a second request against it. The loser can't be
+        # cancelled mid-request, so it finishes in the background and is handed to discard().
+        policy.count('hedges')
+        backup = policy._pool.submit(request)
+        pending, error = {primary, backup}, None
+        while pending:
+            done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                policy.count('budget_exhausted')
+                raise LLMError(f"no reply within the {policy.budget:g}s latency budget", status=408)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        policy.count('hedges_won')
+                    if discard is not None:
+                        loser = backup if future is primary else primary
+                        loser.add_done_callback(lambda f: f.exception() is None and discard(f.result()))
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _hedged_complete(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> str:
+        hedge_after = self.policy.hedge_delay()
+        if hedge_after is None:
+            return self._timed_complete(messages, max_tokens, temperature, json_mode)
+        return self._race(lambda: self._timed_complete(messages, max_tokens, temperature, json_mode), hedge_after)
+
+    def _hedged_stream(self, messages: Messages, max_tokens: int, temperature: float,
+                       json_mode: bool = False) -> Iterator[str]:
+        hedge_after = self.policy.hedge_delay(first_token=True)
+        request = lambda: self._first_chunk(messages, max_tokens, temperature, json_mode)
+        if hedge_after is None:
+            first, chunks = request()
+        else:
+            # The losing stream is closed as soon as it has started, which hangs up its connection
+            first, chunks = self._race(request, hedge_after, discard=lambda loser: _close(loser[1]))
+        if first is None:
+            return
+        yield first
+        yield from chunks
+
+    def complete(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> str:
+        policy = self.policy
+        policy.count('calls')
+        attempt = 0
+        while True:
+            try:
+                text = self._hedged_complete(messages, max_tokens, temperature, json_mode)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    policy.count('failed')
+                    raise
+                policy.count('retries')
+                policy.sleep(delay)
+                attempt += 1
+                continue
+            policy.count('succeeded')
+            return text
+
+    def stream(self, messages: Messages, max_tokens: int, temperature: float, json_mode: bool = False) -> Iterator[str]:
+        # Only failures before the first chunk are retried: by then nothing has been shown
+        policy = self.policy
+        policy.count('calls')
+        attempt = 0
+        while True:
+            streamed = False
+            try:
+                for chunk in self._hedged_stream(messages, max_tokens, temperature, json_mode):
+                    streamed = True
+                    yield chunk
+            except Exception as e:
+                delay = None if streamed else self._retry_delay(e, attempt)
+                if delay is None:
+                    policy.count('failed')
+                    raise
+                policy.count('retries')
+                policy.sleep(delay)
+                attempt += 1
+                continue
+            policy.count('succeeded')
+            return
+
+
+def _close(chunks: Iterator[str]):
+    close = getattr(chunks, 'close', None)
+    if close is not None:
+        close()
+
+
+def retry_policy_from_settings(settings: Mapping[str, str]) -> RetryPolicy:
+    """VIBE_LLM_MAX_ATTEMPTS tries within VIBE_LLM_BUDGET seconds; VIBE_LLM_HEDGE=1 turns hedging on"""
+    try:
+        return RetryPolicy(
+            max_attempts=int(settings.get('VIBE_LLM_MAX_ATTEMPTS', 3)),
+            budget=float(settings.get('VIBE_LLM_BUDGET', 20)),
+            hedge=settings.get('VIBE_LLM_HEDGE', '0').strip().lower() in ('1', 'true', 'yes'),
+        )
+    except ValueError as e:
+        raise LLMConfigError(f"invalid VIBE_LLM_* setting: {e}") from e
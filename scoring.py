@@ -0,0 +1,116 @@
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+TRAITS = ('extroversion', 'creativity', 'ambition', 'empathy', 'adaptability')
+
+# Trait impact of each option position, used when a question has no "trait_impacts" of its own
+TRAIT_IMPACTS = {
+    0: {"extroversion": -2, "empathy": 2},
+    1: {"extroversion": -1, "creativity": 1, "empathy": 1, "adaptability": 1},
+    2: {"creativity": 2, "ambition": 1, "adaptability": 1},
+    3: {"extroversion": 1, "creativity": 1, "ambition": 2, "empathy": -1},
+    4: {"extroversion": 2, "ambition": 1, "empathy": -2, "adaptability": -1}
+}
+
+# Centroid weight of a personality's secondary trait (primary is 1.0)
+SECONDARY_TRAIT_WEIGHT = 0.5
+
+
+def question_impacts(question: Dict[str, Any]) -> List[Dict[str, int]]:
+    """Per-option trait impacts for a question, falling back to TRAIT_IMPACTS by position"""
+    impacts = question.get('trait_impacts')
+    if impacts:
+        return impacts
+    return [TRAIT_IMPACTS.get(i, {}) for i in range(len(question['options']))]
+
+def personality_centroid(personality: Dict[str, Any]) -> List[float]:
+    """Trait vector a personality stands for: its own "trait_centroid", or primary/secondary traits"""
+    centroid = personality.get('trait_centroid')
+    if not centroid:
+        centroid = {personality.get('secondary_trait', '').lower(): SECONDARY_TRAIT_WEIGHT,
+                    personality['primary_trait'].lower(): 1.0}
+    return [float(centroid.get(trait, 0.0)) for trait in TRAITS]
+
+
+class ScoringEngine:
+    """Trait scoring and personality matching for one age group's questions, as array operations.
+
+    Option impacts are stacked into one (total options x traits) weight matrix. Scoring a
+    batch of answer vectors gathers one weight row per answer and sums them, which is the
+    one-hot answer matrix times the weight matrix without materializing the one-hot rows.
+    """
+
+    def __init__(self, questions: List[Dict[str, Any]], personalities: List[Dict[str, Any]]):
+        option_counts = [len(q['options']) for q in questions]
+        self.option_counts = np.array(option_counts, dtype=np.intp)
+        self.option_offsets = np.concatenate(([0], np.cumsum(option_counts)[:-1])).astype(np.intp)
+        self.weights = np.array(
+            [[impact.get(trait, 0) for trait in TRAITS] for q in questions for impact in question_impacts(q)],
+            dtype=np.int32
+        ).reshape(-1, len(TRAITS))
+
+        # Mean and spread of each trait's total over all answer paths (options picked uniformly). Raw
+        # totals lean towards whichever traits the options favour overall, so matching works on
+        # standardized scores instead; otherwise some personalities are never matched.
+        means, variances = [], []
+        for offset, n in zip(self.option_offsets, option_counts):
+            rows = self.weights[offset:offset + n].astype(np.float64)
+            means.append(rows.mean(axis=0))
+            variances.append(rows.var(axis=0))
+        self.trait_mean = np.sum(means, axis=0) if means else np.zeros(len(TRAITS))
+        spread = np.sqrt(np.sum(variances, axis=0)) if variances else np.ones(len(TRAITS))
+        self.trait_spread = np.where(spread == 0, 1, spread)
+
+        self.personalities = personalities
+        centroids = np.array([personality_centroid(p) for p in personalities], dtype=np.float64).reshape(-1, len(TRAITS))
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = centroids / np.where(norms == 0, 1, norms)
+
+    def option_impact(self, question_index: int, option_index: int) -> Dict[str, int]:
+        row = self.weights[self.option_offsets[question_index] + option_index]
+        return {trait: int(value) for trait, value in zip(TRAITS, row) if value}
+
+    def score_batch(self, answers) -> np.ndarray:
+        """(sessions x answered questions) option indices -> (sessions x traits) scores; raises ValueError"""
+        answers = np.asarray(answers, dtype=np.intp)
+        if answers.ndim == 1:
+            answers = answers[np.newaxis, :]
+        if answers.ndim != 2 or answers.shape[1] > len(self.option_counts):
+            raise ValueError(f"expected at most {len(self.option_counts)} answers per session, got shape {answers.shape}")
+        # An out-of-range index would silently score another question's option
+        bad = (answers < 0) | (answers >= self.option_counts[:answers.shape[1]])
+        if bad.any():
+            session, question = (int(i) for i in np.argwhere(bad)[0])
+            raise ValueError(f"session {session}, question {question + 1}: no option {int(answers[session, question])} "
+                             f"(has {int(self.option_counts[question])})")
+        flat = answers + self.option_offsets[:answers.shape[1]]
+        return self.weights[flat].sum(axis=1)
+
+    def score(self, answer_indices: Sequence[int]) -> Dict[str, int]:
+        if not len(answer_indices):
+            return {trait: 0 for trait in TRAITS}
+        return dict(zip(TRAITS, (int(v) for v in self.score_batch(answer_indices)[0])))
+
+    def match_batch(self, scores) -> np.ndarray:
+        """Index of the nearest personality centroid (by cosine similarity) for each row of complete scores"""
+        scores = np.asarray(scores, dtype=np.float64)
+        if scores.ndim == 1:
+            scores = scores[np.newaxis, :]
+        return (((scores - self.trait_mean) / self.trait_spread) @ self.centroids.T).argmax(axis=1)
+
+    def match(self, traits: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        if not self.personalities:
+            return None
+        vector = [traits.get(trait, 0) for trait in TRAITS]
+        return self.personalities[int(self.match_batch(vector)[0])]
+
+
+def engine_for(snapshot, age_group: str) -> ScoringEngine:
+    """Scoring engine for an age group, built once per content snapshot"""
+    engines = snapshot.derived.setdefault('scoring_engines', {})
+    engine = engines.get(age_group)
+    if engine is None:
+        questions = snapshot.questions.get(age_group) or snapshot.questions[snapshot.age_groups[0]]
+        engine = engines[age_group] = ScoringEngine(questions, snapshot.personalities)
+    return engine
@@ -0,0 +1,7 @@
+# Errors for the VIBE_* settings (secrets.toml or the environment) shared by every module that reads them.
+# LLMConfigError is the LLM-backend flavour, so catching SettingsError covers all of them while
+# catching LLMConfigError still means "no usable AI backend".
+
+
+class SettingsError(ValueError):
+    """A VIBE_* setting is malformed or names something that doesn't exist"""
@@ -0,0 +1,265 @@
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from reading_cache import CACHE_DIR
+from telemetry import stage, count
+
+# Share image of an AI reading (name, essence, social-energy bars, compatibility chips), drawn
+# with Pillow. Fonts and the gradient background are loaded once per renderer, wrapped lines
+# are memoized per text and width, and finished images are stored under a hash of what they
+# show, so sharing the same reading again is a file read instead of a render.
+
+DEFAULT_SHARE_DIR = os.environ.get('VIBE_SHARE_CARDS', os.path.join(CACHE_DIR, 'share_cards'))
+# Any TrueType/OpenType font; without one, DejaVu Sans if installed, else Pillow's built-in font
+DEFAULT_FONT_PATH = os.environ.get('VIBE_SHARE_FONT')
+
+# Portrait 4:5, the largest size feeds and stories show without cropping
+CARD_SIZE = (1080, 1350)
+# Bump when the layout changes, so images drawn with the old one aren't served
+LAYOUT_VERSION = 1
+
+# (Pillow format, MIME type, save options) per file extension
+SHARE_FORMATS = {
+    'png': ('PNG', 'image/png', {'compress_level': 6}),
+    'webp': ('WEBP', 'image/webp', {'quality': 88, 'method': 4}),
+}
+
+# Fields drawn on the card; the cache key covers exactly these and the name
+SHARE_FIELDS = ('personality_name', 'essence', 'extroversion_percentage', 'introversion_percentage',
+                'compatibility_vibes')
+
+# The app's background gradient (static/cosmic.css), corner to corner
+GRADIENT_STOPS = ((0.0, (26, 26, 46)), (0.25, (22, 33, 62)), (0.5, (15, 52, 96)), (0.75, (83, 52, 131)),
+                  (1.0, (114, 9, 183)))
+
+# (font size, bold) per text role
+TEXT_ROLES = {
+    'title': (40, False),
+    'name': (76, True),
+    'essence': (38, False),
+    'heading': (34, True),
+    'label': (30, False),
+    'chip': (32, True),
+    'footer': (28, False),
+}
+
+WHITE = (255, 255, 255)
+MARGIN = 90
+_WHITESPACE = re.compile(r'\s+')
+
+
+def share_format(fmt: str) -> Tuple[str, str, Dict[str, Any]]:
+    try:
+        return SHARE_FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f"unknown share image format {fmt!r}; use one of {', '.join(SHARE_FORMATS)}") from None
+
+
+def drawable_text(value: Any) -> str:
+    """Text without the emoji and symbols the card fonts have no glyphs for, on one line"""
+    text = ''.join(ch for ch in str(value) if unicodedata.category(ch) not in ('So', 'Sk', 'Cs', 'Co', 'Cn', 'Cf')
+                   and ch != '️')
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def _load_font(path: Optional[str], size: int, bold: bool):
+    """(font, stroke width): a bold face when there is one, else the regular face drawn with a stroke"""
+    candidates = [path] if path else []
+    candidates += ['DejaVuSans-Bold.ttf', 'DejaVuSans.ttf'] if bold else ['DejaVuSans.ttf']
+    for candidate in candidates:
+        try:
+            font = ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+        return font, 0 if not bold or 'Bold' in candidate else max(1, size // 40)
+    return ImageFont.load_default(size), max(1, size // 40) if bold else 0
+
+
+def gradient_background(size: Tuple[int, int] = CARD_SIZE, seed: int = 7) -> Image.Image:
+    """The diagonal background gradient with a scatter of stars"""
+    width, height = size
+    position = (np.arange(width)[None, :] + np.arange(height)[:, None]) / float(width + height - 2)
+    stops = np.array([stop for stop, _ in GRADIENT_STOPS])
+    colors = np.array([color for _, color in GRADIENT_STOPS], dtype=float)
+    pixels = np.stack([np.interp(position, stops, colors[:, channel]) for channel in range(3)], axis=-1)
+    background = Image.fromarray(pixels.astype(np.uint8), 'RGB')
+    draw = ImageDraw.Draw(background)
+    rng = np.random.default_rng(seed)
+    for x, y, radius, shade in zip(rng.integers(0, width, 90), rng.integers(0, height, 90),
+                                   rng.choice((1, 1, 2, 3), 90), rng.integers(120, 256, 90)):
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=(shade, shade, shade))
+    return background
+
+
+class ShareCardRenderer:
+    """Draws share images and keeps them on disk, named by a hash of what they show"""
+
+    def __init__(self, out_dir: Optional[str] = DEFAULT_SHARE_DIR, font_path: Optional[str] = DEFAULT_FONT_PATH,
+                 size: Tuple[int, int] = CARD_SIZE):
+        self.out_dir = out_dir
+        self.font_path = font_path
+        self.size = size
+        self.hits = 0
+        self.renders = 0
+        self._fonts = {role: _load_font(font_path, font_size, bold) for role, (font_size, bold) in TEXT_ROLES.items()}
+        self._background = gradient_background(size).convert('RGBA')
+        self._wrap = lru_cache(maxsize=4096)(self._wrap_lines)
+        # FreeType faces aren't safe to use from two threads at once
+        self._draw_lock = threading.Lock()
+
+    def _wrap_lines(self, role: str, text: str, max_width: int, max_lines: int) -> Tuple[Tuple[str, float], ...]:
+        """(line, width) pairs for text wrapped at word boundaries; the last line gets an ellipsis if cut"""
+        font = self._fonts[role][0]
+        lines: List[str] = []
+        line = ''
+        for word in text.split(' '):
+            candidate = f"{line} {word}" if line else word
+            if not line or font.getlength(candidate) <= max_width:
+                line = candidate
+                continue
+            lines.append(line)
+            line = word
+        if line:
+            lines.append(line)
+        if len(lines) > max_lines:
+            last = lines[max_lines - 1]
+            while last and font.getlength(last + '…') > max_width:
+                last = last[:-1].rstrip()
+            lines = lines[:max_lines - 1] + [last + '…']
+        return tuple((line, font.getlength(line)) for line in lines)
+
+    def _text_block(self, draw, role: str, text: str, top: int, max_lines: int, fill, line_height: float = 1.25) -> int:
+        """Draw wrapped, centered text from top; returns the y below it"""
+        font, stroke = self._fonts[role]
+        size = TEXT_ROLES[role][0]
+        width = self.size[0]
+        for line, line_width in self._wrap(role, text, width - 2 * MARGIN - 60, max_lines):
+            draw.text(((width - line_width) / 2, top), line, font=font, fill=fill, stroke_width=stroke, stroke_fill=fill)
+            top += round(size * line_height)
+        return top
+
+    def draw(self, personality: Dict[str, Any], name: str) -> Image.Image:
+        """The card as an image, without touching the cache"""
+        width, height = self.size
+        # Translucent panels and the text over them are drawn on separate layers, then stacked once
+        panels = Image.new('RGBA', self.size, (0, 0, 0, 0))
+        text_layer = Image.new('RGBA', self.size, (0, 0, 0, 0))
+        panel_draw = ImageDraw.Draw(panels)
+        draw = ImageDraw.Draw(text_layer)
+
+        title = f"{drawable_text(name)}'s Cosmic Identity" if drawable_text(name) else "Cosmic Identity"
+        top = self._text_block(draw, 'title', title, 90, 1, (255, 255, 255, 210))
+        top = self._text_block(draw, 'name', drawable_text(personality.get('personality_name') or 'Cosmic Soul'),
+                               top + 20, 3, WHITE, line_height=1.1)
+
+        essence = drawable_text(personality.get('essence') or '')
+        if essence:
+            lines = self._wrap('essence', essence, width - 2 * MARGIN - 60, 4)
+            panel_bottom = top + 30 + 70 + len(lines) * round(TEXT_ROLES['essence'][0] * 1.3)
+            panel_draw.rounded_rectangle((MARGIN, top + 30, width - MARGIN, panel_bottom), radius=30,
+                                         fill=(114, 9, 183, 70), outline=(114, 9, 183, 140), width=2)
+            self._text_block(draw, 'essence', essence, top + 65, 4, WHITE, line_height=1.3)
+            top = panel_bottom
+
+        extro = personality.get('extroversion_percentage')
+        if extro is not None:
+            extro = max(0, min(100, int(extro)))
+            intro = personality.get('introversion_percentage')
+            intro = max(0, min(100, int(intro))) if intro is not None else 100 - extro
+            panel_top, panel_bottom = top + 30, top + 30 + 250
+            panel_draw.rounded_rectangle((MARGIN, panel_top, width - MARGIN, panel_bottom), radius=30,
+                                         fill=(255, 255, 255, 22))
+            self._text_block(draw, 'heading', "Your Social Energy", panel_top + 30, 1, WHITE)
+            label_font = self._fonts['label'][0]
+            bar_left, bar_right = MARGIN + 50, width - MARGIN - 50
+            for row, (label, percent, color) in enumerate((('Extroversion', extro, (255, 107, 107)),
+                                                           ('Introversion', intro, (114, 9, 183)))):
+                y = panel_top + 90 + row * 80
+                draw.text((bar_left, y), label, font=label_font, fill=WHITE)
+                draw.text((bar_right, y), f"{percent}%", font=label_font, fill=WHITE, anchor='ra')
+                panel_draw.rounded_rectangle((bar_left, y + 42, bar_right, y + 62), radius=10, fill=(255, 255, 255, 40))
+                if percent:
+                    filled = bar_left + max(20, (bar_right - bar_left) * percent // 100)
+                    draw.rounded_rectangle((bar_left, y + 42, filled, y + 62), radius=10, fill=color)
+            top = panel_bottom
+
+        vibes = personality.get('compatibility_vibes') or []
+        vibes = [drawable_text(v) for v in (vibes if isinstance(vibes, list) else [vibes])[:3]]
+        vibes = [v for v in vibes if v]
+        if vibes:
+            top = self._text_block(draw, 'heading', "You Vibe With", top + 35, 1, WHITE) + 10
+            chip_font, chip_stroke = self._fonts['chip']
+            chips = [(line, line_width + 56) for vibe in vibes
+                     for line, line_width in self._wrap('chip', vibe, width - 2 * MARGIN - 56, 1)]
+            rows: List[List[Tuple[str, float]]] = [[]]
+            for chip in chips:
+                if rows[-1] and sum(w for _, w in rows[-1]) + 20 * len(rows[-1]) + chip[1] > width - 2 * MARGIN:
+                    rows.append([])
+                rows[-1].append(chip)
+            # Rows that would run into the footer are left off
+            for row in rows:
+                if top + 60 > height - 95:
+                    break
+                x = (width - sum(w for _, w in row) - 20 * (len(row) - 1)) / 2
+                for text, chip_width in row:
+                    panel_draw.rounded_rectangle((x, top, x + chip_width, top + 60), radius=30,
+                                                 fill=(0, 255, 127, 50), outline=(0, 255, 127, 110), width=2)
+                    draw.text((x + chip_width / 2, top + 30), text, font=chip_font, fill=(0, 255, 127), anchor='mm',
+                              stroke_width=chip_stroke, stroke_fill=(0, 255, 127))
+                    x += chip_width + 20
+                top += 80
+
+        self._text_block(draw, 'footer', "Discover your cosmic identity", height - 75, 1, (255, 255, 255, 170))
+        return Image.alpha_composite(Image.alpha_composite(self._background, panels), text_layer).convert('RGB')
+
+    def card_key(self, personality: Dict[str, Any], name: str, fmt: str = 'png') -> str:
+        """Hash of everything that shows up in the image"""
+        shown = {field: personality.get(field) for field in SHARE_FIELDS}
+        payload = json.dumps({'layout': LAYOUT_VERSION, 'size': self.size, 'font': self.font_path, 'format': fmt,
+                              'name': name, 'fields': shown}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str, fmt: str) -> str:
+        return os.path.join(self.out_dir, key[:2], f"{key}.{fmt}")
+
+    def encode(self, image: Image.Image, fmt: str = 'png') -> bytes:
+        pil_format, _, options = share_format(fmt)
+        out = io.BytesIO()
+        image.save(out, pil_format, **options)
+        return out.getvalue()
+
+    def render(self, personality: Dict[str, Any], name: str, fmt: str = 'png') -> bytes:
+        """The encoded image, from disk when this card was drawn before"""
+        share_format(fmt)
+        key = self.card_key(personality, name, fmt)
+        path = self.path_for(key, fmt) if self.out_dir else None
+        if path:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                self.hits += 1
+                count('share_card_hit')
+                return data
+            except FileNotFoundError:
+                pass
+        with stage('share_card_render'), self._draw_lock:
+            data = self.encode(self.draw(personality, name), fmt)
+        self.renders += 1
+        if path:
+            # Write then rename, so a concurrent reader never sees half a file
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(partial, 'wb') as f:
+                f.write(data)
+            os.replace(partial, path)
+        return data
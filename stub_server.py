@@ -0,0 +1,158 @@
+"""Local OpenAI-compatible chat completions server with deterministic replies, for offline load tests.
+
+Usage:
+    python stub_server.py --port 8700 --latency-ms 1200 --latency-sigma 0.5 --error-rate 0.02 --rate-limit-rate 0.05
+    VIBE_LLM_BACKEND=openai-compatible VIBE_LLM_BASE_URL=http://127.0.0.1:8700/v1 streamlit run app.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_backends import LLMError, StubBackend, approximate_prompt_tokens, approximate_tokens
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """POST /v1/chat/completions, streaming (server-sent events) or not; GET /stats for request counts"""
+
+    protocol_version = 'HTTP/1.1'
+    server: 'StubServer'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, error: LLMError):
+        headers = {'Retry-After': f"{error.retry_after:g}"} if error.retry_after is not None else {}
+        kind = 'rate_limit_exceeded' if error.status == 429 else 'server_error'
+        self._send_json(error.status or 500, {'error': {'message': str(error), 'type': kind}}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/stats':
+            self._send_json(404, {'error': {'message': 'not found', 'type': 'invalid_request_error'}})
+            return
+        self._send_json(200, self.server.stats())
+
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('/v1/chat/completions', '/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found', 'type': 'invalid_request_error'}})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            messages = request['messages']
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {'error': {'message': f"bad request: {e}", 'type': 'invalid_request_error'}})
+            return
+
+        backend = self.server.backend
+        max_tokens, temperature = request.get('max_tokens', 600), request.get('temperature', 0.8)
+        json_mode = (request.get('response_format') or {}).get('type') == 'json_object'
+        self.server.count('requests')
+        created = int(time.time())
+        prompt_tokens = approximate_prompt_tokens(messages)
+        usage = lambda text: {'prompt_tokens': prompt_tokens, 'completion_tokens': approximate_tokens(text),
+                              'total_tokens': prompt_tokens + approximate_tokens(text)}
+        try:
+            if not request.get('stream'):
+                text = backend.complete(messages, max_tokens, temperature, json_mode)
+                self._send_json(200, {
+                    'id': f"stub-{created}", 'object': 'chat.completion', 'created': created, 'model': backend.model,
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                    'usage': usage(text),
+                })
+            else:
+                chunks = backend.stream(messages, max_tokens, temperature, json_mode)
+                first = next(chunks)  # injected failures raise before any bytes are sent
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                text = ''
+                for delta in (first, *chunks):
+                    text += delta
+                    event = {'id': f"stub-{created}", 'object': 'chat.completion.chunk', 'created': created,
+                             'model': backend.model, 'choices': [{'index': 0, 'delta': {'content': delta}}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                if (request.get('stream_options') or {}).get('include_usage'):
+                    event = {'id': f"stub-{created}", 'object': 'chat.completion.chunk', 'created': created,
+                             'model': backend.model, 'choices': [], 'usage': usage(text)}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+        except LLMError as e:
+            self.server.count('rate_limited' if e.status == 429 else 'errors')
+            self._send_error(e)
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count('disconnects')
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, backend: StubBackend, verbose: bool = False):
+        super().__init__(address, StubHandler)
+        self.backend = backend
+        self.verbose = verbose
+        self._counts = {'requests': 0, 'errors': 0, 'rate_limited': 0, 'disconnects': 0}
+        self._lock = threading.Lock()
+
+    def count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def serve_in_thread(backend: StubBackend, host: str = '127.0.0.1', port: int = 0) -> StubServer:
+    """Start a stub server on a background thread (port 0 picks a free one); stop it with shutdown()"""
+    server = StubServer((host, port), backend)
+    threading.Thread(target=server.serve_forever, name='stub-llm-server', daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8700)
+    parser.add_argument('--latency-ms', type=float, default=1000.0, help="median response time")
+    parser.add_argument('--latency-sigma', type=float, default=0.4, help="log-normal spread of the response time (0 = fixed)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="fraction of requests answered with HTTP 429")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args(argv)
+
+    backend = StubBackend(latency_ms=args.latency_ms, latency_sigma=args.latency_sigma, error_rate=args.error_rate,
+                          rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    server = StubServer((args.host, args.port), backend, verbose=args.verbose)
+    print(f"Stub LLM listening on {server.base_url} (median {args.latency_ms:g}ms, sigma {args.latency_sigma:g}, "
+          f"{args.error_rate:.0%} errors, {args.rate_limit_rate:.0%} rate limited)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
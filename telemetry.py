@@ -0,0 +1,207 @@
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Mapping, Optional, Sequence, TextIO
+
+from settings import SettingsError
+
+# Process-wide stage timings and event counters, cheap enough to leave on: a stage costs two
+# perf_counter() calls, a bisect and a lock. Exported in the Prometheus text format (served
+# on VIBE_METRICS_PORT) and/or as one JSON line every VIBE_METRICS_LOG_INTERVAL seconds.
+
+# Histogram bucket upper bounds in seconds (Prometheus 'le'); the last bucket is +Inf
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their sum; not locked (Telemetry holds the lock)"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count', 'max')
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate, interpolating linearly inside the bucket the quantile falls in (never above the max)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else lower  # +Inf: report its lower bound
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class _StageTimer:
+    __slots__ = ('telemetry', 'name', 'started')
+
+    def __init__(self, telemetry: 'Telemetry', name: str):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # Recorded even when the stage ends in an exception (st.rerun() raises one too)
+        self.telemetry.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Telemetry:
+    """Latency histograms per stage and counters per event"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started = time.time()
+        self._stages: Dict[str, Histogram] = {}
+        self._events: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> _StageTimer:
+        """with telemetry.stage('prompt_build'): ... records how long the block took"""
+        return _StageTimer(self, name)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self._stages.get(name)
+            if histogram is None:
+                histogram = self._stages[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, event: str, n: int = 1):
+        with self._lock:
+            self._events[event] = self._events.get(event, 0) + n
+
+    def _copy(self):
+        with self._lock:
+            stages = {name: (list(h.counts), h.sum, h.count, h.max) for name, h in self._stages.items()}
+            return stages, dict(self._events)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per stage: count, total and estimated p50/p95 in milliseconds; per event: count"""
+        stages, events = self._copy()
+        report = {}
+        for name, (counts, total, count, peak) in sorted(stages.items()):
+            histogram = Histogram(self.buckets)
+            histogram.counts, histogram.sum, histogram.count, histogram.max = counts, total, count, peak
+            ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None
+            report[name] = {'count': count, 'total_ms': ms(total), 'p50_ms': ms(histogram.quantile(0.5)),
+                            'p95_ms': ms(histogram.quantile(0.95))}
+        return {'uptime_s': round(time.time() - self.started), 'stages': report, 'events': dict(sorted(events.items()))}
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        stages, events = self._copy()
+        lines: List[str] = [
+            '# HELP vibe_stage_seconds Time spent in each stage of a session',
+            '# TYPE vibe_stage_seconds histogram',
+        ]
+        for name, (counts, total, count, _) in sorted(stages.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'vibe_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'vibe_stage_seconds_sum{{stage="{name}"}} {total!r}')
+            lines.append(f'vibe_stage_seconds_count{{stage="{name}"}} {count}')
+        lines += ['# HELP vibe_events_total Outcomes: AI success, JSON failure, fallback used, cache hit...',
+                  '# TYPE vibe_events_total counter']
+        lines += [f'vibe_events_total{{event="{event}"}} {n}' for event, n in sorted(events.items())]
+        return '\n'.join(lines) + '\n'
+
+
+# The registry every module records into
+TELEMETRY = Telemetry()
+
+def stage(name: str) -> _StageTimer:
+    return TELEMETRY.stage(name)
+
+def count(event: str, n: int = 1):
+    TELEMETRY.count(event, n)
+
+def observe(name: str, seconds: float):
+    TELEMETRY.observe(name, seconds)
+
+
+# --- Exporters --- #
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: 'MetricsServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.telemetry.prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, telemetry: Telemetry):
+        super().__init__(address, _MetricsHandler)
+        self.telemetry = telemetry
+
+
+def serve_metrics(port: int, host: str = '0.0.0.0', telemetry: Telemetry = TELEMETRY) -> MetricsServer:
+    """Serve GET /metrics on a background thread (port 0 picks a free one); stop it with shutdown()"""
+    server = MetricsServer((host, port), telemetry)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
+
+
+def start_json_log(interval: float, telemetry: Telemetry = TELEMETRY, stream: TextIO = None) -> threading.Event:
+    """Write telemetry.snapshot() as one JSON line every interval seconds; set the returned event to stop"""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            out = stream or sys.stderr
+            out.write(json.dumps(dict(telemetry.snapshot(), ts=round(time.time(), 3)), separators=(',', ':')) + '\n')
+            out.flush()
+
+    threading.Thread(target=run, name='metrics-log', daemon=True).start()
+    return stop
+
+
+def start_exporters(settings: Mapping[str, str], telemetry: Telemetry = TELEMETRY) -> Dict[str, Any]:
+    """Start what VIBE_METRICS_PORT / VIBE_METRICS_LOG_INTERVAL ask for; both are off by default"""
+    try:
+        port = int(settings.get('VIBE_METRICS_PORT') or 0)
+        interval = float(settings.get('VIBE_METRICS_LOG_INTERVAL') or 0)
+    except ValueError as e:
+        raise SettingsError(f"invalid VIBE_METRICS_* setting: {e}") from e
+    started = {}
+    if port:
+        started['server'] = serve_metrics(port, settings.get('VIBE_METRICS_HOST', '0.0.0.0'), telemetry)
+    if interval > 0:
+        started['json_log'] = start_json_log(interval, telemetry)
+    return started
@@ -0,0 +1,324 @@
+import html
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Iterable, List, Optional
+
+# Result card markup. Each template is split into literal chunks and {field} slots once, at
+# import; render() escapes every value it fills in (the user's name and LLM text included)
+# unless it is Markup that was itself rendered from a template. Whitespace is collapsed so a
+# whole card is one HTML block: a blank line inside st.markdown would drop back to Markdown.
+
+_SLOT = re.compile(r'\{(\w+)\}')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class Markup(str):
+    """Markup rendered from a template, inserted into another template as is"""
+
+
+def escape(value: Any) -> str:
+    if isinstance(value, Markup):
+        return value
+    return html.escape(_WHITESPACE.sub(' ', str(value)).strip(), quote=True)
+
+
+class Template:
+    """HTML with {field} slots, compiled once"""
+
+    __slots__ = ('_parts', 'fields')
+
+    def __init__(self, markup: str):
+        self._parts = _SLOT.split(_WHITESPACE.sub(' ', markup).strip())
+        self.fields = tuple(self._parts[1::2])
+
+    def render(self, **values) -> Markup:
+        parts = list(self._parts)
+        parts[1::2] = [escape(values[field]) for field in self.fields]
+        return Markup(''.join(parts))
+
+
+def join(fragments: Iterable[str]) -> Markup:
+    return Markup(''.join(escape(fragment) for fragment in fragments))
+
+
+# --- AI results card --- #
+
+AI_CARD = Template('''
+<div class="glass-card result-card">
+    <h1 style="font-family: 'Space Grotesk', sans-serif; font-size: 1.4rem; font-weight: 700;
+               color: #fff; margin-bottom: 0.8rem; text-align: center; line-height: 1.2;">
+        ✨ {name}'s Cosmic Identity ✨
+    </h1>
+    {sections}
+    <div style="background: linear-gradient(135deg, rgba(114, 9, 183, 0.2), rgba(83, 52, 131, 0.1));
+                border: 1px solid rgba(114, 9, 183, 0.3); border-radius: 15px;
+                padding: 1.2rem; margin: 1.5rem 0; text-align: center;">
+        <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; color: rgba(255, 255, 255, 0.95);
+                   line-height: 1.4; margin-bottom: 0.4rem; font-weight: 500;">
+            This reading was created by analyzing your actual choices 🎯
+        </div>
+        <div style="font-family: 'Inter', sans-serif; font-size: 0.75rem; color: rgba(255, 255, 255, 0.7);">
+            Screenshot &amp; share • Tag friends to discover their cosmic identity
+        </div>
+    </div>
+</div>
+''')
+
+AI_NAME = Template('''
+<h2 style="font-family: 'Space Grotesk', sans-serif; font-size: 1.8rem; font-weight: 700;
+           color: #fff; margin-bottom: 1rem; text-align: center; line-height: 1.1;
+           text-shadow: 0 0 20px rgba(114, 9, 183, 0.8);">
+    {personality_name}
+</h2>
+''')
+
+AI_ESSENCE = Template('''
+<div style="background: linear-gradient(135deg, rgba(114, 9, 183, 0.2), rgba(83, 52, 131, 0.2));
+            border: 1px solid rgba(114, 9, 183, 0.4); border-radius: 15px;
+            padding: 1rem; margin: 1rem 0; text-align: center;">
+    <div style="font-family: 'Space Grotesk', sans-serif; font-size: 1rem; font-weight: 600;
+               color: #fff; line-height: 1.3;">
+        {essence}
+    </div>
+</div>
+''')
+
+ENERGY_BAR = Template('''
+<div style="font-family: 'Inter', sans-serif; font-size: 0.85rem; font-weight: 700; color: #fff;
+           margin: 0.6rem 0 0.3rem;">{label} <span style="font-weight: 400;">{percent}%</span></div>
+<div style="background: rgba(255, 255, 255, 0.12); border-radius: 8px; height: 0.5rem; overflow: hidden;">
+    <div style="width: {percent}%; height: 100%; border-radius: 8px; background: {color};"></div>
+</div>
+''')
+
+AI_SOCIAL_ENERGY = Template('''
+<div style="background: rgba(255, 255, 255, 0.08); border-radius: 15px; padding: 1.2rem; margin: 1.2rem 0;">
+    <div style="font-family: 'Space Grotesk', sans-serif; font-size: 0.9rem; color: #fff; margin-bottom: 0.8rem;
+               font-weight: 600; text-align: center;">
+        ⚡ Your Social Energy
+    </div>
+    {bars}
+    {insight}
+</div>
+''')
+
+AI_SOCIAL_INSIGHT = Template('''
+<div style="font-family: 'Inter', sans-serif; font-size: 0.8rem; color: rgba(255, 255, 255, 0.9);
+           line-height: 1.3; font-style: italic; text-align: center; margin: 1rem 0 0;">
+    💡 {social_energy}
+</div>
+''')
+
+AI_HIDDEN_TRAIT = Template('''
+<div style="background: linear-gradient(135deg, rgba(255, 107, 107, 0.25), rgba(255, 142, 83, 0.25));
+            border: 2px solid rgba(255, 107, 107, 0.5); border-radius: 15px;
+            padding: 1.2rem; margin: 1.2rem 0; text-align: center; position: relative;">
+    <div style="position: absolute; top: 10px; right: 15px; font-size: 1.2rem;">🔮</div>
+    <div style="font-family: 'Space Grotesk', sans-serif; font-size: 1rem; color: #ff6b6b;
+               margin-bottom: 0.8rem; font-weight: 700;">Mind = Blown 🤯</div>
+    <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; color: #fff;
+               line-height: 1.4; font-weight: 500; font-style: italic;">
+        {hidden_trait}
+    </div>
+</div>
+''')
+
+# Superpower and vibe check share a layout
+AI_STAT = Template('''
+<div style="background: {background}; border-radius: 15px;
+           padding: 1rem; margin: 1rem 0; text-align: center;">
+    <div style="font-size: 1.2rem; margin-bottom: 0.4rem;">{icon}</div>
+    <div style="font-family: 'Space Grotesk', sans-serif; font-size: 0.8rem;
+               color: {color}; margin-bottom: 0.5rem; font-weight: 600;">{label}</div>
+    <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; color: #fff;
+               line-height: 1.3; font-weight: 500;">
+        {text}
+    </div>
+</div>
+''')
+
+AI_INSIGHT = Template('''
+<div style="background: rgba(255, 255, 255, 0.08); border-radius: 15px;
+           padding: 1.2rem; margin: 1.2rem 0; text-align: center;">
+    <div style="font-family: 'Space Grotesk', sans-serif; font-size: 0.9rem;
+               color: #fff; margin-bottom: 0.6rem; font-weight: 600;">💡 Personal Insight</div>
+    <div style="font-family: 'Inter', sans-serif; font-size: 0.85rem; color: rgba(255, 255, 255, 0.9);
+               line-height: 1.4; font-style: italic;">
+        {personal_insight}
+    </div>
+</div>
+''')
+
+AI_COMPATIBILITY = Template('''
+<div style="background: rgba(255, 255, 255, 0.08); border-radius: 15px;
+           padding: 1.2rem; margin: 1.2rem 0;">
+    <div style="font-family: 'Space Grotesk', sans-serif; font-size: 0.9rem; color: #fff;
+               margin-bottom: 0.8rem; font-weight: 600; text-align: center;">💫 You Vibe With</div>
+    <div style="display: flex; gap: 0.5rem; justify-content: center; flex-wrap: wrap;">{chips}</div>
+</div>
+''')
+
+AI_CHIP = Template('''
+<div style="background: rgba(0, 255, 127, 0.2); border: 1px solid rgba(0, 255, 127, 0.4);
+           color: #00ff7f; padding: 0.4rem 0.8rem; border-radius: 20px;
+           font-family: 'Inter', sans-serif; font-size: 0.75rem; font-weight: 500; text-align: center;">
+    {vibe}
+</div>
+''')
+
+
+def _as_list(value) -> List[Any]:
+    return value if isinstance(value, list) else [value]
+
+
+def _percent(value, default: int = 50) -> int:
+    try:
+        return max(0, min(100, int(round(float(value)))))
+    except (TypeError, ValueError):
+        return default
+
+
+def ai_sections(personality: Dict[str, Any], streaming: bool = False) -> List[Markup]:
+    """One fragment per card, in page order; while streaming, only cards whose fields have arrived"""
+    sections = []
+    if not streaming or 'personality_name' in personality:
+        sections.append(AI_NAME.render(personality_name=personality.get('personality_name') or 'Cosmic Soul'))
+    if personality.get('essence'):
+        sections.append(AI_ESSENCE.render(essence=personality['essence']))
+    if personality.get('extroversion_percentage') is not None:
+        extro = _percent(personality.get('extroversion_percentage'))
+        intro = _percent(personality.get('introversion_percentage'), 100 - extro)
+        bars = join((ENERGY_BAR.render(label='Extroversion', percent=extro, color='linear-gradient(90deg, #ff6b6b, #ff8e53)'),
+                     ENERGY_BAR.render(label='Introversion', percent=intro, color='linear-gradient(90deg, #7209b7, #533483)')))
+        insight = AI_SOCIAL_INSIGHT.render(social_energy=personality['social_energy']) if personality.get('social_energy') else ''
+        sections.append(AI_SOCIAL_ENERGY.render(bars=bars, insight=Markup(insight)))
+    if personality.get('hidden_trait'):
+        sections.append(AI_HIDDEN_TRAIT.render(hidden_trait=personality['hidden_trait']))
+    if personality.get('superpower'):
+        sections.append(AI_STAT.render(background='rgba(114, 9, 183, 0.15)', icon='⚡', color='#7209b7',
+                                       label='Your Superpower', text=personality['superpower']))
+    if personality.get('vibe_check'):
+        sections.append(AI_STAT.render(background='rgba(0, 255, 127, 0.15)', icon='✨', color='#00ff7f',
+                                       label='Your Energy', text=personality['vibe_check']))
+    if personality.get('personal_insight'):
+        sections.append(AI_INSIGHT.render(personal_insight=personality['personal_insight']))
+    if personality.get('compatibility_vibes'):
+        chips = join(AI_CHIP.render(vibe=vibe) for vibe in _as_list(personality['compatibility_vibes'])[:3])
+        sections.append(AI_COMPATIBILITY.render(chips=chips))
+    return sections
+
+
+def ai_results_card(personality: Dict[str, Any], name: str, streaming: bool = False) -> Markup:
+    """The whole AI results card as one HTML block"""
+    return AI_CARD.render(name=name, sections=join(ai_sections(personality, streaming)))
+
+
+# --- Results card for a matched personality (the offline flow) --- #
+
+RESULTS_CARD = Template('''
+<div class="glass-card result-card">
+    <h1 class="result-title">The stars have aligned, {name}!</h1>
+    <h2 style="font-family: 'Space Grotesk', sans-serif; font-size: 2.2rem; font-weight: 700;
+               color: #fff; margin-bottom: 1rem; text-align: center; line-height: 1.2;">
+        {personality_name}
+    </h2>
+    <div style="display: flex; gap: 0.8rem; justify-content: center; margin-bottom: 1.5rem; flex-wrap: wrap;">
+        {traits}
+    </div>
+    <p style="font-family: 'Inter', sans-serif; font-size: 1rem; color: rgba(255,255,255,0.9);
+              line-height: 1.5; margin-bottom: 1.5rem; text-align: center;">
+        {description}
+    </p>
+    <div style="background: rgba(255,255,255,0.05); border-radius: 15px; padding: 1.2rem; margin-bottom: 1.5rem;">
+        <h3 style="font-family: 'Space Grotesk', sans-serif; font-size: 1.1rem; color: #fff;
+                  margin-bottom: 0.8rem; text-align: center;">✨ Your Cosmic Moment ✨</h3>
+        <em style="font-family: 'Inter', sans-serif; font-size: 0.95rem; color: rgba(255,255,255,0.8);
+                 font-style: italic; line-height: 1.4; display: block; text-align: center;">
+            "{main_character_moment}"
+        </em>
+    </div>
+    <div style="background: rgba(255,255,255,0.05); border-radius: 15px; padding: 1.2rem; margin-bottom: 1.5rem;">
+        <h3 style="font-family: 'Space Grotesk', sans-serif; font-size: 1rem; color: #fff;
+                  margin-bottom: 0.8rem; text-align: center;">🌟 Your Cosmic Compatibility</h3>
+        <div style="display: flex; gap: 0.6rem; justify-content: center; flex-wrap: wrap; margin-bottom: 1rem;">
+            {compatible}
+        </div>
+        <h3 style="font-family: 'Space Grotesk', sans-serif; font-size: 1rem; color: #fff;
+                  margin-bottom: 0.8rem; text-align: center;">⚠️ Your Cosmic Warning Sign</h3>
+        <div style="background: rgba(255,69,0,0.2); border: 1px solid rgba(255,69,0,0.4);
+                   color: #ff4500; padding: 0.5rem 1rem; border-radius: 15px;
+                   font-size: 0.8rem; text-align: center; margin: 0 auto; display: inline-block; width: fit-content;">
+            {red_flag_type}
+        </div>
+    </div>
+    <div style="background: rgba(114,9,183,0.1); border-radius: 15px; padding: 1.2rem; margin-bottom: 1.5rem; text-align: center;">
+        <div style="font-family: 'Inter', sans-serif; font-size: 0.9rem; color: rgba(255,255,255,0.9);
+                   line-height: 1.4; margin-bottom: 0.4rem;">
+            Screenshot this cosmic reading and share your vibe! ✨
+        </div>
+        <div style="font-family: 'Inter', sans-serif; font-size: 0.75rem; color: rgba(255,255,255,0.6);">
+            Tag friends to discover their cosmic personality
+        </div>
+    </div>
+</div>
+''')
+
+TRAIT_PILL = Template('''
+<div style="background: linear-gradient(135deg, #7209b7, #533483); color: #fff; padding: 0.4rem 1rem;
+           border-radius: 20px; font-size: 0.85rem; font-weight: 500;">
+    {trait}
+</div>
+''')
+
+COMPATIBLE_CHIP = Template('''
+<div style="background: rgba(0,255,127,0.2); border: 1px solid rgba(0,255,127,0.4);
+           color: #00ff7f; padding: 0.3rem 0.8rem; border-radius: 15px;
+           font-size: 0.8rem; text-align: center;">
+    {personality_type}
+</div>
+''')
+
+
+def results_card(personality: Dict[str, Any], name: str) -> Markup:
+    """The whole results card for a matched personality as one HTML block"""
+    traits = join(TRAIT_PILL.render(trait=personality.get(key, '').capitalize())
+                  for key in ('primary_trait', 'secondary_trait'))
+    compatible = join(COMPATIBLE_CHIP.render(personality_type=t) for t in personality.get('compatible_with', []))
+    return RESULTS_CARD.render(
+        name=name, personality_name=personality.get('name', 'N/A'), traits=traits,
+        description=personality.get('description', ''), main_character_moment=personality.get('main_character_moment', ''),
+        compatible=compatible, red_flag_type=personality.get('red_flag_type', ''),
+    )
+
+
+class RenderCache:
+    """LRU of rendered cards, so showing a result again is one lookup"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cards: "OrderedDict[Hashable, Markup]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Markup]:
+        with self._lock:
+            card = self._cards.get(key)
+            if card is None:
+                self.misses += 1
+                return None
+            self._cards.move_to_end(key)
+            self.hits += 1
+            return card
+
+    def put(self, key: Hashable, card: Markup) -> Markup:
+        with self._lock:
+            self._cards[key] = card
+            self._cards.move_to_end(key)
+            while len(self._cards) > self.max_entries:
+                self._cards.popitem(last=False)
+        return card
+
+    def stats(self) -> Dict[str, Any]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._cards)}
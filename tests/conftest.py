@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+# The app's modules live at the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep the app's on-disk caches out of the developer's .cache; set before the modules read them
+_TMP = tempfile.mkdtemp(prefix='vibe-tests-')
+os.environ.setdefault('VIBE_READING_CACHE', os.path.join(_TMP, 'readings.sqlite3'))
+os.environ.setdefault('VIBE_PRECOMPUTED', os.path.join(_TMP, 'no-precomputed.bin'))
+os.environ.setdefault('VIBE_SHARE_CARDS', os.path.join(_TMP, 'share_cards'))
+os.environ.setdefault('VIBE_LOTTIE_BUNDLE', os.path.join(_TMP, 'no-lottie-bundle.json'))
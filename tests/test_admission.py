@@ -0,0 +1,79 @@
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, AdmittedBackend, TokenBucket
+from llm_backends import LLMBackend, LLMError
+
+MESSAGES = [{'role': 'user', 'content': 'x' * 400}]  # about 100 prompt tokens
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Recording(LLMBackend):
+    name = 'recording'
+
+    def __init__(self, error=None):
+        super().__init__('test')
+        self.calls = 0
+        self.error = error
+
+    def complete(self, messages, max_tokens, temperature, json_mode=False):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return 'ok'
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(60, now=0.0)  # one a second, a minute's worth to start with
+    bucket.take(60, 0.0)
+    assert bucket.wait_time(1, 0.0) == pytest.approx(1.0)
+    assert bucket.wait_time(1, 1.0) == 0.0
+    # More than the bucket holds waits for a full bucket, not forever
+    assert bucket.wait_time(1000, 1.0) == pytest.approx(59.0)
+
+
+def test_request_beyond_the_token_budget_is_rejected_before_its_deadline():
+    clock = Clock()
+    controller = AdmissionController(rpm=60, tpm=1000, clock=clock)
+    controller.acquire(900, deadline=clock.now + 1)
+    # 900 more tokens take ~48s to refill, far past a 1s deadline: refused at once, not queued
+    with pytest.raises(AdmissionRejected):
+        controller.acquire(900, deadline=clock.now + 1)
+    assert controller.stats()['admitted'] == 1 and controller.stats()['rejected_deadline'] == 1
+    clock.now += 60
+    controller.acquire(900, deadline=clock.now + 1)
+
+
+def test_request_is_rejected_when_the_queue_is_full():
+    controller = AdmissionController(rpm=60, tpm=1000, max_waiting=0, clock=Clock())
+    with pytest.raises(AdmissionRejected):
+        controller.acquire(1, deadline=float('inf'))
+    assert controller.rejected_queue_full == 1
+
+
+def test_rejected_request_is_never_sent():
+    clock = Clock()
+    controller = AdmissionController(rpm=60, tpm=1000, clock=clock)
+    backend = Recording()
+    assert AdmittedBackend(backend, controller, deadline=clock.now + 1).complete(MESSAGES, 400, 0.0) == 'ok'
+    with pytest.raises(AdmissionRejected):
+        AdmittedBackend(backend, controller, deadline=clock.now + 1).complete(MESSAGES, 900, 0.0)
+    assert backend.calls == 1
+
+
+def test_rate_limit_from_upstream_pauses_admission():
+    clock = Clock()
+    controller = AdmissionController(rpm=60, tpm=100000, clock=clock)
+    backend = Recording(LLMError("slow down", status=429, retry_after=30))
+    with pytest.raises(LLMError):
+        AdmittedBackend(backend, controller, deadline=clock.now + 1).complete(MESSAGES, 10, 0.0)
+    with pytest.raises(AdmissionRejected):
+        controller.acquire(1, deadline=clock.now + 5)
+    clock.now += 30
+    controller.acquire(1, deadline=clock.now + 5)
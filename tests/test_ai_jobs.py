@@ -0,0 +1,45 @@
+import threading
+import time
+
+import pytest
+
+from ai_jobs import JobQueueFull, ReadingJobs
+
+
+def _blocked(job, release, value):
+    job.publish('name', value)
+    release.wait(5)
+    return {'name': value}
+
+
+def test_identical_requests_share_one_job():
+    jobs, release = ReadingJobs(max_workers=2), threading.Event()
+    first = jobs.submit('key', _blocked, release, 'a')
+    assert jobs.submit('key', _blocked, release, 'b') is first
+    assert jobs.running('key') is first
+    release.set()
+    assert first.result(5) == {'name': 'a'}
+    assert first.partial() == {'name': 'a'}
+    assert jobs.stats()['submitted'] == 1 and jobs.stats()['deduplicated'] == 2
+
+
+def test_finished_job_is_not_shared():
+    jobs, release = ReadingJobs(), threading.Event()
+    release.set()
+    first = jobs.submit('key', _blocked, release, 'a')
+    first.result(5)
+    # The done callback drops it from the in-flight table, possibly just after result() returns
+    deadline = time.monotonic() + 5
+    while jobs.stats()['in_flight'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert jobs.running('key') is None
+    assert jobs.submit('key', _blocked, release, 'b') is not first
+
+
+def test_too_many_pending_jobs_are_refused():
+    jobs, release = ReadingJobs(max_workers=1, max_pending=1), threading.Event()
+    jobs.submit('one', _blocked, release, 'a')
+    with pytest.raises(JobQueueFull):
+        jobs.submit('two', _blocked, release, 'b')
+    release.set()
+    assert jobs.stats()['rejected'] == 1
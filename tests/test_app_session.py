@@ -0,0 +1,173 @@
+import json
+import os
+import sqlite3
+import traceback
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import precompute
+from conftest import ROOT
+from reading_cache import READING_TABLE
+from telemetry import TELEMETRY
+
+APP_PATH = os.path.join(ROOT, 'app.py')
+
+
+def _lost_client_state(error: KeyError) -> bool:
+    # AppTest 1.28 reads the client state off the last script event, which a run ending in
+    # st.rerun() can lack; any other KeyError is the app's own
+    frame = traceback.extract_tb(error.__traceback__)[-1]
+    return error.args == ('client_state',) and os.path.join('streamlit', 'testing') in frame.filename
+
+
+def _run(at, reruns=5):
+    for _ in range(reruns):
+        page = at.session_state.page if 'page' in at.session_state else None
+        try:
+            at.run()
+            return
+        except KeyError as e:
+            if not _lost_client_state(e):
+                raise
+        # The session state survived; the elements are only stale if the rerun moved to another page
+        if at.session_state.page == page:
+            return
+    pytest.fail(f"app still moving between pages after {reruns} runs")
+
+
+def _answer_quiz(options):
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    _run(at)
+    at.text_input(key="welcome_name").input("Ada")
+    at.button(key="start_button").click()
+    _run(at)
+    for option in options:
+        at.button(key=f"option_{option}").click()
+        _run(at)
+    return at
+
+
+def _take_quiz(options=(0, 1, 2, 3, 4)):
+    at = _answer_quiz(options)
+    for _ in range(20):
+        if at.session_state.page == 'ai_results' and at.session_state.reading_id is not None:
+            break
+        _run(at)
+    assert at.session_state.page == 'ai_results' and at.session_state.reading_id is not None
+    return at
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    monkeypatch.setenv('VIBE_LLM_BACKEND', 'stub')
+    monkeypatch.setenv('VIBE_LLM_STREAM', '0')
+
+
+@pytest.fixture
+def results_page(stub_llm):
+    return _take_quiz()
+
+
+def _card(at):
+    cards = [m.value for m in at.markdown if 'Cosmic Identity' in m.value]
+    assert cards
+    return cards[0]
+
+
+def test_reading_survives_eviction_from_the_shared_table(results_page):
+    at = results_page
+    shown = _card(at)
+    reading_id = at.session_state.reading_id
+
+    # Evict it everywhere a rebuild could find it, so a rebuild would give the keyword fallback
+    READING_TABLE._readings.clear()
+    with sqlite3.connect(os.environ['VIBE_READING_CACHE']) as db:
+        db.execute("DELETE FROM readings")
+    st.cache_resource.clear()
+
+    _run(at)
+    assert at.session_state.reading_id == reading_id
+    assert _card(at) == shown
+
+
+def test_streamed_reading_does_not_hold_up_the_script(monkeypatch):
+    monkeypatch.setenv('VIBE_LLM_BACKEND', 'stub')
+    monkeypatch.setenv('VIBE_LLM_STUB_LATENCY_MS', '3000')
+    at = _answer_quiz((1, 1, 1, 1, 1))
+    # Each rerun draws what has streamed so far and hands the script thread back
+    job = at.session_state.ai_job
+    assert at.session_state.page == 'ai_results' and at.session_state.reading_id is None
+    assert job is not None and not job.done()
+
+    job.future.result(timeout=30)
+    _run(at)
+    assert at.session_state.ai_job is None and at.session_state.reading_id is not None
+    assert _card(at)
+
+
+def _precomputed_hits():
+    return TELEMETRY.snapshot()['events'].get('precomputed_hit', 0)
+
+
+def _build_artifact(*args):
+    precompute.main(['--output', precompute.DEFAULT_ARTIFACT_PATH, '--age-group', '18-24', *args])
+
+
+@pytest.fixture
+def artifact_path():
+    path = precompute.DEFAULT_ARTIFACT_PATH
+    assert not os.path.exists(path)
+    yield path
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def test_rebuilt_artifact_is_used_without_a_restart(stub_llm, artifact_path):
+    _take_quiz((0, 1, 2, 3, 4))
+    hits = _precomputed_hits()
+    _build_artifact('--backend', 'llm')
+    _take_quiz((4, 3, 2, 1, 0))
+    assert _precomputed_hits() == hits + 1
+
+
+def test_artifact_from_another_backend_is_not_served(stub_llm, artifact_path):
+    hits = _precomputed_hits()
+    _build_artifact('--backend', 'fallback')
+    _take_quiz((4, 3, 2, 1, 0))
+    assert _precomputed_hits() == hits
+
+
+def test_truncated_artifact_counts_as_missing(stub_llm, artifact_path):
+    _build_artifact('--backend', 'llm')
+    size = os.path.getsize(artifact_path)
+    for keep in (size - 1, 200, len(precompute.MAGIC) + 2, 4):
+        with open(artifact_path, 'r+b') as f:
+            f.truncate(keep)
+        assert precompute.ReadingArtifact.open(artifact_path) is None
+
+
+def _debug_panels(monkeypatch, panels, token=None):
+    monkeypatch.setenv('VIBE_PROFILE_TOKEN', 'let-me-in')
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.query_params['debug'] = panels
+    if token is not None:
+        at.query_params['profile_token'] = token
+    _run(at)
+    return [element.value for element in at.json]
+
+
+@pytest.mark.parametrize('panel', ['profile', 'metrics', 'http'])
+@pytest.mark.parametrize('token', [None, 'wrong'])
+def test_debug_panels_need_the_profile_token(monkeypatch, panel, token):
+    assert _debug_panels(monkeypatch, [panel], token) == []
+
+
+def test_debug_panels_show_for_the_profile_token(monkeypatch):
+    assert len(_debug_panels(monkeypatch, ['profile', 'metrics', 'http'], 'let-me-in')) == 3
+
+
+def test_http_panel_shows_the_reading_cache(monkeypatch):
+    http, = _debug_panels(monkeypatch, ['http'], 'let-me-in')
+    assert set(json.loads(http)['reading_cache']) >= {'hits', 'misses', 'hit_rate'}
@@ -0,0 +1,145 @@
+import itertools
+import json
+import random
+import time
+
+import pytest
+
+from json_extract import extract_json_object, repair_json
+from llm_backends import stub_reading_text
+
+# (reply, expected object) for defects seen in real model output
+DEFECTS = [
+    ('```json\n{"a": "b"}\n```', {'a': 'b'}),
+    ('Sure! Here is the reading:\n{"a": "b"}\nHope you like it!', {'a': 'b'}),
+    ('{"a": "b", "c": ["x", "y",],}', {'a': 'b', 'c': ['x', 'y']}),
+    ('{“a”: “b”, “c”: “d”}', {'a': 'b', 'c': 'd'}),
+    ('{"a": “smart close”, "b": "straight"}', {'a': 'smart close', 'b': 'straight'}),
+    ('{"a": "He said "hi" to me", "b": 1}', {'a': 'He said "hi" to me', 'b': 1}),
+    ('{"t": "He said "go", then left"}', {'t': 'He said "go", then left'}),
+    ('{"t": "He said "go", then left", "u": "v"}', {'t': 'He said "go", then left', 'u': 'v'}),
+    ('{"t": "quote "at the end""}', {'t': 'quote "at the end"'}),
+    ('{"a": "line one\nline two"}', {'a': 'line one\nline two'}),
+    ('{"a": "it\\\'s"}', {'a': "it's"}),
+    ('{"a": "x"\n "b": "y"}', {'a': 'x', 'b': 'y'}),
+    ('{"a":1 "b":2}', {'a': 1, 'b': 2}),
+    ('{"a": true "b": "y"}', {'a': True, 'b': 'y'}),
+    ('{"a": "x",, "b": "y"}', {'a': 'x', 'b': 'y'}),
+    ('{"a" "x"}', {'a': 'x'}),
+    ('{personality_name: Bold Dreamer, vibe_check: "Calm"}', {'personality_name': 'Bold Dreamer', 'vibe_check': 'Calm'}),
+    ('{"a": "trunc', {'a': 'trunc'}),
+    ('{"a": "x", "b":', {'a': 'x'}),
+    ('{"a": "x", "b"', {'a': 'x'}),
+    ('{"a": ["x", "y', {'a': ['x', 'y']}),
+    ('{"a": {"b": "c"', {'a': {'b': 'c'}}),
+    ('{"a": true, "b": nul', {'a': True}),
+    ('{"a": "x\\', {'a': 'x'}),
+    ('{"a": "fire \\ud83d', {'a': 'fire '}),
+    ('{"a": "x\\u00', {'a': 'x'}),
+    ('{"a": "\\ud83d\\udd25"}', {'a': '🔥'}),
+    ('{"a": 1} {"b": 2}', {'a': 1}),
+    ('no object here', None),
+    ('', None),
+]
+
+NOISE = ['{', '}', '[', ']', '"', '“', '”', ',', ':', '\\', '\n', ' ', 'a', '0', 'true', '```', '\x00', 'é', '🔥']
+
+
+def _corpus():
+    """Well-formed replies in the shapes models send them"""
+    answers = ['No cap, just dropped a fire meme 🔥', 'Hype squad', 'TikTok deep dive', 'Tokyo at night', 'Teleport']
+    replies = []
+    for n, (indent, ascii_only) in enumerate(itertools.product((None, 2), (True, False))):
+        prompt = "\n".join(f'"{answer}" - choice' for answer in answers[n:] + answers[:n])
+        reading = json.loads(stub_reading_text(prompt + f"\n{40 + n * 10}% vs {60 - n * 10}% introverted"))
+        reading['extroversion_percentage'] = 40 + n * 10
+        replies.append(json.dumps(reading, indent=indent, ensure_ascii=ascii_only))
+    replies.append("```json\n" + replies[1] + "\n```")
+    return replies
+
+
+REPLIES = _corpus()
+
+
+def _is_prefix(partial, full) -> bool:
+    """Whether partial is what a cut-off copy of full can look like"""
+    if isinstance(full, str):
+        return isinstance(partial, str) and full.startswith(partial)
+    if isinstance(full, bool) or full is None:
+        return partial == full
+    if isinstance(full, (int, float)):
+        return isinstance(partial, (int, float)) and str(full).startswith(str(partial))
+    if isinstance(full, list):
+        return (isinstance(partial, list) and len(partial) <= len(full)
+                and all(p == f for p, f in zip(partial[:-1], full))
+                and (not partial or _is_prefix(partial[-1], full[len(partial) - 1])))
+    if isinstance(full, dict):
+        return isinstance(partial, dict) and all(k in full and _is_prefix(v, full[k]) for k, v in partial.items())
+    return False
+
+
+@pytest.mark.parametrize('reply, expected', DEFECTS)
+def test_known_defects_are_repaired(reply, expected):
+    assert extract_json_object(reply) == expected
+
+
+@pytest.mark.parametrize('reply', REPLIES)
+def test_well_formed_reply_is_unchanged(reply):
+    assert extract_json_object(reply) == json.loads(reply[reply.find('{'):reply.rfind('}') + 1])
+
+
+@pytest.mark.parametrize('reply', REPLIES)
+def test_reply_cut_off_anywhere_keeps_what_it_received(reply):
+    full = extract_json_object(reply)
+    complete_fields = 0
+    for cut in range(len(reply) + 1):
+        got = extract_json_object(reply[:cut])
+        if got is None:
+            assert '{' not in reply[:cut]
+            continue
+        assert _is_prefix(got, full), cut
+        # Fields don't go missing as more of the reply arrives
+        complete = sum(1 for k, v in got.items() if v == full.get(k))
+        assert complete >= complete_fields - 1, cut
+        complete_fields = max(complete_fields, complete)
+        # drop_truncated keeps only strings that were received whole
+        dropped = extract_json_object(reply[:cut], drop_truncated=True) or {}
+        assert all(value == full[key] for key, value in dropped.items() if isinstance(value, str)), cut
+
+
+def test_random_mutations_never_raise_or_produce_invalid_json():
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = list(rng.choice(REPLIES))
+        for _ in range(rng.randint(1, 8)):
+            at = rng.randrange(len(text) + 1)
+            op = rng.random()
+            if op < 0.4:
+                text.insert(at, rng.choice(NOISE))
+            elif op < 0.7 and text:
+                del text[min(at, len(text) - 1)]
+            elif text:
+                text[min(at, len(text) - 1)] = rng.choice(NOISE)
+        mutated = ''.join(text)
+        got = extract_json_object(mutated)
+        assert got is None or isinstance(got, dict), mutated
+        repaired = repair_json(mutated)
+        if repaired is not None:
+            json.loads(repaired)
+
+
+def test_repair_time_grows_linearly():
+    # Repair-heavy input: every string needs fixing and nothing parses directly
+    rng = random.Random(0)
+
+    def reply(n):
+        fields = ''.join(f'"k{i}": “v{i} {"x" * rng.randrange(20)}”,\n' for i in range(n))
+        return "Here you go " + "{" + fields + '"end": ["a", "b",'
+
+    per_byte = []
+    for n in (2000, 8000):
+        text = reply(n)
+        started = time.perf_counter()
+        extract_json_object(text)
+        per_byte.append((time.perf_counter() - started) / len(text))
+    assert per_byte[1] / per_byte[0] < 2.0
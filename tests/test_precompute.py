@@ -0,0 +1,37 @@
+from llm_backends import LLMBackend, stub_reading_text
+from precompute import _reading_for_path
+from reading_cache import ReadingCache
+
+OPTIONS = [[f"option {q}{i}" for i in range(5)] for q in range(5)]
+TRAITS = {'extroversion': 2, 'creativity': 1, 'ambition': 0, 'empathy': -1, 'adaptability': 3}
+
+
+class CutOffBackend(LLMBackend):
+    """Replies like the stub, cut off after `keep` characters as if it hit the token limit"""
+    name = 'cut-off'
+
+    def __init__(self, keep=None):
+        super().__init__('test')
+        self.keep = keep
+        self.requests = 0
+
+    def complete(self, messages, max_tokens, temperature, json_mode=False):
+        self.requests += 1
+        return stub_reading_text(messages[-1]['content'])[:self.keep]
+
+
+def test_complete_readings_are_cached():
+    cache = ReadingCache(path=None)
+    reading = _reading_for_path(CutOffBackend(), 'compact', '18-24', OPTIONS, (0, 1, 2, 3, 4), TRAITS, cache)
+    assert reading is not None and 'filled_fields' not in reading
+    assert cache.stats()['memory_entries'] == 1
+
+
+def test_patched_readings_are_neither_cached_nor_kept():
+    cache = ReadingCache(path=None)
+    backend = CutOffBackend(keep=200)
+    for _ in range(2):
+        assert _reading_for_path(backend, 'compact', '18-24', OPTIONS, (0, 1, 2, 3, 4), TRAITS, cache) is None
+    assert cache.stats()['memory_entries'] == 0
+    # Not served from the cache, so the second run asked again
+    assert backend.requests == 2
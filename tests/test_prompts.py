@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from admission import estimate_tokens
+from llm_backends import approximate_prompt_tokens
+from oracle import PROMPT_STYLES, classify_choice, prompt_version, reading_prompt
+
+ANSWERS = ["Memes", "A hype friend", "Reels", "Beach", "Teleport"]
+TRAITS = {'extroversion': 3, 'creativity': 2}
+
+
+@pytest.mark.parametrize('style', list(PROMPT_STYLES))
+def test_prompt_carries_its_id_and_token_count(style):
+    prompt = reading_prompt('Ada', '18-24', ANSWERS, TRAITS, style)
+    assert prompt.prompt_id == f"{prompt_version(style)}/18-24"
+    recounted = approximate_prompt_tokens([dict(m) for m in prompt.messages])
+    assert prompt.tokens == recounted
+    # Sent as a plain JSON list of messages
+    assert json.loads(json.dumps(prompt.messages)) == list(prompt.messages)
+
+
+def test_admission_budgets_the_counted_tokens():
+    prompt = reading_prompt('Ada', '18-24', ANSWERS, TRAITS)
+    prompt.messages.tokens = 12345
+    assert estimate_tokens(prompt.messages, 450) == 12345 + 450
+
+
+@pytest.mark.parametrize('answer, categories', [
+    ("Posted my main character energy dancing ✨", {'creative'}),
+    ("Strategic party hopping for the best food", {'social'}),
+    ("Cozy mountain vibes with deep conversations", {'comfort'}),
+    ("Spontaneous entertainment coordinator powers", {'adventure'}),
+    ("Authentic local food exploration", {'adventure'}),
+    ("Perfect work-life balance with strategic chai breaks", set()),
+    ("Clever humor that everyone appreciates", set()),
+    ("An AI app that organizes my week", {'tech'}),
+    ("Street art and artistic artworks", {'creative'}),
+])
+def test_choice_categories(answer, categories):
+    assert classify_choice(answer) == categories
@@ -0,0 +1,47 @@
+import pytest
+
+from reading_cache import NAME_PLACEHOLDER, ReadingCache, anonymize_reading, contains_name, personalize_reading
+
+NAMES = ['J.R.', '@kai', 'Ana-', '🌟Luna', 'Luna🌟', '(Sam)', 'Zoë']
+
+
+def _reading(name):
+    return {
+        'essence': f"{name} turns small moments into stories.",
+        'hidden_trait': f"You secretly know {name}, more than anyone, needs quiet.",
+        'compatibility_vibes': [f"Anyone who gets {name}", "Night owls"],
+        'extroversion_percentage': 60,
+    }
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_anonymize_removes_names_with_punctuation_or_emoji_at_either_end(name):
+    anonymized = anonymize_reading(_reading(name), name)
+    assert not contains_name(anonymized, name)
+    assert NAME_PLACEHOLDER in anonymized['essence']
+    assert personalize_reading(anonymized, 'Mia')['compatibility_vibes'][0] == "Anyone who gets Mia"
+
+
+def test_anonymize_leaves_longer_words_alone():
+    anonymized = anonymize_reading({'essence': "Ana loves Anastasia's playlists"}, 'Ana')
+    assert anonymized['essence'] == f"{NAME_PLACEHOLDER} loves Anastasia's playlists"
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_cache_stores_anonymized_readings(name):
+    cache = ReadingCache(path=None)
+    assert cache.put('key', anonymize_reading(_reading(name), name), name)
+    assert not contains_name(cache.get('key'), name)
+
+
+def test_cache_refuses_readings_that_still_hold_the_name():
+    cache = ReadingCache(path=None)
+    reading = anonymize_reading({'essence': "Ana loves Anastasia's playlists"}, 'Ana')
+    assert not cache.put('key', reading, 'Ana')
+    assert cache.get('key') is None
+
+
+def test_cache_refusal_survives_the_disk_tier(tmp_path):
+    cache = ReadingCache(path=str(tmp_path / 'readings.sqlite3'))
+    assert not cache.put('key', {'essence': "Hi J.R."}, 'J.R.')
+    assert ReadingCache(path=str(tmp_path / 'readings.sqlite3')).get('key') is None
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from llm_backends import LLMBackend
+from resilience import RetryPolicy
+
+MESSAGES = [{'role': 'user', 'content': 'hi'}]
+
+
+class SlowFirstStream(LLMBackend):
+    """The first stream stalls before its first chunk; later ones start straight away"""
+
+    name = 'slow-first'
+
+    def __init__(self, stall: float):
+        super().__init__('test')
+        self.stall = stall
+        self.started = 0
+        self.closed = threading.Event()
+        self._lock = threading.Lock()
+
+    def stream(self, messages, max_tokens, temperature, json_mode=False):
+        with self._lock:
+            self.started += 1
+            stalled = self.started == 1
+        try:
+            if stalled:
+                time.sleep(self.stall)
+            yield 'slow' if stalled else 'fast'
+            yield '!'
+        finally:
+            if stalled:
+                self.closed.set()
+
+
+def _hedging_policy(first_token_p95):
+    policy = RetryPolicy(hedge=True, hedge_min_samples=1)
+    policy.record_latency(first_token_p95, first_token=True)
+    return policy
+
+
+def test_stream_hedges_a_slow_first_token():
+    backend = SlowFirstStream(stall=0.5)
+    policy = _hedging_policy(0.01)
+    started = time.perf_counter()
+    assert ''.join(policy.wrap(backend).stream(MESSAGES, 10, 0.0)) == 'fast!'
+    assert time.perf_counter() - started < 0.4
+    assert policy.counts['hedges'] == 1 and policy.counts['hedges_won'] == 1
+    # The losing stream is hung up once it gets going
+    assert backend.closed.wait(2)
+
+
+def test_stream_is_not_hedged_within_the_first_token_p95():
+    backend = SlowFirstStream(stall=0.05)
+    policy = _hedging_policy(1.0)
+    assert ''.join(policy.wrap(backend).stream(MESSAGES, 10, 0.0)) == 'slow!'
+    assert policy.counts['hedges'] == 0 and backend.started == 1
+
+
+def test_complete_latencies_do_not_set_the_first_token_hedge():
+    policy = RetryPolicy(hedge=True, hedge_min_samples=1)
+    policy.record_latency(0.01)
+    assert policy.hedge_delay(first_token=True) is None
+    assert policy.stats()['hedge_first_token_after_ms'] is None
@@ -0,0 +1,47 @@
+import itertools
+from collections import Counter
+
+import pytest
+
+from content_store import ContentStore
+from scoring import engine_for
+
+SNAPSHOT = ContentStore().snapshot()
+
+
+def _match_counts(engine):
+    paths = list(itertools.product(*(range(n) for n in engine.option_counts)))
+    return Counter(engine.match_batch(engine.score_batch(paths)).tolist()), len(paths)
+
+
+@pytest.mark.parametrize('age_group', SNAPSHOT.age_groups)
+def test_every_personality_is_reachable(age_group):
+    engine = engine_for(SNAPSHOT, age_group)
+    counts, _ = _match_counts(engine)
+    unreachable = [p['name'] for i, p in enumerate(engine.personalities) if not counts[i]]
+    assert not unreachable
+
+
+@pytest.mark.parametrize('age_group', SNAPSHOT.age_groups)
+def test_match_distribution_is_not_degenerate(age_group):
+    engine = engine_for(SNAPSHOT, age_group)
+    counts, total = _match_counts(engine)
+    shares = [counts[i] / total for i in range(len(engine.personalities))]
+    # No personality takes half the answer paths, and none is a rounding error
+    assert max(shares) < 0.5
+    assert min(shares) > 0.05
+
+
+@pytest.mark.parametrize('answers', [[[0, 0, 0, 0, 7]], [[0, -1]], [[0, 0, 0, 0, 0, 0]], [0, 5]])
+def test_score_batch_rejects_out_of_range_answers(answers):
+    engine = engine_for(SNAPSHOT, SNAPSHOT.age_groups[0])
+    with pytest.raises(ValueError):
+        engine.score_batch(answers)
+
+
+def test_score_batch_matches_single_scores():
+    engine = engine_for(SNAPSHOT, SNAPSHOT.age_groups[0])
+    paths = [(0, 1, 2, 3, 4), (4, 4, 4, 4, 4), (2, 0, 1, 3, 0)]
+    batch = engine.score_batch(paths)
+    for path, row in zip(paths, batch):
+        assert list(engine.score(path).values()) == row.tolist()
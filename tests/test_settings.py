@@ -0,0 +1,23 @@
+import pytest
+
+from llm_backends import LLMConfigError
+from settings import SettingsError
+from profiling import profiler_from_settings
+from telemetry import start_exporters
+
+
+def test_bad_metrics_setting_is_not_an_llm_config_error():
+    with pytest.raises(SettingsError) as e:
+        start_exporters({'VIBE_METRICS_PORT': 'ninety'})
+    assert not isinstance(e.value, LLMConfigError)
+
+
+def test_llm_config_errors_are_settings_errors():
+    assert issubclass(LLMConfigError, SettingsError)
+
+
+@pytest.mark.parametrize('settings', [{'VIBE_PROFILE': 'lots'}, {'VIBE_PROFILE_MODE': 'dtrace'}])
+def test_bad_profile_setting_is_not_an_llm_config_error(settings):
+    with pytest.raises(SettingsError) as e:
+        profiler_from_settings(settings)
+    assert not isinstance(e.value, LLMConfigError)
@@ -0,0 +1,52 @@
+from templates import Markup, RenderCache, Template, ai_results_card, results_card
+
+XSS = '<script>alert("x")</script>'
+READING = {
+    'personality_name': '<img src=x onerror=alert(1)>',
+    'essence': 'Bold & "bright"',
+    'extroversion_percentage': 60,
+    'introversion_percentage': 40,
+    'compatibility_vibes': ['<b>Night owls</b>', 'Planners'],
+}
+
+
+def test_user_name_is_escaped_on_the_ai_card():
+    card = ai_results_card(READING, XSS)
+    assert '<script>' not in card
+    assert '&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;' in card
+
+
+def test_llm_text_is_escaped_on_the_ai_card():
+    card = ai_results_card(READING, 'Ada')
+    assert '<img' not in card and '<b>' not in card
+    assert 'Bold &amp; &quot;bright&quot;' in card
+    # Fragments rendered from templates go in as they are, not escaped twice
+    assert '&amp;lt;' not in card and '&amp;amp;' not in card
+
+
+def test_percentages_cannot_break_out_of_the_style_attribute():
+    card = ai_results_card(dict(READING, extroversion_percentage='60%; background: url(//evil)'), 'Ada')
+    assert 'evil' not in card
+    assert 'width: 50%' in card
+
+
+def test_user_name_is_escaped_on_the_results_card():
+    card = results_card({'name': 'Dreamer', 'compatible_with': ['"><svg onload=alert(1)>']}, XSS)
+    assert '<script>' not in card and '<svg' not in card
+
+
+def test_markup_is_inserted_as_is():
+    template = Template('<p>{body}</p>')
+    assert template.render(body=Markup('<b>hi</b>')) == '<p><b>hi</b></p>'
+    assert template.render(body='<b>hi</b>') == '<p>&lt;b&gt;hi&lt;/b&gt;</p>'
+
+
+def test_render_cache_evicts_the_least_recently_used_card():
+    cache = RenderCache(max_entries=2)
+    cache.put('a', Markup('A'))
+    cache.put('b', Markup('B'))
+    assert cache.get('a') == 'A'
+    cache.put('c', Markup('C'))
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A' and cache.get('c') == 'C'
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'entries': 2}
@@ -0,0 +1,174 @@
+import hashlib
+import os
+from functools import lru_cache
+from typing import Optional
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+THEME_FILE = 'cosmic.css'
+
+# Per-age-group rules, injected inline on top of the shared stylesheet for the active age group only
+AGE_OVERRIDES = {
+    '18-24': """
+    .cosmic-question.age-18_24 {
+        font-family: 'Space Grotesk', sans-serif;
+        font-size: 1.8rem;
+        font-weight: 700;
+        color: #fff;
+        margin-bottom: 2rem;
+        line-height: 1.2;
+        text-shadow: 0 0 15px rgba(255, 107, 107, 0.6);
+        background: linear-gradient(135deg, #ff6b6b, #ff8e53);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        background-clip: text;
+    }
+
+    .age-18_24 .stButton > button {
+        background: linear-gradient(135deg, #ff6b6b, #ff8e53) !important;
+        border-radius: 20px !important;
+        font-weight: 700 !important;
+        text-transform: none !important;
+        box-shadow: 0 4px 15px rgba(255, 107, 107, 0.4) !important;
+    }
+
+    .age-18_24 .stButton > button:hover {
+        background: linear-gradient(135deg, #ff5252, #ff7043) !important;
+        transform: translateY(-3px) scale(1.02) !important;
+        box-shadow: 0 6px 20px rgba(255, 107, 107, 0.6) !important;
+    }
+
+    .age-18_24 .glass-card {
+        border: 2px solid rgba(255, 107, 107, 0.3) !important;
+        box-shadow: 0 8px 32px rgba(255, 107, 107, 0.2) !important;
+    }
+""",
+    '25-34': """
+    .cosmic-question.age-25_34 {
+        font-family: 'Space Grotesk', sans-serif;
+        font-size: 1.6rem;
+        font-weight: 600;
+        color: #fff;
+        margin-bottom: 2rem;
+        line-height: 1.3;
+        text-shadow: 0 0 12px rgba(114, 9, 183, 0.5);
+    }
+
+    .age-25_34 .stButton > button {
+        background: linear-gradient(135deg, #7209b7, #533483) !important;
+        border-radius: 18px !important;
+        font-weight: 600 !important;
+    }
+
+    .age-25_34 .glass-card {
+        border: 1px solid rgba(114, 9, 183, 0.3) !important;
+    }
+""",
+    '35-44': """
+    .cosmic-question.age-35_44 {
+        font-family: 'Inter', sans-serif;
+        font-size: 1.5rem;
+        font-weight: 500;
+        color: #fff;
+        margin-bottom: 2rem;
+        line-height: 1.4;
+        text-shadow: 0 0 10px rgba(83, 52, 131, 0.4);
+    }
+
+    .age-35_44 .stButton > button {
+        background: linear-gradient(135deg, #0f3460, #533483) !important;
+        border-radius: 15px !important;
+        font-weight: 500 !important;
+    }
+
+    .age-35_44 .glass-card {
+        border: 1px solid rgba(15, 52, 96, 0.3) !important;
+    }
+""",
+    '45-54': """
+    .cosmic-question.age-45_54 {
+        font-family: 'Inter', sans-serif;
+        font-size: 1.4rem;
+        font-weight: 500;
+        color: #fff;
+        margin-bottom: 2rem;
+        line-height: 1.5;
+        text-shadow: 0 0 8px rgba(106, 90, 205, 0.3);
+    }
+
+    .age-45_54 .stButton > button {
+        background: linear-gradient(135deg, #533483, #6a5acd) !important;
+        border-radius: 12px !important;
+        font-weight: 500 !important;
+    }
+
+    .age-45_54 .glass-card {
+        border: 1px solid rgba(106, 90, 205, 0.3) !important;
+    }
+""",
+    '55+': """
+    .cosmic-question.age-55plus {
+        font-family: 'Inter', sans-serif;
+        font-size: 1.3rem;
+        font-weight: 400;
+        color: #fff;
+        margin-bottom: 2rem;
+        line-height: 1.6;
+        text-shadow: 0 0 6px rgba(138, 43, 226, 0.2);
+    }
+
+    .age-55plus .stButton > button {
+        background: linear-gradient(135deg, #6a5acd, #8a2be2) !important;
+        border-radius: 10px !important;
+        font-weight: 400 !important;
+    }
+
+    .age-55plus .glass-card {
+        border: 1px solid rgba(138, 43, 226, 0.3) !important;
+    }
+""",
+}
+
+
+@lru_cache(maxsize=8)
+def _fingerprint(path: str, mtime: float) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+def stylesheet_url(filename: str = THEME_FILE) -> str:
+    """Static-serving URL for a stylesheet, fingerprinted by content so browsers can cache it for good"""
+    path = os.path.join(STATIC_DIR, filename)
+    # Tornado serves requests carrying ?v= with a far-future Cache-Control header
+    return f"app/static/{filename}?v={_fingerprint(path, os.path.getmtime(path))}"
+
+def stylesheet_loader_html(url: str) -> str:
+    """Script for a zero-height component that installs the stylesheet in the app page's <head>.
+
+    Streamlit serves static .css files as text/plain with nosniff, so a <link> tag would be
+    refused; fetching the text works and still goes through the browser's HTTP cache. The
+    <style> lives outside Streamlit's element tree, so it survives reruns and is only
+    replaced when the fingerprint changes.
+    """
+    return f"""
+    <script>
+    (function () {{
+        const doc = window.parent.document;
+        const url = "{url}";
+        const current = doc.querySelector('style[data-cosmic-theme]');
+        if (current && current.dataset.cosmicTheme === url) return;
+        fetch(new URL(url, doc.baseURI))
+            .then(response => response.ok ? response.text() : Promise.reject(response.status))
+            .then(css => {{
+                const style = doc.createElement('style');
+                style.dataset.cosmicTheme = url;
+                style.textContent = css;
+                const stale = doc.querySelector('style[data-cosmic-theme]');
+                stale ? stale.replaceWith(style) : doc.head.appendChild(style);
+            }})
+            .catch(error => console.warn('cosmic theme failed to load', error));
+    }})();
+    </script>
+    """
+
+def age_override_css(age_group: Optional[str]) -> str:
+    rules = AGE_OVERRIDES.get(age_group or '')
+    return f"<style>{rules}</style>" if rules else ''